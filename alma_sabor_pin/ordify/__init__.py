@@ -0,0 +1,5 @@
+"""Núcleo de Ordify: modelos, repositorios y servicios, sin dependencia de Streamlit.
+
+Los módulos se importan por separado (`from ordify.servicios import Servicios`)
+para que un worker de API, un proceso batch o un benchmark solo paguen lo que usan.
+"""
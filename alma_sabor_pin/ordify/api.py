@@ -0,0 +1,661 @@
+import asyncio
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl
+
+from .bitacora import fijar_actor
+from .eventos import tema_estacion
+from .metricas import medir
+from .modelos import Pago, Pedido, Usuario
+from .reservas import StockInsuficiente
+from .servicios import ESTACION_POR_ROL, Servicios
+
+
+# ============================================================
+#  API HTTP/JSON (ASGI) PARA HANDHELDS Y PANTALLAS DE COCINA
+# ============================================================
+# Corre junto a Streamlit sobre los mismos Servicios: un mesero con un
+# handheld o la tablet de una estación no necesitan un websocket, un rerun
+# por interacción ni una página completa, solo unos pocos KB de JSON.
+#
+#   POST /sesiones                      {"pin"}            -> {"token", "usuario"}
+#   GET  /mesas                                            -> [mesa, ...]
+#   GET  /inventario                                       -> {tipo: {nombre: {stock, precio}}}
+#   GET  /inventario/alertas                               -> {"calculado_en", "alertas"} pronóstico de agotamiento
+#   POST /inventario/reposicion         {"items"}          -> {"categorias"} (solo admin, una transacción)
+#   POST /pedidos                       {"mesa", "items"}  -> pedido (201)
+#   POST /pedidos/<id>/enviado          {"tipo"}           -> pedido (409 si ya no estaba pendiente)
+#   POST /pedidos/<id>/entregado                           -> pedido (409 si ya no estaba pendiente)
+#   GET  /mesas/<n>/cuenta?partes=P                        -> {"mesa", "pedidos", "total", "pagado", "saldo", "pagos"}
+#   POST /mesas/<n>/pagos               {"importe"|"items"} -> pago parcial (201) y saldo
+#   POST /mesas/<n>/cerrar                                 -> cuenta cobrada y archivada
+#   GET  /estaciones/<tipo>/cola?version=V&esperar=S       -> {"version", "pedidos"} en orden de preparación
+#   GET  /estaciones/<tipo>/eventos                        -> text/event-stream con la cola
+#
+# Todo menos /sesiones pide "Authorization: Bearer <token>".
+
+ROLES_SALA = ("admin", "mesero")
+MAX_CUERPO = 64 * 1024
+MAX_ESPERA = 30.0          # tope del long-poll (segundos)
+LATIDO_SSE = 15.0          # comentario ":" periódico para que proxies no corten la conexión
+TTL_SESION = 12 * 3600.0   # un turno
+
+
+class ErrorApi(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def pedido_json(p: Pedido, tipo: Optional[str] = None) -> Dict[str, Any]:
+    """Pedido para la API; con `tipo` solo van las líneas de esa estación."""
+    return {
+        "id": p.id,
+        "mesa": p.mesa_numero,
+        "estado": p.estado,
+        "creado_por": p.creado_por,
+        "total": round(p.total, 2),
+        "produccion": p.produccion_estados,
+        "items": [
+            {"tipo": it.tipo, "nombre": it.nombre, "cantidad": it.cantidad, "precio": it.precio}
+            for it in p.items
+            if tipo is None or it.tipo == tipo
+        ],
+    }
+
+
+def pago_json(p: Pago) -> Dict[str, Any]:
+    return {
+        "id": p.id,
+        "importe": p.importe,
+        "comensal": p.comensal,
+        "cobrado_por": p.cobrado_por,
+        "creado_en": p.creado_en,
+        "items": [{"pedido": pedido_id, "orden": orden, "unidades": unidades} for pedido_id, orden, unidades in p.lineas],
+    }
+
+
+class Solicitud:
+    __slots__ = ("metodo", "ruta", "consulta", "cabeceras", "cuerpo", "cliente", "usuario")
+
+    def __init__(self, scope: Dict[str, Any], cuerpo: bytes):
+        self.metodo: str = scope["method"]
+        self.ruta: str = scope["path"]
+        self.consulta: Dict[str, str] = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.cabeceras: Dict[str, str] = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", ())}
+        self.cuerpo = cuerpo
+        cliente = scope.get("client")
+        self.cliente: Optional[str] = cliente[0] if cliente else None
+        self.usuario: Optional[Usuario] = None
+
+    def json(self) -> Dict[str, Any]:
+        if not self.cuerpo:
+            return {}
+        try:
+            datos = json.loads(self.cuerpo, parse_constant=_rechazar_constante)
+        except ValueError:
+            raise ErrorApi(400, "El cuerpo no es JSON válido.")
+        if not isinstance(datos, dict):
+            raise ErrorApi(400, "Se esperaba un objeto JSON.")
+        return datos
+
+    def numero(self, nombre: str, defecto, tipo=int):
+        try:
+            return tipo(self.consulta.get(nombre, defecto))
+        except ValueError:
+            raise ErrorApi(400, f"'{nombre}' debe ser numérico.")
+
+
+def _rechazar_constante(nombre: str):
+    # json.loads acepta NaN/Infinity (no son JSON): un importe NaN pasaría todas las comparaciones
+    raise ValueError(f"{nombre} no es un número JSON")
+
+
+Respuesta = Tuple[int, Any]
+
+
+class ApiOrdify:
+    """Aplicación ASGI sin framework sobre `Servicios`.
+
+    Los servicios son síncronos: con SQLite (`en_hilos=True`) cada llamada
+    va a un hilo para no bloquear el event loop mientras se espera el
+    candado de escritura o una conexión del pool; en memoria son
+    microsegundos y se llaman directo. El long-poll y el SSE no ocupan
+    hilos: se suscriben al bus y esperan un futuro que el bus resuelve.
+    """
+
+    def __init__(self, servicios: Servicios, en_hilos: Optional[bool] = None):
+        self.servicios = servicios
+        self.en_hilos = servicios.pool is not None if en_hilos is None else en_hilos
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._esperando: Dict[str, Set[asyncio.Future]] = {}
+        self._suscripciones: Dict[str, Callable[[], None]] = {}
+        self._rutas: List[Tuple[str, "re.Pattern[str]", str, Callable[..., Awaitable[Respuesta]]]] = [
+            ("POST", re.compile(r"/sesiones"), "sesiones", self._iniciar_sesion),
+            ("GET", re.compile(r"/mesas"), "mesas", self._mesas),
+            ("GET", re.compile(r"/inventario"), "inventario", self._inventario),
+            ("GET", re.compile(r"/inventario/alertas"), "alertas_stock", self._alertas_stock),
+            ("POST", re.compile(r"/inventario/reposicion"), "reposicion", self._reposicion),
+            ("POST", re.compile(r"/pedidos"), "crear_pedido", self._crear_pedido),
+            ("POST", re.compile(r"/pedidos/(\d+)/enviado"), "enviado", self._enviado),
+            ("POST", re.compile(r"/pedidos/(\d+)/entregado"), "entregado", self._entregado),
+            ("GET", re.compile(r"/mesas/(\d+)/cuenta"), "cuenta", self._cuenta),
+            ("POST", re.compile(r"/mesas/(\d+)/pagos"), "pago", self._pago),
+            ("POST", re.compile(r"/mesas/(\d+)/cerrar"), "cerrar_cuenta", self._cerrar_cuenta),
+            ("GET", re.compile(r"/estaciones/(\w+)/cola"), "cola", self._cola),
+        ]
+        self._ruta_sse = re.compile(r"/estaciones/(\w+)/eventos")
+
+    # ----------------------- ASGI -----------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        self._loop = asyncio.get_running_loop()
+        try:
+            cuerpo = await self._leer_cuerpo(receive)
+            solicitud = Solicitud(scope, cuerpo)
+            coincide = self._ruta_sse.fullmatch(solicitud.ruta)
+            if coincide and solicitud.metodo == "GET":
+                self._autorizar(solicitud)
+                tipo = self._estacion(solicitud, coincide.group(1))
+                await self._transmitir_cola(solicitud, tipo, receive, send)
+                return
+            estado, datos = await self._despachar(solicitud)
+        except ErrorApi as e:
+            estado, datos = e.estado, {"error": e.mensaje}
+        await self._responder(send, estado, datos)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                self._loop = asyncio.get_running_loop()
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                self.cerrar()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def cerrar(self):
+        for cancelar in self._suscripciones.values():
+            cancelar()
+        self._suscripciones.clear()
+
+    async def _leer_cuerpo(self, receive) -> bytes:
+        partes = []
+        total = 0
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "http.disconnect":
+                break
+            parte = mensaje.get("body", b"")
+            total += len(parte)
+            if total > MAX_CUERPO:
+                raise ErrorApi(413, "Cuerpo demasiado grande.")
+            partes.append(parte)
+            if not mensaje.get("more_body", False):
+                break
+        return b"".join(partes)
+
+    async def _responder(self, send, estado: int, datos: Any):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": estado,
+            "headers": [
+                (b"content-type", b"application/json; charset=utf-8"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"cache-control", b"no-store"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
+
+    async def _despachar(self, solicitud: Solicitud) -> Respuesta:
+        metodo_valido = False
+        for metodo, patron, nombre, manejador in self._rutas:
+            coincide = patron.fullmatch(solicitud.ruta)
+            if coincide is None:
+                continue
+            if metodo != solicitud.metodo:
+                metodo_valido = True
+                continue
+            if nombre != "sesiones":
+                self._autorizar(solicitud)
+            with medir(f"api:{nombre}"):
+                return await manejador(solicitud, *coincide.groups())
+        if metodo_valido:
+            raise ErrorApi(405, "Método no permitido.")
+        raise ErrorApi(404, "Ruta inexistente.")
+
+    async def _llamar(self, fn: Callable, *args):
+        """Ejecuta un servicio síncrono (en un hilo si el backend puede bloquear)."""
+        if self.en_hilos:
+            return await asyncio.to_thread(fn, *args)   # copia el contexto: el actor viaja con la llamada
+        return fn(*args)
+
+    # ----------------------- SESIONES -----------------------
+
+    async def _iniciar_sesion(self, solicitud: Solicitud) -> Respuesta:
+        pin = str(solicitud.json().get("pin", ""))
+        if len(pin) != 6 or not pin.isdigit():
+            raise ErrorApi(400, "El PIN debe tener exactamente 6 dígitos numéricos.")
+        # Siempre en un hilo: el hash del PIN tarda ~100 ms a propósito
+        usuario, espera = await asyncio.to_thread(
+            self.servicios.iniciar_sesion, pin, solicitud.cliente, solicitud.cabeceras.get("x-forwarded-for")
+        )
+        if espera:
+            raise ErrorApi(429, f"Demasiados intentos. Espera {espera:.0f} segundos.")
+        if usuario is None:
+            raise ErrorApi(401, "PIN inválido.")
+        # Firmado con la pimienta: vale en cualquier proceso detrás del balanceador
+        token = self.servicios.usuarios.firmar_sesion(usuario, TTL_SESION)
+        return 201, {"token": token, "usuario": {"nombre": usuario.nombre, "rol": usuario.rol}}
+
+    def _autorizar(self, solicitud: Solicitud):
+        cabecera = solicitud.cabeceras.get("authorization", "")
+        usuario = None
+        if cabecera.startswith("Bearer ") and self.servicios.usuarios is not None:
+            usuario = self.servicios.usuarios.verificar_sesion(cabecera[7:])
+        if usuario is None:
+            raise ErrorApi(401, "Falta una sesión válida (Authorization: Bearer <token>).")
+        solicitud.usuario = usuario
+        fijar_actor(usuario.nombre)
+
+    def _exigir_sala(self, solicitud: Solicitud):
+        if solicitud.usuario.rol not in ROLES_SALA:
+            raise ErrorApi(403, "Solo meseros y administradores.")
+
+    def _estacion(self, solicitud: Solicitud, tipo: str) -> str:
+        rol = solicitud.usuario.rol
+        if tipo not in ESTACION_POR_ROL.values():
+            raise ErrorApi(404, f"Estación desconocida: {tipo}.")
+        if rol not in ROLES_SALA and ESTACION_POR_ROL.get(rol) != tipo:
+            raise ErrorApi(403, "Esta estación no corresponde a tu rol.")
+        return tipo
+
+    # ----------------------- MESAS E INVENTARIO -----------------------
+
+    async def _mesas(self, solicitud: Solicitud) -> Respuesta:
+        mesas = await self._llamar(self.servicios.repo.listar_mesas)
+        return 200, [{"numero": m.numero, "comensales": m.comensales, "estado": m.estado} for m in mesas]
+
+    async def _inventario(self, solicitud: Solicitud) -> Respuesta:
+        return 200, await self._llamar(self.servicios.repo.obtener_inventario)
+
+    async def _alertas_stock(self, solicitud: Solicitud) -> Respuesta:
+        self._exigir_sala(solicitud)
+        vigilante = self.servicios.vigilante
+        if vigilante is None:
+            raise ErrorApi(404, "El pronóstico de agotamiento está desactivado.")
+        panorama = vigilante.panorama
+        return 200, {
+            "calculado_en": panorama.calculado_en,
+            "alertas": [
+                {"tipo": p.tipo, "nombre": p.nombre, "stock": p.stock, "nivel": p.nivel,
+                 "minutos_restantes": None if p.minutos_restantes is None else round(p.minutos_restantes, 1),
+                 "por_hora": [round(t, 2) for t in p.por_hora]}
+                for p in panorama.alertas
+            ],
+        }
+
+    async def _reposicion(self, solicitud: Solicitud) -> Respuesta:
+        if solicitud.usuario.rol != "admin":
+            raise ErrorApi(403, "Solo administradores.")
+        items = solicitud.json().get("items")
+        if not isinstance(items, list) or not items or not all(
+            isinstance(it, dict) and isinstance(it.get("tipo"), str)
+            and isinstance(it.get("nombre"), str) and isinstance(it.get("cantidad"), int)
+            for it in items
+        ):
+            raise ErrorApi(400, "Se esperaba {'items': [{'tipo', 'nombre', 'cantidad'}, ...]}.")
+        try:
+            categorias = await self._llamar(self.servicios.reponer_stock, items)
+        except KeyError as e:
+            raise ErrorApi(422, str(e.args[0]) if e.args else "Producto desconocido.")
+        except ValueError as e:
+            raise ErrorApi(400, str(e))
+        return 200, {"categorias": categorias}
+
+    async def _cuenta(self, solicitud: Solicitud, mesa: str) -> Respuesta:
+        self._exigir_sala(solicitud)
+        numero = int(mesa)
+        partes = solicitud.numero("partes", 0)
+
+        def cuenta():
+            libro = self.servicios.libro_cuenta(numero)
+            if libro is None:
+                raise ErrorApi(404, f"No existe la mesa {numero}.")
+            return self.servicios.obtener_pedidos_por_mesa(numero), libro
+
+        pedidos, libro = await self._llamar(cuenta)
+        datos = {
+            "mesa": numero,
+            "pedidos": [pedido_json(p) for p in pedidos],
+            "total": libro.total,
+            "pagado": libro.pagado,
+            "saldo": libro.saldo,
+            "pagos": [pago_json(p) for p in libro.pagos],
+        }
+        if partes > 0:
+            datos["partes_iguales"] = libro.partes_iguales(partes)
+        return 200, datos
+
+    async def _pago(self, solicitud: Solicitud, mesa: str) -> Respuesta:
+        """Pago parcial: {"importe", "comensal"?} o {"items": [{"pedido", "orden", "unidades"}], "comensal"?}."""
+        self._exigir_sala(solicitud)
+        datos = solicitud.json()
+        importe, comensal, items = datos.get("importe"), datos.get("comensal", 0), datos.get("items")
+        if not isinstance(comensal, int) or (importe is None) == (items is None):
+            raise ErrorApi(400, "Se esperaba {'importe'} o {'items'} (y opcionalmente 'comensal').")
+        lineas = None
+        if items is not None:
+            if not isinstance(items, list) or not items or not all(
+                isinstance(it, dict) and all(isinstance(it.get(k), int) for k in ("pedido", "orden", "unidades"))
+                for it in items
+            ):
+                raise ErrorApi(400, "Se esperaba {'items': [{'pedido', 'orden', 'unidades'}, ...]}.")
+            lineas = {}
+            for it in items:
+                clave = (it["pedido"], it["orden"])
+                lineas[clave] = lineas.get(clave, 0) + it["unidades"]
+        elif not isinstance(importe, (int, float)):
+            raise ErrorApi(400, "'importe' debe ser numérico.")
+
+        def pagar():
+            pago = self.servicios.registrar_pago(int(mesa), solicitud.usuario.nombre, importe, comensal, lineas)
+            return pago, self.servicios.libro_cuenta(int(mesa))
+
+        try:
+            pago, libro = await self._llamar(pagar)
+        except KeyError:
+            raise ErrorApi(404, f"No existe la mesa {mesa}.")
+        except ValueError as e:
+            raise ErrorApi(422, str(e))
+        return 201, {"pago": pago_json(pago), "pagado": libro.pagado, "saldo": libro.saldo}
+
+    async def _cerrar_cuenta(self, solicitud: Solicitud, mesa: str) -> Respuesta:
+        self._exigir_sala(solicitud)
+        cuenta = await self._llamar(self.servicios.cerrar_cuenta, int(mesa), solicitud.usuario.nombre)
+        if cuenta is None:
+            raise ErrorApi(404, f"No existe la mesa {mesa}.")
+        return 200, {"cuenta": cuenta.cuenta, "mesa": cuenta.mesa, "pedidos": cuenta.pedidos,
+                     "total": cuenta.total, "cerrada_en": cuenta.cerrada_en}
+
+    # ----------------------- PEDIDOS -----------------------
+
+    async def _crear_pedido(self, solicitud: Solicitud) -> Respuesta:
+        self._exigir_sala(solicitud)
+        datos = solicitud.json()
+        mesa = datos.get("mesa")
+        items = datos.get("items")
+        if not isinstance(mesa, int) or not isinstance(items, list) or not items:
+            raise ErrorApi(400, "Se esperaba {'mesa': int, 'items': [{'tipo', 'nombre', 'cantidad'}, ...]}.")
+        lineas = []
+        for it in items:
+            if (not isinstance(it, dict) or not isinstance(it.get("tipo"), str)
+                    or not isinstance(it.get("nombre"), str) or not isinstance(it.get("cantidad"), int)
+                    or it["cantidad"] < 1):
+                raise ErrorApi(400, "Cada item necesita 'tipo', 'nombre' y 'cantidad' (entero >= 1).")
+            lineas.append({"tipo": it["tipo"], "nombre": it["nombre"], "cantidad": it["cantidad"]})
+
+        try:
+            pedido = await self._llamar(self.servicios.crear_pedido, mesa, lineas, solicitud.usuario.nombre)
+        except StockInsuficiente as e:
+            raise ErrorApi(409, str(e))
+        except KeyError as e:
+            # La mesa se comprueba dentro de la transacción del pedido, no antes (podría cobrarse en medio)
+            if self.servicios.repo.obtener_mesa(mesa) is None:
+                raise ErrorApi(404, f"No existe la mesa {mesa}.")
+            raise ErrorApi(422, str(e.args[0]) if e.args else "Producto desconocido.")
+        return 201, pedido_json(pedido)
+
+    async def _pedido(self, pedido_id: int) -> Pedido:
+        pedido = await self._llamar(self.servicios.repo.obtener_pedido, pedido_id)
+        if pedido is None:
+            raise ErrorApi(404, f"No existe el pedido {pedido_id}.")
+        return pedido
+
+    async def _enviado(self, solicitud: Solicitud, pedido_id: str) -> Respuesta:
+        tipo = self._estacion(solicitud, str(solicitud.json().get("tipo", "")))
+        pedido = await self._pedido(int(pedido_id))
+        if pedido.estado_produccion(tipo) is None:
+            raise ErrorApi(409, f"El pedido {pedido.id} no tiene productos de {tipo}.")
+        if not await self._llamar(self.servicios.marcar_estacion_enviada, pedido.id, tipo):
+            raise ErrorApi(409, f"El pedido {pedido.id} ya no está pendiente para {tipo}.")
+        return 200, pedido_json(await self._pedido(pedido.id))
+
+    async def _entregado(self, solicitud: Solicitud, pedido_id: str) -> Respuesta:
+        self._exigir_sala(solicitud)
+        pedido = await self._pedido(int(pedido_id))
+        if not await self._llamar(self.servicios.marcar_pedido_entregado, pedido.id):
+            raise ErrorApi(409, f"El pedido {pedido.id} ya no está pendiente ({pedido.estado}).")
+        return 200, pedido_json(await self._pedido(pedido.id))
+
+    # ----------------------- COLAS DE ESTACIÓN -----------------------
+
+    async def _foto_cola(self, tipo: str) -> Tuple[int, List[Dict[str, Any]]]:
+        # La versión se lee antes de consultar: un cambio concurrente provoca otra foto, no se pierde
+        version = self.servicios.bus.version(tema_estacion(tipo))
+        cola = await self._llamar(self.servicios.cola_estacion, tipo)
+        return version, [
+            dict(
+                pedido_json(e.pedido, tipo),
+                posicion=e.posicion,
+                comensales=e.comensales,
+                prioridad=round(e.puntaje, 2),
+                espera_s=round(e.espera_s, 1),
+                estimado_s=round(e.estimado_s, 1),
+            )
+            for e in cola
+        ]
+
+    async def _cola(self, solicitud: Solicitud, tipo: str) -> Respuesta:
+        """Con `version` y `esperar`, responde recién cuando la cola pasa de esa versión (o vence la espera)."""
+        tipo = self._estacion(solicitud, tipo)
+        version = solicitud.numero("version", -1)
+        esperar = min(max(solicitud.numero("esperar", 0, float), 0.0), MAX_ESPERA)
+        if esperar:
+            await self._esperar_cambio(tema_estacion(tipo), version, esperar)
+        version, pedidos = await self._foto_cola(tipo)
+        return 200, {"version": version, "pedidos": pedidos}
+
+    async def _transmitir_cola(self, solicitud: Solicitud, tipo: str, receive, send):
+        """Server-Sent Events: una foto de la cola al conectar y otra cada vez que cambia."""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-store"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        tema = tema_estacion(tipo)
+        try:
+            vista = int(solicitud.cabeceras.get("last-event-id", "-1"))
+        except ValueError:
+            vista = -1
+        desconexion = asyncio.ensure_future(self._esperar_desconexion(receive))
+        try:
+            while not desconexion.done():
+                if self.servicios.bus.version(tema) != vista:
+                    vista, pedidos = await self._foto_cola(tipo)
+                    datos = json.dumps({"version": vista, "pedidos": pedidos}, ensure_ascii=False)
+                    mensaje = f"id: {vista}\nevent: cola\ndata: {datos}\n\n"
+                else:
+                    mensaje = ": latido\n\n"
+                await send({"type": "http.response.body", "body": mensaje.encode("utf-8"), "more_body": True})
+                cambio = asyncio.ensure_future(self._esperar_cambio(tema, vista, LATIDO_SSE))
+                await asyncio.wait({cambio, desconexion}, return_when=asyncio.FIRST_COMPLETED)
+                cambio.cancel()
+        finally:
+            desconexion.cancel()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _esperar_desconexion(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _esperar_cambio(self, tema: str, version: int, timeout: float):
+        """Espera sin hilos a que el tema pase de `version`; el bus despierta el futuro."""
+        if self.servicios.bus.version(tema) > version:
+            return
+        if tema not in self._suscripciones:
+            self._suscripciones[tema] = self.servicios.bus.suscribir(
+                tema, lambda evento, tema=tema: self._avisar(tema)
+            )
+        futuro = self._loop.create_future()
+        esperando = self._esperando.setdefault(tema, set())
+        esperando.add(futuro)
+        try:
+            if self.servicios.bus.version(tema) > version:   # publicado entre la consulta y la suscripción
+                return
+            await asyncio.wait_for(futuro, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            esperando.discard(futuro)
+
+    def _avisar(self, tema: str):
+        """Callback del bus: corre en el hilo que publicó, así que pasa el aviso al event loop."""
+        try:
+            self._loop.call_soon_threadsafe(self._despertar, tema)
+        except RuntimeError:   # loop ya cerrado: no queda nadie esperando
+            pass
+
+    def _despertar(self, tema: str):
+        for futuro in self._esperando.pop(tema, ()):
+            if not futuro.done():
+                futuro.set_result(None)
+
+
+# ============================================================
+#  CLIENTE EN PROCESO (pruebas locales y benchmarks, sin red)
+# ============================================================
+
+class RespuestaCliente:
+    __slots__ = ("estado", "cabeceras", "cuerpo")
+
+    def __init__(self, estado: int, cabeceras: Dict[str, str], cuerpo: bytes):
+        self.estado = estado
+        self.cabeceras = cabeceras
+        self.cuerpo = cuerpo
+
+    def json(self) -> Any:
+        return json.loads(self.cuerpo)
+
+
+class ClienteAsgi:
+    """Llama a una app ASGI directamente con mensajes en memoria."""
+
+    def __init__(self, app, token: Optional[str] = None):
+        self.app = app
+        self.token = token
+
+    def _scope(self, metodo: str, ruta: str, cabeceras: Dict[str, str]) -> Dict[str, Any]:
+        ruta, _, consulta = ruta.partition("?")
+        if self.token:
+            cabeceras = dict(cabeceras, authorization=f"Bearer {self.token}")
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": metodo, "path": ruta, "query_string": consulta.encode("latin-1"),
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in cabeceras.items()],
+            "client": ("127.0.0.1", 0),
+        }
+
+    async def solicitar(self, metodo: str, ruta: str, json_: Any = None,
+                        cabeceras: Optional[Dict[str, str]] = None) -> RespuestaCliente:
+        cuerpo = b"" if json_ is None else json.dumps(json_).encode("utf-8")
+        enviado = False
+        estado, resp_cabeceras, partes = 0, {}, []
+
+        async def receive():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            await asyncio.Event().wait()   # una respuesta normal nunca espera la desconexión
+
+        async def send(mensaje):
+            nonlocal estado, resp_cabeceras
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                resp_cabeceras = {k.decode(): v.decode() for k, v in mensaje.get("headers", ())}
+            else:
+                partes.append(mensaje.get("body", b""))
+
+        await self.app(self._scope(metodo, ruta, cabeceras or {}), receive, send)
+        return RespuestaCliente(estado, resp_cabeceras, b"".join(partes))
+
+    async def get(self, ruta: str, **kwargs) -> RespuestaCliente:
+        return await self.solicitar("GET", ruta, **kwargs)
+
+    async def post(self, ruta: str, json_: Any = None, **kwargs) -> RespuestaCliente:
+        return await self.solicitar("POST", ruta, json_, **kwargs)
+
+    async def eventos(self, ruta: str, cantidad: int, timeout: float = 10.0) -> List[Dict[str, Any]]:
+        """Lee `cantidad` eventos SSE ("event: cola") y corta la conexión."""
+        desconectar = asyncio.Event()
+        recibidos: List[Dict[str, Any]] = []
+        pendiente = ""
+        enviado = False
+
+        async def receive():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await desconectar.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(mensaje):
+            nonlocal pendiente
+            if mensaje["type"] != "http.response.body":
+                return
+            pendiente += mensaje.get("body", b"").decode("utf-8")
+            while "\n\n" in pendiente:
+                bloque, pendiente = pendiente.split("\n\n", 1)
+                campos = dict(linea.split(": ", 1) for linea in bloque.split("\n") if ": " in linea and not linea.startswith(":"))
+                if campos.get("event") == "cola":
+                    recibidos.append(json.loads(campos["data"]))
+                    if len(recibidos) >= cantidad:
+                        desconectar.set()
+
+        tarea = asyncio.ensure_future(self.app(self._scope("GET", ruta, {}), receive, send))
+        try:
+            await asyncio.wait_for(asyncio.shield(tarea), timeout)
+        except asyncio.TimeoutError:
+            desconectar.set()
+            await tarea
+        return recibidos
+
+
+# ============================================================
+#  ARRANQUE (uvicorn opcional)
+# ============================================================
+
+def crear_app(config=None) -> ApiOrdify:
+    """App para `uvicorn ordify.api:crear_app --factory` (config por entorno, ver Configuracion)."""
+    from .configuracion import Configuracion, construir_servicios
+    return ApiOrdify(construir_servicios(config or Configuracion.desde_entorno()))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="API JSON de Ordify")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8502)
+    args = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("La API necesita un servidor ASGI: pip install uvicorn")
+    uvicorn.run(crear_app(), host=args.host, port=args.puerto, log_level="warning")
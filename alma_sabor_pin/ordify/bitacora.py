@@ -0,0 +1,256 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# ============================================================
+#  ACTOR (quién hace el cambio)
+# ============================================================
+
+ACTOR = contextvars.ContextVar("ordify_actor", default="sistema")
+
+
+def fijar_actor(nombre: str):
+    """Usuario al que se atribuyen los cambios del hilo/rerun actual."""
+    ACTOR.set(nombre)
+
+
+# ============================================================
+#  BITÁCORA DE EVENTOS (append-only, fsync por lotes)
+# ============================================================
+
+class Bitacora:
+    """Registro append-only de cambios, en líneas JSON, con instantáneas.
+
+    - `registrar` solo encola y devuelve el número de secuencia; un hilo
+      escritor vuelca la cola en lotes y hace un único fsync por lote (group
+      commit). Un corte de luz pierde como mucho `intervalo` segundos.
+    - El log se parte en segmentos `eventos-<primera_seq>.log`: uno nuevo
+      cada `tamano_segmento` bytes, haya o no instantáneas. Al guardar una
+      instantánea, los segmentos que ya cubre se mueven a `archivo/`: el
+      arranque lee la instantánea y solo los eventos posteriores, y la
+      auditoría sigue teniendo el historial completo.
+    - El arranque y `ultimos` leen los segmentos desde el final: cuestan lo
+      que miden los registros que devuelven, no el historial.
+    """
+
+    def __init__(
+        self,
+        directorio: str,
+        intervalo: float = 0.05,
+        lote: int = 256,
+        tamano_segmento: int = 4 * 1024 * 1024,
+    ):
+        self._directorio = directorio
+        self._archivo = os.path.join(directorio, "archivo")
+        os.makedirs(self._archivo, exist_ok=True)
+        self._intervalo = intervalo
+        self._lote = lote
+        self._tamano_segmento = tamano_segmento
+        self._lock = threading.Condition()
+        self._escritura = threading.Lock()     # un solo escritor (hilo de fondo, rotar, sincronizar)
+        self._pendientes: List[str] = []
+        self._sin_fsync = False                # hay líneas escritas que aún no pasaron por fsync
+        self._cerrada = False
+
+        segmentos = self._segmentos(self._directorio)
+        self._seq = max(self._ultima_instantanea()[0], self._ultima_seq(segmentos))
+        self._archivo_actual = None
+        self._abrir_segmento(self._seq + 1)
+
+        self._hilo = threading.Thread(target=self._escribir_en_fondo, name="ordify-bitacora", daemon=True)
+        self._hilo.start()
+
+    # ----------------------- ESCRITURA -----------------------
+
+    def registrar(self, tipo: str, datos: Dict[str, Any], actor: Optional[str] = None) -> int:
+        """Encola un evento; devuelve su número de secuencia."""
+        with self._lock:
+            self._seq += 1
+            registro = {
+                "n": self._seq,
+                "ts": round(time.time(), 3),
+                "actor": actor if actor is not None else ACTOR.get(),
+                "tipo": tipo,
+                "datos": datos,
+            }
+            self._pendientes.append(json.dumps(registro, ensure_ascii=False, separators=(",", ":")))
+            if len(self._pendientes) >= self._lote:
+                self._lock.notify_all()
+            return self._seq
+
+    @property
+    def ultima_secuencia(self) -> int:
+        return self._seq
+
+    def _escribir_en_fondo(self):
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._cerrada or len(self._pendientes) >= self._lote, self._intervalo)
+                cerrada = self._cerrada
+            self._volcar()
+            if cerrada:
+                return
+
+    def _volcar(self, nuevo_segmento: bool = False, fsync: bool = True) -> int:
+        """Escribe todo lo pendiente con un único fsync; devuelve la última secuencia escrita.
+
+        Sin `fsync` las líneas solo quedan visibles para quien lea el archivo;
+        el próximo volcado con fsync las cubre.
+        """
+        with self._escritura:
+            with self._lock:
+                lineas, self._pendientes = self._pendientes, []
+                hasta = self._seq
+            if lineas:
+                self._archivo_actual.write("\n".join(lineas) + "\n")
+                self._archivo_actual.flush()
+                self._sin_fsync = True
+            if fsync and self._sin_fsync:
+                os.fsync(self._archivo_actual.fileno())
+                self._sin_fsync = False
+            if self._sin_fsync:
+                return hasta      # no se rota un segmento que todavía no está en disco
+            if nuevo_segmento or self._archivo_actual.tell() >= self._tamano_segmento:
+                self._abrir_segmento(hasta + 1)
+        return hasta
+
+    def sincronizar(self):
+        """Bloquea hasta que todo lo registrado hasta ahora esté en disco."""
+        self._volcar()
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrada = True
+            self._lock.notify_all()
+        self._hilo.join()
+        with self._escritura:
+            self._archivo_actual.close()
+
+    # ----------------------- SEGMENTOS E INSTANTÁNEAS -----------------------
+
+    @staticmethod
+    def _segmentos(directorio: str) -> List[Tuple[int, str]]:
+        """[(primera_seq, ruta)] ordenados."""
+        segmentos = []
+        for nombre in os.listdir(directorio):
+            if nombre.startswith("eventos-") and nombre.endswith(".log"):
+                segmentos.append((int(nombre[8:-4]), os.path.join(directorio, nombre)))
+        segmentos.sort()
+        return segmentos
+
+    def _abrir_segmento(self, primera_seq: int):
+        if self._archivo_actual is not None:
+            self._archivo_actual.close()
+        ruta = os.path.join(self._directorio, f"eventos-{primera_seq:012d}.log")
+        self._archivo_actual = open(ruta, "a", encoding="utf-8")
+        if self._archivo_actual.tell() > 0:
+            # Tras un corte la última línea puede haber quedado a medias: no pegarle la siguiente
+            self._archivo_actual.write("\n")
+
+    def rotar(self) -> int:
+        """Vuelca lo pendiente y empieza un segmento nuevo; devuelve la última secuencia cerrada.
+
+        Quien vaya a guardar una instantánea debe llamarlo mientras su estado
+        está congelado, para que la secuencia corresponda exactamente a él.
+        """
+        return self._volcar(nuevo_segmento=True)
+
+    def guardar_instantanea(self, estado: Dict[str, Any], hasta: int):
+        """Escribe la instantánea de forma atómica y archiva los segmentos que ya cubre."""
+        ruta = os.path.join(self._directorio, "instantanea.json")
+        tmp = ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"n": hasta, "estado": estado}, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, ruta)
+
+        segmentos = self._segmentos(self._directorio)
+        for (_, ruta_segmento), siguiente in zip(segmentos, segmentos[1:]):
+            if siguiente[0] <= hasta + 1:
+                os.replace(ruta_segmento, os.path.join(self._archivo, os.path.basename(ruta_segmento)))
+
+    def _ultima_instantanea(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        try:
+            with open(os.path.join(self._directorio, "instantanea.json"), "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return 0, None
+        return datos["n"], datos["estado"]
+
+    # ----------------------- LECTURA -----------------------
+
+    @staticmethod
+    def _leer_segmento(ruta: str) -> Iterator[Dict[str, Any]]:
+        """Registros del segmento en orden."""
+        with open(ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    # Última línea a medio escribir tras un corte: se descarta
+                    continue
+
+    @staticmethod
+    def _leer_al_reves(ruta: str, bloque: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+        """Registros del segmento del último al primero, leyendo bloques desde el final."""
+        with open(ruta, "rb") as f:
+            fin = f.seek(0, os.SEEK_END)
+            resto = b""
+            while fin > 0:
+                inicio = max(0, fin - bloque)
+                f.seek(inicio)
+                lineas = (f.read(fin - inicio) + resto).split(b"\n")
+                fin = inicio
+                # La primera línea del bloque puede estar cortada: se completa con el bloque anterior
+                resto = lineas.pop(0) if fin > 0 else b""
+                for linea in reversed(lineas):
+                    if not linea.strip():
+                        continue
+                    try:
+                        yield json.loads(linea)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # Última línea a medio escribir tras un corte: se descarta
+                        continue
+
+    def _ultima_seq(self, segmentos: List[Tuple[int, str]]) -> int:
+        """Última secuencia escrita: solo lee el final del último segmento."""
+        if not segmentos:
+            return 0
+        primera, ruta = segmentos[-1]
+        ultimo = next(self._leer_al_reves(ruta), None)
+        return max(ultimo["n"] if ultimo is not None else 0, primera - 1)
+
+    def recuperar(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(estado de la última instantánea o None, eventos posteriores en orden)."""
+        hasta, estado = self._ultima_instantanea()
+        eventos = [
+            registro
+            for _, ruta in self._segmentos(self._directorio)
+            for registro in self._leer_segmento(ruta)
+            if registro["n"] > hasta
+        ]
+        return estado, eventos
+
+    def ultimos(self, limite: int = 200, actor: Optional[str] = None, tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Eventos más recientes primero (incluye segmentos archivados), para auditoría.
+
+        Deja visible lo pendiente sin forzar un fsync y lee hacia atrás hasta
+        juntar `limite` registros.
+        """
+        self._volcar(fsync=False)
+        segmentos = self._segmentos(self._archivo) + self._segmentos(self._directorio)
+        resultado: List[Dict[str, Any]] = []
+        if limite <= 0:
+            return resultado
+        for _, ruta in reversed(segmentos):
+            for r in self._leer_al_reves(ruta):
+                if (actor is None or r["actor"] == actor) and (tipo is None or r["tipo"] == tipo):
+                    resultado.append(r)
+                    if len(resultado) >= limite:
+                        return resultado
+        return resultado
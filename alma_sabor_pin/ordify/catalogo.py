@@ -0,0 +1,75 @@
+import sys
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+# ============================================================
+#  CATÁLOGO DE PRODUCTOS (ids enteros pequeños e internados)
+# ============================================================
+
+class CatalogoProductos:
+    """Asigna a cada producto y a cada estación un id entero pequeño.
+
+    Las líneas de pedido guardan solo esos ids; nombre y tipo se resuelven
+    aquí. Los ids son estables durante la vida del proceso (no se persisten:
+    en disco siempre se guardan tipo y nombre).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._productos: List[Tuple[str, str]] = []          # producto_id -> (tipo, nombre)
+        self._ids_producto: Dict[Tuple[str, str], int] = {}
+        self._estaciones: List[str] = []                     # estacion_id -> tipo
+        self._ids_estacion: Dict[str, int] = {}
+
+    def id_estacion(self, tipo: str) -> int:
+        estacion_id = self._ids_estacion.get(tipo)
+        if estacion_id is None:
+            with self._lock:
+                estacion_id = self._ids_estacion.get(tipo)
+                if estacion_id is None:
+                    estacion_id = len(self._estaciones)
+                    self._estaciones.append(sys.intern(tipo))
+                    self._ids_estacion[tipo] = estacion_id
+        return estacion_id
+
+    def estacion(self, estacion_id: int) -> str:
+        return self._estaciones[estacion_id]
+
+    def id_producto(self, tipo: str, nombre: str) -> int:
+        clave = (tipo, nombre)
+        producto_id = self._ids_producto.get(clave)
+        if producto_id is None:
+            self.id_estacion(tipo)
+            with self._lock:
+                producto_id = self._ids_producto.get(clave)
+                if producto_id is None:
+                    producto_id = len(self._productos)
+                    self._productos.append((sys.intern(tipo), sys.intern(nombre)))
+                    self._ids_producto[clave] = producto_id
+        return producto_id
+
+    def buscar_producto(self, tipo: str, nombre: str) -> int:
+        """Id de un producto ya registrado; KeyError si no lo está.
+
+        Para lo que llega de un cliente (formularios, API): resolverlo no
+        agrega nada, así el catálogo no crece con nombres inventados.
+        """
+        producto_id = self._ids_producto.get((tipo, nombre))
+        if producto_id is None:
+            raise KeyError(f"Producto desconocido: {tipo}/{nombre}")
+        return producto_id
+
+    def registrar_inventario(self, inventario: Dict[str, Iterable[str]]):
+        """Registra los productos de un inventario {tipo: nombres} (los únicos que se pueden pedir)."""
+        for tipo, nombres in inventario.items():
+            for nombre in nombres:
+                self.id_producto(tipo, nombre)
+
+    def producto(self, producto_id: int) -> Tuple[str, str]:
+        """(tipo, nombre) de un producto."""
+        return self._productos[producto_id]
+
+
+# Catálogo del proceso: lo usan las líneas de pedido para resolver nombres
+CATALOGO = CatalogoProductos()
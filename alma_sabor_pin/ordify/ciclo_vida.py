@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .metricas import METRICAS, medir
+from .repositorio import error_transitorio
+
+if TYPE_CHECKING:
+    from .servicios import Servicios
+
+_log = logging.getLogger(__name__)
+
+
+# ============================================================
+#  CICLO DE VIDA DE LOS PEDIDOS (conjunto activo -> archivo frío)
+# ============================================================
+# Un pedido entregado o cancelado ya no cambia, pero mientras su mesa
+# siga abierta se queda en los índices y tablas que recorren las vistas.
+# Este hilo los pasa al archivo frío del repositorio (compacto, fuera de
+# los índices) y publica el tamaño del conjunto de trabajo en METRICAS.
+
+class GestorCicloVida:
+    """Archiva los pedidos terminados por antigüedad o por cantidad.
+
+    - Cada `intervalo` segundos pasan al archivo los terminados creados
+      hace más de `edad` segundos.
+    - Si aun así quedan más de `maximo` terminados en el conjunto activo,
+      también los más antiguos, hasta dejar `maximo` (None = sin tope).
+    - Los pedidos enviados por todas sus estaciones pero sin entregar
+      siguen activos: el mesero todavía tiene que llevarlos a la mesa.
+
+    Con SQLite cada proceso corre el suyo; el archivado es una transacción
+    y el segundo proceso que llega ya no encuentra nada que mover.
+    """
+
+    def __init__(self, servicios: "Servicios", edad: float = 30 * 60, maximo: Optional[int] = 200,
+                 intervalo: float = 60.0):
+        self._repo = servicios.repo
+        self.edad = edad
+        self.maximo = maximo
+        self.intervalo = intervalo
+        self.archivados = 0
+        self.tamano: Dict[str, int] = {}
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> "GestorCicloVida":
+        self._hilo = threading.Thread(target=self._bucle, name="ordify-ciclo-vida", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _bucle(self):
+        while True:
+            try:
+                self.revisar()
+            except Exception as e:
+                # Base ocupada o reiniciándose: se reintenta en el próximo intervalo sin avisar
+                if not error_transitorio(e):
+                    _log.exception("Falló el archivado de pedidos terminados")
+            if self._detener.wait(self.intervalo):
+                return
+
+    def revisar(self) -> int:
+        """Archiva lo que corresponda y actualiza las métricas; devuelve cuántos pedidos movió."""
+        with medir("ciclo_vida:archivar"):
+            movidos = self._repo.archivar_pedidos(time.time() - self.edad, self.maximo)
+        self.archivados += movidos
+        self.tamano = self._repo.tamano_conjunto()
+        for nombre, valor in self.tamano.items():
+            METRICAS.fijar(f"conjunto_{nombre}", valor)
+        return movidos
+
+    def metricas(self) -> Dict[str, float]:
+        """Para la pestaña Rendimiento (como PoolConexiones.metricas)."""
+        return {**self.tamano, "archivados_por_este_proceso": self.archivados}
@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .eventos import BusEventos, tema_estacion
+from .modelos import Pedido
+from .repositorio import Repositorio
+
+
+# ============================================================
+#  COLAS DE PRODUCCIÓN POR ESTACIÓN (prioridad + espera estimada)
+# ============================================================
+
+@dataclass(slots=True, frozen=True)
+class ReglasPrioridad:
+    """Puntaje de un pedido en una estación (mayor = se prepara antes).
+
+    puntaje = peso_espera * minutos esperando
+            + peso_comensales * comensales de la mesa
+            + bono_juntar si las demás estaciones del pedido ya enviaron lo suyo
+
+    La espera crece igual para todos los pedidos, así que el orden relativo
+    solo depende de `creado_en` y de la parte fija: la clave de orden no
+    cambia con el reloj y ningún pedido queda relegado para siempre (cada
+    minuto de espera suma lo mismo que el bono de cualquier otro).
+    """
+    peso_espera: float = 1.0
+    peso_comensales: float = 0.5
+    bono_juntar: float = 10.0
+
+    def fijo(self, pedido: Pedido, tipo: str, comensales: int) -> float:
+        puntaje = self.peso_comensales * comensales
+        otras = [estado for estacion, estado in pedido.produccion_estados.items() if estacion != tipo]
+        if otras and all(estado == "enviado" for estado in otras):
+            puntaje += self.bono_juntar
+        return puntaje
+
+    def clave(self, pedido: Pedido, tipo: str, comensales: int) -> float:
+        """Clave de orden: menor = más prioritario (puntaje sin el término del reloj)."""
+        return self.peso_espera * pedido.creado_en / 60.0 - self.fijo(pedido, tipo, comensales)
+
+
+class RitmoEstacion:
+    """Segundos por pedido de una estación: media móvil exponencial de los últimos envíos.
+
+    El intervalo de cada envío empieza en el envío anterior o en la llegada
+    del pedido, lo que sea más tarde: el tiempo ocioso sin pedidos no cuenta
+    como lentitud de la cocina.
+    """
+
+    def __init__(self, inicial: float = 120.0, alfa: float = 0.2, tope: float = 900.0):
+        self.segundos_por_pedido = inicial
+        self._alfa = alfa
+        self._tope = tope
+        self._ultimo: Optional[float] = None
+        self.envios = 0
+
+    def registrar(self, ts: float, creado_en: float):
+        inicio = creado_en if self._ultimo is None else max(self._ultimo, creado_en)
+        intervalo = min(max(ts - inicio, 0.0), self._tope)
+        self.segundos_por_pedido += self._alfa * (intervalo - self.segundos_por_pedido)
+        self._ultimo = ts
+        self.envios += 1
+
+
+class ColaEstacion:
+    """Pedidos de una estación en orden de preparación, ordenados al insertar.
+
+    Como la clave no cambia con el reloj, el orden solo se toca cuando un
+    pedido llega, cambia o sale: poner y quitar buscan su lugar por
+    bisección. La vista ordenada (pedido, comensales, parte fija del
+    puntaje) se arma una vez por cambio y la reutilizan todas las lecturas.
+    """
+
+    def __init__(self, tipo: str, reglas: ReglasPrioridad, ritmo: Optional[RitmoEstacion] = None):
+        self.tipo = tipo
+        self.reglas = reglas
+        self.ritmo = ritmo or RitmoEstacion()
+        self.version = 0                          # última versión del tema del bus aplicada
+        self._orden: List[Tuple[float, int]] = []  # (clave, pedido_id) ordenado; desempata el id (FIFO)
+        self._claves: Dict[int, float] = {}
+        self._pedidos: Dict[int, Pedido] = {}
+        self._comensales: Dict[int, int] = {}
+        self._fijos: Dict[int, float] = {}
+        self._vista: Optional[List[Tuple[Pedido, int, float]]] = None
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def __contains__(self, pedido_id: int) -> bool:
+        return pedido_id in self._claves
+
+    def poner(self, pedido: Pedido, comensales: int):
+        clave = self.reglas.clave(pedido, self.tipo, comensales)
+        previa = self._claves.get(pedido.id)
+        if previa != clave:
+            if previa is not None:
+                self._sacar_de_orden(previa, pedido.id)
+            bisect.insort(self._orden, (clave, pedido.id))
+            self._claves[pedido.id] = clave
+        self._pedidos[pedido.id] = pedido
+        self._comensales[pedido.id] = comensales
+        self._fijos[pedido.id] = self.reglas.fijo(pedido, self.tipo, comensales)
+        self._vista = None
+
+    def quitar(self, pedido_id: int) -> Optional[Pedido]:
+        clave = self._claves.pop(pedido_id, None)
+        if clave is None:
+            return None
+        self._sacar_de_orden(clave, pedido_id)
+        self._comensales.pop(pedido_id, None)
+        self._fijos.pop(pedido_id, None)
+        self._vista = None
+        return self._pedidos.pop(pedido_id)
+
+    def comensales(self, pedido_id: int) -> Optional[int]:
+        return self._comensales.get(pedido_id)
+
+    def vista(self) -> List[Tuple[Pedido, int, float]]:
+        """(pedido, comensales, parte fija del puntaje) en orden de preparación; no copiar ni modificar."""
+        if self._vista is None:
+            self._vista = [(self._pedidos[pid], self._comensales[pid], self._fijos[pid]) for _, pid in self._orden]
+        return self._vista
+
+    def _sacar_de_orden(self, clave: float, pedido_id: int):
+        del self._orden[bisect.bisect_left(self._orden, (clave, pedido_id))]
+
+
+@dataclass(slots=True, frozen=True)
+class EntradaCola:
+    pedido: Pedido
+    posicion: int               # 0 = el siguiente a preparar
+    comensales: int
+    puntaje: float
+    espera_s: float             # cuánto lleva esperando
+    estimado_s: float           # cuánto falta, según el ritmo reciente de la estación
+
+
+class PlanificadorEstaciones:
+    """Una ColaEstacion compartida por estación, sincronizada con el bus de eventos.
+
+    Todas las pantallas (Streamlit o API) leen la misma cola: cada lectura
+    aplica solo los eventos nuevos del tema de la estación (una bisección
+    por evento) y recarga desde el repositorio si el historial del bus ya no
+    los tiene. Los envíos de la estación alimentan su RitmoEstacion.
+    """
+
+    def __init__(self, repo: Repositorio, bus: BusEventos, reglas: Optional[ReglasPrioridad] = None):
+        self.repo = repo
+        self.bus = bus
+        self.reglas = reglas or ReglasPrioridad()
+        self._colas: Dict[str, ColaEstacion] = {}
+        self._lock = threading.Lock()
+
+    def _comensales(self, mesa_numero: int) -> int:
+        mesa = self.repo.obtener_mesa(mesa_numero)
+        return mesa.comensales if mesa is not None else 1
+
+    def _sincronizar(self, tipo: str) -> ColaEstacion:
+        tema = tema_estacion(tipo)
+        cola = self._colas.get(tipo)
+        eventos = None if cola is None or cola.version < 0 else self.bus.eventos_desde(tema, cola.version)
+        if eventos is None:
+            # Primera vez o historial desbordado: foto completa (la versión se lee antes de consultar)
+            version = self.bus.version(tema)
+            cola = ColaEstacion(tipo, self.reglas, cola.ritmo if cola is not None else None)
+            for pedido in self.repo.pedidos_pendientes_estacion(tipo):
+                cola.poner(pedido, self._comensales(pedido.mesa_numero))
+            cola.version = version
+            self._colas[tipo] = cola
+            return cola
+        for ev in eventos:
+            pedido = ev.pedido
+            if pedido is not None and pedido.estado_produccion(tipo) == "pendiente":
+                comensales = cola.comensales(ev.pedido_id)
+                cola.poner(pedido, self._comensales(pedido.mesa_numero) if comensales is None else comensales)
+                continue
+            previo = cola.quitar(ev.pedido_id)
+            if previo is not None and pedido is not None and pedido.estado_produccion(tipo) == "enviado":
+                cola.ritmo.registrar(ev.ts, previo.creado_en)
+        cola.version += len(eventos)   # las versiones de un tema son consecutivas
+        return cola
+
+    def cola(self, tipo: str, ahora: Optional[float] = None) -> List[EntradaCola]:
+        """Cola de la estación en orden de preparación, con espera y tiempo estimado por pedido."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            cola = self._sincronizar(tipo)
+            por_pedido = cola.ritmo.segundos_por_pedido
+            vista = cola.vista()
+        # La parte fija viene de la vista: en cada lectura solo se suma el término del reloj
+        por_minuto = self.reglas.peso_espera / 60.0
+        entradas = []
+        for i, (pedido, comensales, fijo) in enumerate(vista):
+            espera = max(ahora - pedido.creado_en, 0.0)
+            entradas.append(EntradaCola(
+                pedido=pedido,
+                posicion=i,
+                comensales=comensales,
+                puntaje=por_minuto * espera + fijo,
+                espera_s=espera,
+                estimado_s=(i + 1) * por_pedido,
+            ))
+        return entradas
+
+    def invalidar(self):
+        """Recargar todas las colas desde el repositorio en la próxima lectura (conserva los ritmos)."""
+        with self._lock:
+            for cola in self._colas.values():
+                cola.version = -1
+
+    def segundos_por_pedido(self, tipo: str) -> float:
+        with self._lock:
+            return self._sincronizar(tipo).ritmo.segundos_por_pedido
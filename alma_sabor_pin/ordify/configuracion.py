@@ -0,0 +1,143 @@
+import os
+from dataclasses import dataclass
+
+from .colas import ReglasPrioridad
+from .servicios import Servicios
+
+
+# ============================================================
+#  CONFIGURACIÓN (variables de entorno ORDIFY_*)
+# ============================================================
+
+# alma_sabor_pin/datos: gitignored, junto a app.py
+DIRECTORIO_DATOS_POR_DEFECTO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datos")
+
+
+@dataclass(slots=True)
+class Configuracion:
+    directorio_datos: str = DIRECTORIO_DATOS_POR_DEFECTO   # base SQLite, contadores de ids, bitácora...
+    backend: str = "sqlite"                   # "sqlite" (persistente) o "memoria" (bitácora + instantáneas)
+    tamano_pool: int = 5                      # conexiones abiertas como máximo contra la base
+    intervalo_cola_estacion: float = 3.0      # segundos entre revisiones de la cola de cada estación
+    metricas_archivo: str = ""                # exportación Prometheus a archivo (vacío = no)
+    metricas_puerto: int = 0                  # endpoint /metrics (0 = no)
+    prioridad_espera: float = 1.0             # puntos por minuto de espera en la cola de una estación
+    prioridad_comensales: float = 0.5         # puntos por comensal de la mesa
+    prioridad_juntar: float = 10.0            # bono si las demás estaciones del pedido ya enviaron
+    filas_por_pagina: int = 25                # filas por página en las tablas de administración
+    nodo: str = ""                            # nombre del proceso si varios comparten `directorio_datos`
+    intervalo_sincronizacion: float = 0.2     # segundos entre revisiones de cambios de otros procesos (0 = no)
+    intervalo_pronostico: float = 30.0        # segundos máximos entre recálculos del pronóstico de stock (0 = no)
+    alerta_critica_minutos: float = 30.0      # alerta crítica si un producto se agota antes de esto
+    alerta_baja_minutos: float = 90.0         # alerta de stock bajo si se agota antes de esto
+    proxies_confiables: str = ""              # IPs/CIDR separadas por comas cuyo X-Forwarded-For se acepta
+    intervalo_archivo: float = 60.0           # segundos entre pasadas del archivado de pedidos terminados (0 = no)
+    archivo_edad_minutos: float = 30.0        # se archivan los entregados/cancelados con más de esta edad
+    archivo_maximo: int = 200                 # terminados que se dejan como máximo en el conjunto activo
+
+    @classmethod
+    def desde_entorno(cls) -> "Configuracion":
+        return cls(
+            directorio_datos=os.environ.get("ORDIFY_DATOS", DIRECTORIO_DATOS_POR_DEFECTO),
+            backend=os.environ.get("ORDIFY_BACKEND", "sqlite"),
+            tamano_pool=int(os.environ.get("ORDIFY_POOL_TAMANO", "5")),
+            intervalo_cola_estacion=float(os.environ.get("ORDIFY_INTERVALO_ESTACION", "3")),
+            metricas_archivo=os.environ.get("ORDIFY_METRICAS_ARCHIVO", ""),
+            metricas_puerto=int(os.environ.get("ORDIFY_METRICAS_PUERTO", "0")),
+            prioridad_espera=float(os.environ.get("ORDIFY_PRIORIDAD_ESPERA", "1")),
+            prioridad_comensales=float(os.environ.get("ORDIFY_PRIORIDAD_COMENSALES", "0.5")),
+            prioridad_juntar=float(os.environ.get("ORDIFY_PRIORIDAD_JUNTAR", "10")),
+            filas_por_pagina=int(os.environ.get("ORDIFY_FILAS_POR_PAGINA", "25")),
+            nodo=os.environ.get("ORDIFY_NODO", ""),
+            intervalo_sincronizacion=float(os.environ.get("ORDIFY_INTERVALO_SINCRONIZACION", "0.2")),
+            intervalo_pronostico=float(os.environ.get("ORDIFY_INTERVALO_PRONOSTICO", "30")),
+            alerta_critica_minutos=float(os.environ.get("ORDIFY_ALERTA_CRITICA_MIN", "30")),
+            alerta_baja_minutos=float(os.environ.get("ORDIFY_ALERTA_BAJA_MIN", "90")),
+            proxies_confiables=os.environ.get("ORDIFY_PROXIES_CONFIABLES", ""),
+            intervalo_archivo=float(os.environ.get("ORDIFY_INTERVALO_ARCHIVO", "60")),
+            archivo_edad_minutos=float(os.environ.get("ORDIFY_ARCHIVO_EDAD_MIN", "30")),
+            archivo_maximo=int(os.environ.get("ORDIFY_ARCHIVO_MAXIMO", "200")),
+        )
+
+    def reglas_prioridad(self) -> ReglasPrioridad:
+        return ReglasPrioridad(self.prioridad_espera, self.prioridad_comensales, self.prioridad_juntar)
+
+
+def construir_servicios(config: Configuracion) -> Servicios:
+    """Arma repositorio, bus, usuarios, limitador y bitácora según la configuración.
+
+    Cada proceso (Streamlit, API, job) llama a esto una sola vez y comparte la
+    instancia. El backend que no se usa ni siquiera se importa.
+
+    Con SQLite, varios procesos pueden apuntar al mismo `directorio_datos`
+    (p. ej. un servidor por núcleo detrás de un balanceador): todos usan la
+    misma base y un SincronizadorProcesos les avisa de los cambios de los
+    demás. Cada uno debe tener su ORDIFY_NODO, porque la bitácora de auditoría
+    es un archivo por proceso. El backend en memoria es de un solo proceso.
+
+    Con `intervalo_pronostico` > 0 arranca también el VigilanteInventario
+    (consumo por producto y alertas de agotamiento, en su propio hilo), y con
+    `intervalo_archivo` > 0 el GestorCicloVida, que pasa los pedidos
+    entregados o cancelados al archivo frío del repositorio.
+    """
+    from .bitacora import Bitacora
+    from .cuentas import ArchivoCuentas
+    from .datos_iniciales import get_inventario_inicial, get_usuarios_predefinidos
+    from .seguridad import AlmacenUsuarios, LimitadorIntentos, cargar_pimienta
+
+    datos = config.directorio_datos
+    bitacora = Bitacora(os.path.join(datos, f"bitacora-{config.nodo}" if config.nodo else "bitacora"))
+    pool = None
+    if config.backend == "memoria":
+        from .repositorio_memoria import RepositorioMemoria
+        from .secuencias import GeneradorIds
+
+        repo = RepositorioMemoria(
+            inventario=get_inventario_inicial(),
+            ids=GeneradorIds(ruta=os.path.join(datos, "secuencias.json")),
+            bitacora=bitacora,
+        )
+    else:
+        from .repositorio_sqlite import RepositorioSQLite, crear_pool_sqlite
+
+        pool = crear_pool_sqlite(os.path.join(datos, "ordify.db"), tamano=config.tamano_pool)
+        repo = RepositorioSQLite(pool=pool, inventario_inicial=get_inventario_inicial(), bitacora=bitacora)
+
+    usuarios = AlmacenUsuarios(cargar_pimienta(os.path.join(datos, "pimienta.key")))
+    for pin, usuario in get_usuarios_predefinidos().items():
+        usuarios.registrar(pin, usuario)
+
+    servicios = Servicios(
+        repo,
+        usuarios=usuarios,
+        limitador=LimitadorIntentos(proxies_confiables=config.proxies_confiables.split(",")),
+        bitacora=bitacora,
+        pool=pool,
+        reglas=config.reglas_prioridad(),
+        archivo=ArchivoCuentas(os.path.join(datos, "cuentas")),
+    )
+    if pool is not None and config.intervalo_sincronizacion > 0:
+        from .sincronizacion import SincronizadorProcesos
+
+        servicios.sincronizador = SincronizadorProcesos(
+            servicios, os.path.join(datos, "ordify.db"), intervalo=config.intervalo_sincronizacion
+        ).iniciar()
+    if config.intervalo_pronostico > 0:
+        from .pronostico import VigilanteInventario
+
+        servicios.vigilante = VigilanteInventario(
+            servicios,
+            minutos_critico=config.alerta_critica_minutos,
+            minutos_bajo=config.alerta_baja_minutos,
+            intervalo=config.intervalo_pronostico,
+        ).iniciar()
+    if config.intervalo_archivo > 0:
+        from .ciclo_vida import GestorCicloVida
+
+        servicios.ciclo_vida = GestorCicloVida(
+            servicios,
+            edad=config.archivo_edad_minutos * 60,
+            maximo=config.archivo_maximo,
+            intervalo=config.intervalo_archivo,
+        ).iniciar()
+    return servicios
@@ -0,0 +1,154 @@
+import csv
+import glob
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Optional, Sequence
+
+from .modelos import Mesa, Pago, Pedido
+
+
+# ============================================================
+#  ARCHIVO DE CUENTAS CERRADAS (CSV por día, append-only)
+# ============================================================
+# Una fila por línea de pedido cobrada. Las columnas derivadas (día, hora,
+# primera línea de cada pedido/cuenta) se calculan al archivar para que los
+# reportes agreguen sin convertir fechas ni llevar conjuntos de ids.
+
+COLUMNAS = (
+    "cuenta", "dia", "cerrada_en", "cerrada_por", "mesa", "comensales",
+    "pedido", "creado_en", "hora", "creado_por",
+    "tipo", "nombre", "cantidad", "precio", "importe",
+    "nuevo_pedido", "nueva_cuenta",
+)
+
+# Pagos de cada cuenta en `pagos-AAAA-MM-DD.csv` (uno por fila; `unidades` = cobradas por ítem)
+COLUMNAS_PAGOS = (
+    "cuenta", "dia", "cerrada_en", "mesa", "pago", "creado_en", "cobrado_por", "comensal", "importe", "unidades",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class CuentaCerrada:
+    cuenta: int             # id de ocupación de la mesa (el número se reutiliza, el id no)
+    mesa: int
+    comensales: int
+    pedidos: int
+    total: float
+    cerrada_en: float
+    cerrada_por: str
+
+
+def resumir_cuenta(mesa: Mesa, pedidos: List[Pedido], cerrada_por: str, cerrada_en: Optional[float] = None) -> CuentaCerrada:
+    return CuentaCerrada(
+        cuenta=mesa.id,
+        mesa=mesa.numero,
+        comensales=mesa.comensales,
+        pedidos=len(pedidos),
+        total=round(sum(p.total for p in pedidos), 2),
+        cerrada_en=time.time() if cerrada_en is None else cerrada_en,
+        cerrada_por=cerrada_por,
+    )
+
+
+class ArchivoCuentas:
+    """Cuentas cobradas en `cuentas-AAAA-MM-DD.csv` (y sus pagos en `pagos-...`), con fsync por cuenta.
+
+    Cerrar una mesa es poco frecuente y perder una cuenta cobrada no es
+    aceptable, así que cada cuenta se escribe y se sincroniza antes de que
+    la mesa salga del repositorio. Leer es un recorrido por lotes de
+    tamaño fijo: un mes de historial se resume con memoria acotada.
+    """
+
+    def __init__(self, directorio: str):
+        self._directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _ruta(self, dia: str, prefijo: str = "cuentas") -> str:
+        return os.path.join(self._directorio, f"{prefijo}-{dia}.csv")
+
+    def archivar(self, mesa: Mesa, pedidos: List[Pedido], cerrada_por: str,
+                 cerrada_en: Optional[float] = None, pagos: Sequence[Pago] = ()) -> CuentaCerrada:
+        """Escribe la cuenta y sus pagos; los pagos van primero (una cuenta archivada siempre los tiene)."""
+        cuenta = resumir_cuenta(mesa, pedidos, cerrada_por, cerrada_en)
+        dia = time.strftime("%Y-%m-%d", time.localtime(cuenta.cerrada_en))
+        if pagos:
+            self._anexar(self._ruta(dia, "pagos"), COLUMNAS_PAGOS, [
+                (cuenta.cuenta, dia, round(cuenta.cerrada_en, 3), mesa.numero, pago.id, round(pago.creado_en, 3),
+                 pago.cobrado_por, pago.comensal, pago.importe, sum(u for _, _, u in pago.lineas))
+                for pago in pagos
+            ])
+        filas = []
+        for p in pedidos:
+            hora = time.localtime(p.creado_en or cuenta.cerrada_en).tm_hour
+            for j, linea in enumerate(p.items):
+                filas.append((
+                    cuenta.cuenta, dia, round(cuenta.cerrada_en, 3), cerrada_por, mesa.numero, mesa.comensales,
+                    p.id, round(p.creado_en, 3), hora, p.creado_por,
+                    linea.tipo, linea.nombre, linea.cantidad, linea.precio, round(linea.subtotal, 2),
+                    int(j == 0), int(not filas),
+                ))
+        self._anexar(self._ruta(dia), COLUMNAS, filas)
+        return cuenta
+
+    def _anexar(self, ruta: str, columnas: Sequence[str], filas: List[tuple]):
+        texto = io.StringIO()
+        csv.writer(texto).writerows(filas)
+        with self._lock:
+            self._crear(ruta, columnas)
+            # Una sola escritura O_APPEND por cuenta: otros procesos pueden archivar en el mismo día
+            fd = os.open(ruta, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, texto.getvalue().encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def _crear(ruta: str, columnas: Sequence[str]):
+        """Crea el archivo del día ya con su encabezado (nunca visible vacío para otro proceso)."""
+        if os.path.exists(ruta):
+            return
+        texto = io.StringIO()
+        csv.writer(texto).writerow(columnas)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(texto.getvalue().encode("utf-8"))
+        try:
+            os.link(temporal, ruta)   # atómico; falla si otro proceso ganó
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporal)
+
+    def archivos(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[str]:
+        """Archivos diarios dentro del rango (inclusive), en orden cronológico."""
+        rutas = []
+        for ruta in sorted(glob.glob(os.path.join(self._directorio, "cuentas-*.csv"))):
+            dia = os.path.basename(ruta)[len("cuentas-"):-len(".csv")]
+            if desde is not None and dia < desde.isoformat():
+                continue
+            if hasta is not None and dia > hasta.isoformat():
+                continue
+            rutas.append(ruta)
+        return rutas
+
+    def lotes(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+              tamano: int = 10_000) -> Iterator[List[List[str]]]:
+        """Filas crudas (texto, en el orden de COLUMNAS) de a `tamano` por lote."""
+        lote: List[List[str]] = []
+        for ruta in self.archivos(desde, hasta):
+            with open(ruta, newline="", encoding="utf-8") as f:
+                lector = csv.reader(f)
+                next(lector, None)   # encabezado
+                for fila in lector:
+                    lote.append(fila)
+                    if len(lote) >= tamano:
+                        yield lote
+                        lote = []
+        if lote:
+            yield lote
@@ -0,0 +1,36 @@
+from typing import Dict
+
+from .modelos import Usuario
+
+
+# ============================================================
+#  DATOS INICIALES (USUARIOS + INVENTARIO)
+# ============================================================
+
+def get_usuarios_predefinidos() -> Dict[str, Usuario]:
+    """Usuarios iniciales por PIN; al arrancar se guardan solo como hash (ver AlmacenUsuarios)."""
+    return {
+        "000000": Usuario(rol="admin",          nombre="Administrador"),
+        "111111": Usuario(rol="mesero",         nombre="Mesero"),
+        "222222": Usuario(rol="chef_italiano",  nombre="Chef Italiano"),
+        "333333": Usuario(rol="chef_mexicano",  nombre="Chef Mexicano"),
+        "444444": Usuario(rol="barista",        nombre="Barista"),
+    }
+
+
+def get_inventario_inicial() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Inventario hardcodeado (simulación, luego se migrará a SQL Server)."""
+    return {
+        "comida_italiana": {
+            "Pizza Margherita": {"stock": 15, "precio": 12.99},
+            "Lasagna": {"stock": 8, "precio": 14.50},
+        },
+        "comida_mexicana": {
+            "Tacos": {"stock": 20, "precio": 10.99},
+            "Burrito": {"stock": 12, "precio": 11.50},
+        },
+        "bebidas": {
+            "Café": {"stock": 50, "precio": 3.99},
+            "Jugo Natural": {"stock": 25, "precio": 4.50},
+        },
+    }
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from .modelos import Pedido
+
+
+# ============================================================
+#  BUS DE EVENTOS DE PEDIDOS (publicar / suscribir)
+# ============================================================
+
+TEMA_PEDIDOS = "pedidos"
+
+
+def tema_estacion(tipo: str) -> str:
+    """Tema al que se suscribe la pantalla de una estación ("comida_italiana", "bebidas"...)."""
+    return f"estacion:{tipo}"
+
+
+@dataclass
+class Evento:
+    tipo: str                          # pedido_creado, estacion_enviada, pedido_entregado, ...
+    pedido_id: int
+    pedido: Optional[Pedido] = None    # foto del pedido tras el cambio (None si se eliminó)
+    ts: float = field(default_factory=time.time)
+
+
+class BusEventos:
+    """Bus en proceso con un contador de versión y un historial corto por tema.
+
+    Las pantallas guardan la última versión que vieron: consultar
+    `version(tema)` es O(1) y, si cambió, `eventos_desde` devuelve solo los
+    eventos nuevos para aplicarlos sobre la cola local. Así el costo de
+    refrescar depende de los eventos, no de pedidos × pantallas abiertas.
+    """
+
+    def __init__(self, historial: int = 512):
+        self._cond = threading.Condition()
+        self._historial = historial
+        self._versiones: Dict[str, int] = {}
+        self._eventos: Dict[str, Deque[tuple]] = {}   # tema -> (version, evento)
+        self._suscriptores: Dict[str, List[Callable[[Evento], None]]] = {}
+
+    def publicar(self, temas: Iterable[str], evento: Evento):
+        with self._cond:
+            callbacks = []
+            for tema in temas:
+                version = self._versiones.get(tema, 0) + 1
+                self._versiones[tema] = version
+                cola = self._eventos.get(tema)
+                if cola is None:
+                    cola = self._eventos[tema] = deque(maxlen=self._historial)
+                cola.append((version, evento))
+                callbacks.extend(self._suscriptores.get(tema, ()))
+            self._cond.notify_all()
+        for callback in callbacks:
+            callback(evento)
+
+    def version(self, tema: str) -> int:
+        return self._versiones.get(tema, 0)
+
+    def eventos_desde(self, tema: str, version: int) -> Optional[List[Evento]]:
+        """Eventos posteriores a `version`, o None si ya salieron del historial (recargar todo)."""
+        with self._cond:
+            actual = self._versiones.get(tema, 0)
+            if version >= actual:
+                return []
+            cola = self._eventos.get(tema, ())
+            if not cola or cola[0][0] > version + 1:
+                return None
+            return [ev for v, ev in cola if v > version]
+
+    def esperar(self, tema: str, version: int, timeout: float) -> int:
+        """Bloquea hasta que el tema supere `version` o venza el timeout; devuelve la versión actual."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._versiones.get(tema, 0) > version, timeout)
+            return self._versiones.get(tema, 0)
+
+    def suscribir(self, tema: str, callback: Callable[[Evento], None]) -> Callable[[], None]:
+        """Registra un callback (se llama fuera del candado); devuelve la función para desuscribirse."""
+        with self._cond:
+            self._suscriptores.setdefault(tema, []).append(callback)
+
+        def cancelar():
+            with self._cond:
+                lista = self._suscriptores.get(tema, [])
+                if callback in lista:
+                    lista.remove(callback)
+        return cancelar
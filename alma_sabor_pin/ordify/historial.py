@@ -0,0 +1,134 @@
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+from .modelos import LineaPedido, Pedido
+
+
+# ============================================================
+#  HISTORIAL COLUMNAR (pedidos cerrados, respaldado por arrays)
+# ============================================================
+
+ESTADOS_PEDIDO = ("pendiente", "entregado", "cancelado")
+_CODIGO_ESTADO = {estado: codigo for codigo, estado in enumerate(ESTADOS_PEDIDO)}
+
+
+class HistorialColumnar:
+    """Pedidos guardados por columnas en `array` en lugar de un objeto por pedido.
+
+    Es el archivo frío de RepositorioMemoria: cada pedido cuesta unos pocos
+    bytes por columna y cada línea 16 bytes (producto, cantidad, precio).
+    `obtener` y `de_mesa` reconstruyen los objetos bajo demanda; `desde`
+    filtra por la columna de fechas sin construir los que descarta.
+
+    `quitar` solo olvida la fila; cuando las filas muertas superan a las
+    vivas, las columnas se reescriben con las vivas.
+    """
+
+    def __init__(self):
+        self._vaciar()
+
+    def _vaciar(self):
+        self.ids = array("q")
+        self.mesas = array("i")
+        self.estados = array("b")
+        self.creadores = array("i")      # índice en self._nombres_creador
+        self.produccion = array("q")
+        self.totales = array("d")
+        self.creados = array("d")
+        self.inicio_lineas = array("q", [0])
+        self.productos = array("i")
+        self.cantidades = array("i")
+        self.precios = array("d")
+        self._nombres_creador: List[str] = []
+        self._ids_creador: Dict[str, int] = {}
+        self._filas: Dict[int, int] = {}                    # pedido_id -> fila viva
+        self._por_mesa: Dict[int, Dict[int, None]] = {}     # mesa -> ids vivos
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def __contains__(self, pedido_id: int) -> bool:
+        return pedido_id in self._filas
+
+    def _id_creador(self, nombre: str) -> int:
+        creador_id = self._ids_creador.get(nombre)
+        if creador_id is None:
+            creador_id = self._ids_creador[nombre] = len(self._nombres_creador)
+            self._nombres_creador.append(nombre)
+        return creador_id
+
+    def agregar(self, p: Pedido):
+        self._filas[p.id] = len(self.ids)
+        self._por_mesa.setdefault(p.mesa_numero, {})[p.id] = None
+        self.ids.append(p.id)
+        self.mesas.append(p.mesa_numero)
+        self.estados.append(_CODIGO_ESTADO[p.estado])
+        self.creadores.append(self._id_creador(p.creado_por))
+        self.produccion.append(p.produccion)
+        self.totales.append(p.total)
+        self.creados.append(p.creado_en)
+        for linea in p.items:
+            self.productos.append(linea.producto_id)
+            self.cantidades.append(linea.cantidad)
+            self.precios.append(linea.precio)
+        self.inicio_lineas.append(len(self.productos))
+
+    def pedido(self, i: int) -> Pedido:
+        desde, hasta = self.inicio_lineas[i], self.inicio_lineas[i + 1]
+        return Pedido(
+            id=self.ids[i],
+            mesa_numero=self.mesas[i],
+            items=[
+                LineaPedido(self.productos[j], self.cantidades[j], self.precios[j])
+                for j in range(desde, hasta)
+            ],
+            estado=ESTADOS_PEDIDO[self.estados[i]],
+            creado_por=self._nombres_creador[self.creadores[i]],
+            produccion=self.produccion[i],
+            total=self.totales[i],
+            creado_en=self.creados[i],
+        )
+
+    def obtener(self, pedido_id: int) -> Optional[Pedido]:
+        fila = self._filas.get(pedido_id)
+        return None if fila is None else self.pedido(fila)
+
+    def de_mesa(self, mesa_num: int) -> List[Pedido]:
+        """Pedidos de la mesa ordenados por id."""
+        return [self.pedido(self._filas[i]) for i in sorted(self._por_mesa.get(mesa_num, ()))]
+
+    def desde(self, creado_en: float) -> List[Pedido]:
+        """Pedidos creados desde `creado_en`, ordenados por id."""
+        creados = self.creados
+        filas = [fila for fila in self._filas.values() if creados[fila] >= creado_en]
+        return sorted((self.pedido(fila) for fila in filas), key=lambda p: p.id)
+
+    def quitar(self, pedido_id: int) -> Optional[Pedido]:
+        fila = self._filas.pop(pedido_id, None)
+        if fila is None:
+            return None
+        p = self.pedido(fila)
+        ids_mesa = self._por_mesa[p.mesa_numero]
+        del ids_mesa[pedido_id]
+        if not ids_mesa:
+            del self._por_mesa[p.mesa_numero]
+        if len(self.ids) - len(self._filas) > len(self._filas):
+            self._compactar()
+        return p
+
+    def _compactar(self):
+        vivos = [self.pedido(fila) for fila in sorted(self._filas.values())]
+        self._vaciar()
+        for p in vivos:
+            self.agregar(p)
+
+    def __iter__(self) -> Iterator[Pedido]:
+        for fila in sorted(self._filas.values()):
+            yield self.pedido(fila)
+
+    def bytes_usados(self) -> int:
+        columnas = (
+            self.ids, self.mesas, self.estados, self.creadores, self.produccion, self.totales, self.creados,
+            self.inicio_lineas, self.productos, self.cantidades, self.precios,
+        )
+        return sum(col.buffer_info()[1] * col.itemsize for col in columnas)
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .repositorio import Repositorio
+
+
+# ============================================================
+#  MENÚ CACHEADO (opciones del formulario de pedidos)
+# ============================================================
+
+NINGUNO = "-- Ninguno --"
+
+
+def etiqueta_producto(nombre: str, info: Dict[str, float]) -> str:
+    return f"{nombre} (stock: {info['stock']}, precio: ${info['precio']})"
+
+
+@dataclass(slots=True, frozen=True)
+class OpcionesCategoria:
+    """Todo lo que necesita el select de una categoría, calculado una sola vez."""
+    version: int
+    etiquetas: List[str]                  # primera opción: NINGUNO
+    nombre_por_etiqueta: Dict[str, str]
+    stock: Dict[str, int]                 # nombre -> stock al construir las opciones
+    precio: Dict[str, float]
+
+
+def construir_opciones(version: int, productos: Dict[str, Dict[str, float]]) -> OpcionesCategoria:
+    etiquetas = [NINGUNO]
+    nombre_por_etiqueta: Dict[str, str] = {}
+    stock: Dict[str, int] = {}
+    precio: Dict[str, float] = {}
+    for nombre, info in productos.items():
+        etiqueta = etiqueta_producto(nombre, info)
+        etiquetas.append(etiqueta)
+        nombre_por_etiqueta[etiqueta] = nombre
+        stock[nombre] = info["stock"]
+        precio[nombre] = info["precio"]
+    return OpcionesCategoria(version, etiquetas, nombre_por_etiqueta, stock, precio)
+
+
+class MenuCacheado:
+    """Opciones por categoría que solo se recalculan cuando su inventario cambia.
+
+    Cada categoría guarda la versión de inventario con la que se construyó;
+    si `repo.version_inventario(tipo)` sigue igual, el rerun reutiliza las
+    listas sin consultar el inventario ni formatear etiquetas. Un pedido de
+    bebidas solo invalida las opciones de bebidas.
+
+    La versión se lee antes que los datos: si el inventario cambia mientras
+    se construyen las opciones, la versión guardada ya quedó vieja y la
+    siguiente llamada las reconstruye.
+    """
+
+    def __init__(self, repo: Repositorio):
+        self._repo = repo
+        self._categorias: Optional[Tuple[int, List[str]]] = None
+        self._opciones: Dict[str, OpcionesCategoria] = {}
+
+    def categorias(self) -> List[str]:
+        version = self._repo.version_inventario()
+        cache = self._categorias
+        if cache is None or cache[0] != version:
+            cache = self._categorias = (version, self._repo.categorias_inventario())
+        return cache[1]
+
+    def opciones(self, tipo: str) -> OpcionesCategoria:
+        version = self._repo.version_inventario(tipo)
+        cache = self._opciones.get(tipo)
+        if cache is None or cache.version != version:
+            # Dos sesiones pueden reconstruir a la vez: gana la última y da igual cuál
+            cache = construir_opciones(version, self._repo.obtener_categoria(tipo))
+            self._opciones[tipo] = cache
+        return cache
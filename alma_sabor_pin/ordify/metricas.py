@@ -0,0 +1,258 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# ============================================================
+#  HISTOGRAMAS DE LATENCIA
+# ============================================================
+# Cubetas logarítmicas fijas (factor 2^(1/4), ~19 % de error máximo en los
+# percentiles) desde 1 µs hasta ~2 min: registrar una observación es un
+# bisect sobre una tupla y un incremento, sin guardar muestras.
+
+LIMITES: Tuple[float, ...] = tuple(1e-6 * 2 ** (i / 4) for i in range(108))
+
+
+class Histograma:
+    __slots__ = ("cuentas", "total", "suma", "maximo")
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES) + 1)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos: float):
+        self.cuentas[bisect_left(LIMITES, segundos)] += 1
+        self.total += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, q: float) -> float:
+        """Límite superior de la cubeta que contiene el percentil q (0-1), acotado por el máximo."""
+        if not self.total:
+            return 0.0
+        objetivo = q * self.total
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(LIMITES[i] if i < len(LIMITES) else self.maximo, self.maximo)
+        return self.maximo
+
+
+# ============================================================
+#  REGISTRO DE MÉTRICAS (por función y por rerun)
+# ============================================================
+
+# Llamadas del rerun en curso: nombre -> [llamadas, segundos]
+_RERUN: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar("ordify_rerun", default=None)
+
+
+class RegistroMetricas:
+    """Latencias y conteos por sección, con una pequeña sobrecarga (~1 µs por medición).
+
+    Cada sección medida (vista, función de negocio o bloque) tiene su
+    histograma. Los reruns completos se registran aparte ("rerun:<nombre>")
+    y cuentan cuántas veces se llamó a cada sección, para poder ver
+    "llamadas por rerun" además de la latencia.
+    """
+
+    def __init__(self, activo: bool = True):
+        self.activo = activo
+        self._lock = threading.Lock()
+        self._secciones: Dict[str, Histograma] = {}
+        self._valores: Dict[str, float] = {}   # medidas instantáneas (tamaños), ver fijar
+        self._reruns = 0
+        self.desde = time.time()
+
+    def observar(self, nombre: str, segundos: float):
+        with self._lock:
+            histograma = self._secciones.get(nombre)
+            if histograma is None:
+                histograma = self._secciones[nombre] = Histograma()
+            histograma.observar(segundos)
+        rerun = _RERUN.get()
+        if rerun is not None:
+            acumulado = rerun.get(nombre)
+            if acumulado is None:
+                rerun[nombre] = [1, segundos]
+            else:
+                acumulado[0] += 1
+                acumulado[1] += segundos
+
+    @contextmanager
+    def medir(self, nombre: str):
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio)
+
+    @contextmanager
+    def medir_rerun(self, nombre: str):
+        """Mide un rerun completo; entrega el desglose {sección: [llamadas, segundos]} del rerun."""
+        desglose: Dict[str, List[float]] = {}
+        if not self.activo:
+            yield desglose
+            return
+        token = _RERUN.set(desglose)
+        inicio = time.perf_counter()
+        try:
+            yield desglose
+        finally:
+            _RERUN.reset(token)
+            self.observar(f"rerun:{nombre}", time.perf_counter() - inicio)
+            with self._lock:
+                self._reruns += 1
+
+    def medido(self, nombre: Optional[str] = None) -> Callable:
+        """Decorador: mide cada llamada de la función bajo `nombre` (por defecto, su nombre)."""
+        def decorador(fn: Callable) -> Callable:
+            seccion = nombre or fn.__name__
+
+            @functools.wraps(fn)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return fn(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observar(seccion, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+
+    def fijar(self, nombre: str, valor: float):
+        """Medida instantánea (p. ej. tamaño del conjunto de trabajo); se exporta como gauge."""
+        with self._lock:
+            self._valores[nombre] = valor
+
+    def valores(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._valores)
+
+    def reiniciar(self):
+        """Borra latencias, reruns y gauges; los gauges reaparecen con el próximo fijar."""
+        with self._lock:
+            self._secciones.clear()
+            self._valores.clear()
+            self._reruns = 0
+            self.desde = time.time()
+
+    # ----------------------- CONSULTA Y EXPORTACIÓN -----------------------
+
+    def resumen(self) -> List[Dict[str, float]]:
+        """Una fila por sección, de la más lenta (p95) a la más rápida."""
+        with self._lock:
+            secciones = [(nombre, h.total, h.suma, h.maximo, list(h.cuentas)) for nombre, h in self._secciones.items()]
+            reruns = self._reruns
+        filas = []
+        for nombre, total, suma, maximo, cuentas in secciones:
+            h = Histograma()
+            h.cuentas, h.total, h.suma, h.maximo = cuentas, total, suma, maximo
+            filas.append({
+                "seccion": nombre,
+                "llamadas": total,
+                "por_rerun": total / reruns if reruns and not nombre.startswith("rerun:") else 0.0,
+                "p50_ms": h.percentil(0.50) * 1000,
+                "p95_ms": h.percentil(0.95) * 1000,
+                "p99_ms": h.percentil(0.99) * 1000,
+                "max_ms": maximo * 1000,
+                "total_s": suma,
+            })
+        filas.sort(key=lambda f: f["p95_ms"], reverse=True)
+        return filas
+
+    def a_prometheus(self, prefijo: str = "ordify") -> str:
+        """Formato de texto de Prometheus (histograma con cubetas de factor 2)."""
+        with self._lock:
+            secciones = [(nombre, list(h.cuentas), h.total, h.suma) for nombre, h in sorted(self._secciones.items())]
+            reruns = self._reruns
+            valores = sorted(self._valores.items())
+        metrica = f"{prefijo}_seccion_segundos"
+        lineas = [
+            f"# HELP {metrica} Latencia por sección (vista, función de negocio o rerun).",
+            f"# TYPE {metrica} histogram",
+        ]
+        for nombre, cuentas, total, suma in secciones:
+            etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+            acumulado = 0
+            for i, cuenta in enumerate(cuentas[:-1]):
+                acumulado += cuenta
+                if i % 4 == 3:
+                    lineas.append(f'{metrica}_bucket{{seccion="{etiqueta}",le="{LIMITES[i]:.6g}"}} {acumulado}')
+            lineas.append(f'{metrica}_bucket{{seccion="{etiqueta}",le="+Inf"}} {total}')
+            lineas.append(f'{metrica}_sum{{seccion="{etiqueta}"}} {suma:.9f}')
+            lineas.append(f'{metrica}_count{{seccion="{etiqueta}"}} {total}')
+        lineas += [
+            f"# HELP {prefijo}_reruns_total Reruns completos medidos.",
+            f"# TYPE {prefijo}_reruns_total counter",
+            f"{prefijo}_reruns_total {reruns}",
+        ]
+        if valores:
+            lineas += [
+                f"# HELP {prefijo}_valor Medidas instantáneas (tamaño del conjunto de trabajo).",
+                f"# TYPE {prefijo}_valor gauge",
+            ]
+            lineas += [f'{prefijo}_valor{{nombre="{nombre}"}} {valor:.15g}' for nombre, valor in valores]
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta: str):
+        """Escribe el texto de Prometheus de forma atómica (para el textfile collector)."""
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        tmp = ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.a_prometheus())
+        os.replace(tmp, ruta)
+
+    def exportar_periodicamente(self, ruta: str, intervalo: float = 15.0) -> threading.Thread:
+        def bucle():
+            while True:
+                time.sleep(intervalo)
+                self.exportar(ruta)
+        hilo = threading.Thread(target=bucle, name="ordify-metricas-archivo", daemon=True)
+        hilo.start()
+        return hilo
+
+    def servir_prometheus(self, puerto: int, host: str = "127.0.0.1"):
+        """Endpoint /metrics en un hilo aparte (Streamlit no expone rutas propias)."""
+        # Import diferido: http.server pesa más que el resto del módulo y casi nunca se usa
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registro = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = registro.a_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        threading.Thread(target=servidor.serve_forever, name="ordify-metricas-http", daemon=True).start()
+        return servidor
+
+
+# Registro del proceso; ORDIFY_METRICAS=0 lo apaga (los decoradores quedan como un if)
+METRICAS = RegistroMetricas(activo=os.environ.get("ORDIFY_METRICAS", "1") != "0")
+medido = METRICAS.medido
+medir = METRICAS.medir
+medir_rerun = METRICAS.medir_rerun
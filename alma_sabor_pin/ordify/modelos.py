@@ -0,0 +1,188 @@
+import json
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .catalogo import CATALOGO
+
+
+# ============================================================
+#  CLASES BASE (pensadas para futura integración con SQL)
+# ============================================================
+# Todas usan __slots__: sin __dict__ por instancia, un turno (o una semana)
+# de pedidos en memoria ocupa una fracción de lo que ocupaba con dicts.
+
+# Estado de producción por estación, codificado en 2 bits por estación
+ESTADOS_PRODUCCION = ("", "pendiente", "enviado", "cancelado")
+_CODIGO_PRODUCCION = {estado: codigo for codigo, estado in enumerate(ESTADOS_PRODUCCION)}
+
+
+def codificar_produccion(estados: Dict[str, str]) -> int:
+    """{"comida_italiana": "pendiente", ...} -> entero con 2 bits por estación."""
+    codigo = 0
+    for tipo, estado in estados.items():
+        codigo |= _CODIGO_PRODUCCION[estado] << (2 * CATALOGO.id_estacion(tipo))
+    return codigo
+
+
+@dataclass(slots=True)
+class Usuario:
+    rol: str
+    nombre: str             # el PIN no vive aquí: ver seguridad.AlmacenUsuarios
+
+
+@dataclass(slots=True)
+class Mesa:
+    numero: int
+    comensales: int
+    estado: str = "activa"  # activa, cerrada, etc.
+    id: int = 0             # ocupación de la mesa (el número se reutiliza, el id no)
+
+
+@dataclass(slots=True)
+class LineaPedido:
+    producto_id: int        # id del CATALOGO (tipo y nombre se resuelven desde ahí)
+    cantidad: int
+    precio: float = 0.0     # precio unitario al momento del pedido
+
+    @classmethod
+    def crear(cls, tipo: str, nombre: str, cantidad: int, precio: float = 0.0) -> "LineaPedido":
+        return cls(CATALOGO.id_producto(tipo, nombre), cantidad, precio)
+
+    @property
+    def tipo(self) -> str:
+        return CATALOGO.producto(self.producto_id)[0]
+
+    @property
+    def nombre(self) -> str:
+        return CATALOGO.producto(self.producto_id)[1]
+
+    @property
+    def subtotal(self) -> float:
+        return self.precio * self.cantidad
+
+
+@dataclass(slots=True)
+class Pedido:
+    id: int
+    mesa_numero: int
+    items: List[LineaPedido]
+    estado: str = "pendiente"            # pendiente, entregado, cancelado
+    creado_por: str = ""
+    produccion: int = 0                  # 2 bits por estación, ver produccion_estados
+    total: float = 0.0                   # suma de precio * cantidad con los precios del momento del pedido
+    creado_en: float = 0.0               # epoch (time.time()) de la confirmación; antigüedad en las colas
+
+    @property
+    def produccion_estados(self) -> Dict[str, str]:
+        """{"comida_italiana": "pendiente"|"enviado"|"cancelado", ...} (copia de solo lectura)."""
+        estados: Dict[str, str] = {}
+        codigo = self.produccion
+        estacion_id = 0
+        while codigo:
+            if codigo & 3:
+                estados[CATALOGO.estacion(estacion_id)] = ESTADOS_PRODUCCION[codigo & 3]
+            codigo >>= 2
+            estacion_id += 1
+        return estados
+
+    def estado_produccion(self, tipo: str) -> Optional[str]:
+        codigo = (self.produccion >> (2 * CATALOGO.id_estacion(tipo))) & 3
+        return ESTADOS_PRODUCCION[codigo] or None
+
+    def copiar(self) -> "Pedido":
+        """Copia con sus propias líneas (más barata que dataclasses.replace en cada publicación)."""
+        return Pedido(
+            self.id, self.mesa_numero,
+            [LineaPedido(linea.producto_id, linea.cantidad, linea.precio) for linea in self.items],
+            self.estado, self.creado_por, self.produccion, self.total, self.creado_en,
+        )
+
+    def fijar_estado_produccion(self, tipo: str, estado: str):
+        desplazamiento = 2 * CATALOGO.id_estacion(tipo)
+        self.produccion = (
+            self.produccion & ~(3 << desplazamiento)
+        ) | (_CODIGO_PRODUCCION[estado] << desplazamiento)
+
+
+@dataclass(slots=True)
+class Pago:
+    id: int
+    mesa_numero: int
+    cuenta: int                          # Mesa.id de la ocupación que se cobra
+    importe: float
+    cobrado_por: str = ""
+    comensal: int = 0                    # 1..comensales; 0 = a cuenta de la mesa
+    lineas: List[Tuple[int, int, int]] = field(default_factory=list)   # (pedido_id, orden, unidades) cobradas por ítem
+    creado_en: float = 0.0
+
+
+def lineas_desde_items(items_list: Iterable[Dict]) -> List[LineaPedido]:
+    """Convierte los items del formulario ({nombre, cantidad, tipo}) en líneas compactas.
+
+    Solo acepta productos ya registrados en el CATALOGO (KeyError si no).
+    """
+    return [LineaPedido(CATALOGO.buscar_producto(it["tipo"], it["nombre"]), int(it["cantidad"])) for it in items_list]
+
+
+def pedido_a_dict(p: Pedido) -> Dict:
+    """Forma plana (JSON) de un pedido: para la bitácora, instantáneas y la API."""
+    return {
+        "id": p.id,
+        "mesa_numero": p.mesa_numero,
+        "items": [[linea.tipo, linea.nombre, linea.cantidad, linea.precio] for linea in p.items],
+        "estado": p.estado,
+        "creado_por": p.creado_por,
+        "produccion": p.produccion_estados,
+        "total": p.total,
+        "creado_en": p.creado_en,
+    }
+
+
+def pedido_desde_dict(datos: Dict) -> Pedido:
+    return Pedido(
+        id=datos["id"],
+        mesa_numero=datos["mesa_numero"],
+        items=[LineaPedido.crear(tipo, nombre, cantidad, precio) for tipo, nombre, cantidad, precio in datos["items"]],
+        estado=datos["estado"],
+        creado_por=datos["creado_por"],
+        produccion=codificar_produccion(datos["produccion"]),
+        total=datos["total"],
+        creado_en=datos.get("creado_en", 0.0),   # bitácoras anteriores no lo traen
+    )
+
+
+def comprimir_pedidos(pedidos: Iterable[Pedido]) -> bytes:
+    """Pedidos terminados en un bloque zlib(JSON) para el archivo frío (ver repositorio.archivar_pedidos)."""
+    texto = json.dumps([pedido_a_dict(p) for p in pedidos], ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(texto.encode("utf-8"))
+
+
+def descomprimir_pedidos(bloque: bytes) -> List[Pedido]:
+    return [pedido_desde_dict(datos) for datos in json.loads(zlib.decompress(bloque))]
+
+
+def pago_a_dict(p: Pago) -> Dict:
+    return {
+        "id": p.id,
+        "mesa_numero": p.mesa_numero,
+        "cuenta": p.cuenta,
+        "importe": p.importe,
+        "cobrado_por": p.cobrado_por,
+        "comensal": p.comensal,
+        "lineas": [list(linea) for linea in p.lineas],
+        "creado_en": p.creado_en,
+    }
+
+
+def pago_desde_dict(datos: Dict) -> Pago:
+    return Pago(
+        id=datos["id"],
+        mesa_numero=datos["mesa_numero"],
+        cuenta=datos["cuenta"],
+        importe=datos["importe"],
+        cobrado_por=datos["cobrado_por"],
+        comensal=datos["comensal"],
+        lineas=[(pedido_id, orden, unidades) for pedido_id, orden, unidades in datos["lineas"]],
+        creado_en=datos["creado_en"],
+    )
@@ -0,0 +1,176 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from .modelos import Mesa, Pago
+from .repositorio import Repositorio
+from .tablas import Tabla
+
+
+# ============================================================
+#  LIBRO DE CUENTA POR MESA (división y pagos parciales)
+# ============================================================
+# Cada mesa abierta tiene un libro: sus líneas cobrables (pedidos no
+# cancelados, con el precio capturado al pedir) y los pagos registrados.
+# Las líneas solo se vuelven a leer si cambian los pedidos o las mesas; un
+# pago nuevo reaplica los pagos sobre las líneas ya cargadas. Dividir la
+# cuenta (partes iguales, por comensal, por ítem) recorre las líneas del
+# libro, nunca los pedidos.
+
+ClaveLinea = Tuple[int, int]   # (pedido_id, orden de la línea en el pedido)
+
+
+def repartir(importe: float, partes: int) -> List[float]:
+    """Divide `importe` en `partes` que suman exactamente lo mismo (los centavos sobrantes van a las primeras)."""
+    if partes < 1:
+        raise ValueError("Debe haber al menos una parte.")
+    base, resto = divmod(round(importe * 100), partes)
+    return [(base + (1 if i < resto else 0)) / 100 for i in range(partes)]
+
+
+@dataclass(slots=True, frozen=True)
+class LineaCuenta:
+    pedido_id: int
+    orden: int
+    tipo: str
+    nombre: str
+    cantidad: int
+    precio: float
+    pagadas: int = 0        # unidades ya cobradas por ítem
+
+    @property
+    def clave(self) -> ClaveLinea:
+        return (self.pedido_id, self.orden)
+
+    @property
+    def pendientes(self) -> int:
+        return self.cantidad - self.pagadas
+
+    @property
+    def pendiente(self) -> float:
+        return round(self.precio * self.pendientes, 2)
+
+
+@dataclass(slots=True, frozen=True)
+class LibroCuenta:
+    mesa: Mesa
+    version: Hashable                   # (version_mesas, version_pedidos, version_pagos) al armarlo
+    cargos: Tuple[LineaCuenta, ...]     # líneas sin pagos aplicados (base para reaplicarlos)
+    lineas: Tuple[LineaCuenta, ...]     # con las unidades pagadas por ítem
+    pagos: Tuple[Pago, ...]
+    total: float                        # suma de los totales guardados de los pedidos
+    pagado: float
+    tabla: Tabla
+
+    @property
+    def saldo(self) -> float:
+        return round(max(self.total - self.pagado, 0.0), 2)
+
+    def comensales_con_pago(self) -> List[int]:
+        return sorted({p.comensal for p in self.pagos if p.comensal})
+
+    def partes_iguales(self, partes: int) -> List[float]:
+        return repartir(self.saldo, partes)
+
+    def por_comensal(self, asignacion: Mapping[ClaveLinea, Sequence[int]]) -> Dict[int, float]:
+        """Saldo de cada comensal según a quién se asignó cada línea.
+
+        Una línea compartida se reparte en partes iguales entre sus
+        comensales; lo ya cobrado a un comensal se le descuenta. La clave 0
+        es lo que queda sin asignar, de modo que la suma es el saldo.
+        """
+        montos: Dict[int, float] = {c: 0.0 for c in range(1, self.mesa.comensales + 1)}
+        for linea in self.lineas:
+            comensales = [c for c in asignacion.get(linea.clave, ()) if c in montos]
+            if not comensales or not linea.pendientes:
+                continue
+            for comensal, parte in zip(comensales, repartir(linea.pendiente, len(comensales))):
+                montos[comensal] += parte
+        for pago in self.pagos:
+            if pago.comensal in montos and not pago.lineas:
+                montos[pago.comensal] -= pago.importe
+        montos = {c: round(max(m, 0.0), 2) for c, m in montos.items()}
+        montos[0] = round(max(self.saldo - sum(montos.values()), 0.0), 2)
+        return montos
+
+    def importe_items(self, seleccion: Mapping[ClaveLinea, int]) -> float:
+        """Importe de cobrar esas unidades; ValueError si alguna línea no existe o no tiene tantas pendientes."""
+        lineas = {linea.clave: linea for linea in self.lineas}
+        importe = 0.0
+        for clave, unidades in seleccion.items():
+            linea = lineas.get(tuple(clave))
+            if linea is None:
+                raise ValueError(f"La línea {clave} no pertenece a la cuenta de la mesa {self.mesa.numero}.")
+            if not 0 < unidades <= linea.pendientes:
+                raise ValueError(f"{linea.nombre}: quedan {linea.pendientes} unidad(es) por cobrar.")
+            importe += linea.precio * unidades
+        return round(importe, 2)
+
+
+def armar_libro(mesa: Mesa, cargos: Tuple[LineaCuenta, ...], total: float,
+                pagos: Sequence[Pago], version: Hashable) -> LibroCuenta:
+    """O(líneas + pagos): aplica los pagos por ítem sobre las líneas y arma la tabla de la cuenta."""
+    pagadas: Dict[ClaveLinea, int] = {}
+    for pago in pagos:
+        for pedido_id, orden, unidades in pago.lineas:
+            pagadas[(pedido_id, orden)] = pagadas.get((pedido_id, orden), 0) + unidades
+    lineas = tuple(
+        replace(c, pagadas=pagadas[c.clave]) if c.clave in pagadas else c
+        for c in cargos
+    )
+    filas = [
+        {
+            "Pedido ID": linea.pedido_id,
+            "Tipo": linea.tipo.replace("_", " ").title(),
+            "Producto": linea.nombre,
+            "Cantidad": linea.cantidad,
+            "Precio": linea.precio,
+            "Subtotal": round(linea.precio * linea.cantidad, 2),
+            "Pagadas": linea.pagadas,
+        }
+        for linea in lineas
+    ]
+    pagado = round(sum(p.importe for p in pagos), 2)
+    return LibroCuenta(mesa, version, cargos, lineas, tuple(pagos), total, pagado, Tabla(version, filas))
+
+
+class LibrosCuenta:
+    """Libro de cada mesa, reconstruido por partes según qué versión cambió.
+
+    - version_mesas o version_pedidos distinta: se leen los pedidos de esa
+      mesa (índice por mesa) y se arman sus líneas.
+    - Solo version_pagos distinta: se reaplican los pagos de la mesa sobre
+      las líneas ya cargadas, sin tocar los pedidos.
+    - Nada cambió: se devuelve el mismo libro.
+    """
+
+    def __init__(self, repo: Repositorio):
+        self._repo = repo
+        self._libros: Dict[int, LibroCuenta] = {}
+
+    def libro(self, mesa_num: int, fresco: bool = False) -> Optional[LibroCuenta]:
+        """Libro de la mesa (None si no existe); `fresco` ignora la caché (validar dentro de una transacción)."""
+        repo = self._repo
+        # Versiones antes que los datos: si algo cambia en medio, el próximo llamado lo rehace
+        sala = (repo.version_mesas(), repo.version_pedidos())
+        version = (*sala, repo.version_pagos())
+        libro = None if fresco else self._libros.get(mesa_num)
+        if libro is not None and libro.version == version:
+            return libro
+        if libro is not None and libro.version[:2] == sala:
+            mesa, cargos, total = libro.mesa, libro.cargos, libro.total
+        else:
+            mesa = repo.obtener_mesa(mesa_num)
+            if mesa is None:
+                self._libros.pop(mesa_num, None)
+                return None
+            pedidos = repo.pedidos_de_mesa(mesa_num, excluir_estado="cancelado")
+            cargos = tuple(
+                LineaCuenta(p.id, orden, it.tipo, it.nombre, it.cantidad, it.precio)
+                for p in pedidos
+                for orden, it in enumerate(p.items)
+            )
+            total = round(sum(p.total for p in pedidos), 2)
+        libro = armar_libro(mesa, cargos, total, repo.pagos_de_mesa(mesa_num), version)
+        if not fresco:
+            self._libros[mesa_num] = libro
+        return libro
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# ============================================================
+#  POOL DE CONEXIONES (DB-API: sqlite3 hoy, pyodbc/SQL Server mañana)
+# ============================================================
+
+class PoolAgotado(TimeoutError):
+    """No se liberó ninguna conexión dentro del tiempo de espera."""
+
+
+class _Entrada:
+    __slots__ = ("conn", "ultimo_uso")
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self.ultimo_uso = time.monotonic()
+
+
+class _Espera:
+    """Hilo esperando conexión: se le entrega directamente al liberarse una (orden FIFO)."""
+    __slots__ = ("evento", "entrada")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.entrada: Optional[_Entrada] = None
+
+
+class PoolConexiones:
+    """Pool de tamaño fijo de conexiones DB-API, compartido por todas las sesiones.
+
+    - Las conexiones se crean bajo demanda con `fabrica()` hasta `tamano`.
+    - El préstamo es por hilo: si el hilo ya tiene una conexión (p. ej. dentro
+      de una transacción), `conexion()` devuelve la misma.
+    - Antes de prestar una conexión ociosa más de `verificar_cada` segundos se
+      ejecuta `consulta_salud`; si falla se descarta y se crea otra.
+    - Si no hay conexiones libres, los hilos esperan en cola FIFO y cada
+      conexión devuelta se entrega al que más tiempo lleva esperando.
+    - `metricas()` expone préstamos, esperas y tiempo de uso.
+    """
+
+    def __init__(
+        self,
+        fabrica: Callable[[], Any],
+        tamano: int = 5,
+        timeout: float = 5.0,
+        verificar_cada: float = 30.0,
+        consulta_salud: str = "SELECT 1",
+    ):
+        self._fabrica = fabrica
+        self._tamano = max(1, tamano)
+        self._timeout = timeout
+        self._verificar_cada = verificar_cada
+        self._consulta_salud = consulta_salud
+
+        self._libres: List[_Entrada] = []          # pila: se reutiliza la más reciente
+        self._esperando: Deque[_Espera] = deque()
+        self._lock = threading.Lock()
+        self._creadas = 0
+        self._local = threading.local()
+        self._cerrado = False
+
+        self._prestamos = 0
+        self._descartadas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._uso_total = 0.0
+        self._en_uso = 0
+
+    # ----------------------- PRÉSTAMO -----------------------
+
+    @contextmanager
+    def conexion(self):
+        actual: Optional[_Entrada] = getattr(self._local, "entrada", None)
+        if actual is not None:
+            # Préstamo anidado en el mismo hilo: misma conexión
+            yield actual.conn
+            return
+
+        entrada = self._tomar()
+        self._local.entrada = entrada
+        inicio = time.perf_counter()
+        try:
+            yield entrada.conn
+        finally:
+            self._local.entrada = None
+            self._devolver(entrada, time.perf_counter() - inicio)
+
+    def _tomar(self) -> _Entrada:
+        if self._cerrado:
+            raise RuntimeError("El pool de conexiones está cerrado.")
+        inicio = time.perf_counter()
+        limite = inicio + self._timeout
+        while True:
+            entrada = self._obtener_o_crear(limite)
+            if self._sana(entrada):
+                break
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._prestamos += 1
+            self._en_uso += 1
+            self._espera_total += espera
+            self._espera_max = max(self._espera_max, espera)
+        return entrada
+
+    def _obtener_o_crear(self, limite: float) -> _Entrada:
+        with self._lock:
+            if self._libres:
+                return self._libres.pop()
+            crear = self._creadas < self._tamano
+            if crear:
+                self._creadas += 1
+            else:
+                espera = _Espera()
+                self._esperando.append(espera)
+
+        if crear:
+            try:
+                return _Entrada(self._fabrica())
+            except BaseException:
+                with self._lock:
+                    self._creadas -= 1
+                raise
+
+        espera.evento.wait(max(0.0, limite - time.perf_counter()))
+        with self._lock:
+            if espera.entrada is None:
+                self._esperando.remove(espera)
+                raise PoolAgotado(
+                    f"Sin conexiones libres tras {self._timeout}s (tamaño {self._tamano})."
+                )
+            return espera.entrada
+
+    def _sana(self, entrada: _Entrada) -> bool:
+        """Chequeo de salud para conexiones que llevan tiempo ociosas."""
+        if time.monotonic() - entrada.ultimo_uso < self._verificar_cada:
+            return True
+        try:
+            cursor = entrada.conn.cursor()
+            cursor.execute(self._consulta_salud)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            self._cerrar_conexion(entrada)
+            with self._lock:
+                self._creadas -= 1
+                self._descartadas += 1
+            return False
+
+    def _devolver(self, entrada: _Entrada, uso: float):
+        with self._lock:
+            self._en_uso -= 1
+            self._uso_total += uso
+        if getattr(entrada.conn, "in_transaction", False):
+            # Una excepción dejó la transacción abierta: no contaminar al siguiente
+            entrada.conn.rollback()
+        entrada.ultimo_uso = time.monotonic()
+        if self._cerrado:
+            self._cerrar_conexion(entrada)
+            return
+        with self._lock:
+            if self._esperando:
+                espera = self._esperando.popleft()
+                espera.entrada = entrada
+                espera.evento.set()
+            else:
+                self._libres.append(entrada)
+
+    @staticmethod
+    def _cerrar_conexion(entrada: _Entrada):
+        try:
+            entrada.conn.close()
+        except Exception:
+            pass
+
+    # ----------------------- ADMINISTRACIÓN -----------------------
+
+    def cerrar(self):
+        self._cerrado = True
+        with self._lock:
+            libres, self._libres = self._libres, []
+        for entrada in libres:
+            self._cerrar_conexion(entrada)
+
+    def metricas(self) -> Dict[str, float]:
+        with self._lock:
+            prestamos = self._prestamos
+            return {
+                "tamano": self._tamano,
+                "creadas": self._creadas,
+                "en_uso": self._en_uso,
+                "libres": len(self._libres),
+                "esperando": len(self._esperando),
+                "prestamos": prestamos,
+                "descartadas": self._descartadas,
+                "espera_media_ms": (self._espera_total / prestamos * 1000) if prestamos else 0.0,
+                "espera_max_ms": self._espera_max * 1000,
+                "uso_medio_ms": (self._uso_total / prestamos * 1000) if prestamos else 0.0,
+            }
@@ -0,0 +1,287 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .cuentas import COLUMNAS
+from .eventos import Evento, TEMA_PEDIDOS
+from .metricas import medir
+from .modelos import Pedido
+from .repositorio import error_transitorio
+from .reservas import Clave, agrupar_cantidades
+from .tablas import Tabla
+
+if TYPE_CHECKING:
+    from .servicios import Servicios
+
+_log = logging.getLogger(__name__)
+
+
+# ============================================================
+#  PRONÓSTICO DE AGOTAMIENTO DE INVENTARIO (hilo en segundo plano)
+# ============================================================
+# El consumo de cada producto se lleva en cubetas de un minuto a partir de
+# los pedidos que pasan por el bus (propios y, con SQLite, los de otros
+# procesos vía SincronizadorProcesos). Un hilo recalcula el pronóstico
+# cuando hay pedidos nuevos o cambia el inventario; las vistas solo leen el
+# último resultado, sin recorrer pedidos en cada rerun.
+
+NIVELES = ("agotado", "critico", "bajo")
+TITULO_NIVEL = {"agotado": "Agotado", "critico": "Crítico", "bajo": "Bajo", "": ""}
+
+_I = {columna: i for i, columna in enumerate(COLUMNAS)}
+_VERSIONES = itertools.count(1)
+
+
+class ConsumoVentanas:
+    """Unidades pedidas por producto en cubetas de un minuto, para ventanas deslizantes.
+
+    Guarda como mucho una cubeta por minuto de la ventana más larga: la
+    memoria depende del número de productos, no del volumen de pedidos.
+    """
+
+    def __init__(self, ventanas: Sequence[float] = (15 * 60, 60 * 60)):
+        self.ventanas = tuple(sorted(ventanas))
+        self._cubetas: Dict[Clave, Dict[int, int]] = {}
+
+    def sumar(self, clave: Clave, cantidad: int, ts: float):
+        cubetas = self._cubetas.setdefault(clave, {})
+        minuto = int(ts // 60)
+        cubetas[minuto] = cubetas.get(minuto, 0) + cantidad
+
+    def podar(self, ahora: float):
+        limite = int((ahora - self.ventanas[-1]) // 60)
+        for cubetas in self._cubetas.values():
+            for minuto in [m for m in cubetas if m <= limite]:
+                del cubetas[minuto]
+
+    def por_hora(self, clave: Clave, ahora: float) -> List[float]:
+        """Unidades por hora de `clave` en cada ventana (misma posición que `ventanas`)."""
+        cubetas = self._cubetas.get(clave, {})
+        minuto = int(ahora // 60)
+        tasas = []
+        for ventana in self.ventanas:
+            desde = minuto - int(ventana // 60)
+            unidades = sum(c for m, c in cubetas.items() if m > desde)
+            tasas.append(max(unidades, 0) * 3600.0 / ventana)
+        return tasas
+
+
+@dataclass(slots=True, frozen=True)
+class PronosticoProducto:
+    tipo: str
+    nombre: str
+    stock: int
+    por_hora: Tuple[float, ...]          # unidades/hora en cada ventana (corta -> larga)
+    minutos_restantes: Optional[float]   # None = sin consumo reciente
+    nivel: str                           # "agotado", "critico", "bajo" o ""
+
+
+@dataclass(slots=True, frozen=True)
+class PanoramaInventario:
+    """Resultado de un recálculo: lo que muestran las vistas hasta el siguiente (ya formateado)."""
+    version: int
+    calculado_en: float
+    productos: Tuple[PronosticoProducto, ...]
+    alertas: Tuple[PronosticoProducto, ...]   # con nivel, de la más urgente a la menos urgente
+    tabla: Tabla
+
+
+def armar_panorama(ventanas: Sequence[float], productos: List[PronosticoProducto], ahora: float) -> PanoramaInventario:
+    version = next(_VERSIONES)
+    alertas = sorted(
+        (p for p in productos if p.nivel),
+        key=lambda p: (NIVELES.index(p.nivel), p.minutos_restantes or 0.0),
+    )
+    columnas = [f"Consumo/h ({int(v // 60)} min)" for v in ventanas]
+    filas = []
+    for p in productos:
+        fila = {"Tipo": p.tipo.replace("_", " ").title(), "Producto": p.nombre, "Stock": p.stock}
+        fila.update({columna: round(tasa, 1) for columna, tasa in zip(columnas, p.por_hora)})
+        fila["Se agota en"] = formatear_minutos(p.minutos_restantes)
+        fila["Alerta"] = TITULO_NIVEL[p.nivel]
+        filas.append(fila)
+    return PanoramaInventario(version, ahora, tuple(productos), tuple(alertas), Tabla(version, filas))
+
+
+def formatear_minutos(minutos: Optional[float]) -> str:
+    if minutos is None:
+        return "—"
+    if minutos < 60:
+        return f"{minutos:.0f} min"
+    return f"{minutos / 60:.1f} h"
+
+
+class VigilanteInventario:
+    """Hilo que mantiene el consumo por producto y el pronóstico de agotamiento.
+
+    - El bus solo encola el evento (O(1) en la ruta del pedido); el hilo los
+      procesa cada `revision` segundos.
+    - Cada pedido se cuenta una vez, en el minuto en que se creó; si después
+      se cancela se descuenta. Un pedido eliminado estando pendiente no se
+      descuenta (el aviso ya no trae sus líneas).
+    - La tasa de un producto es la mayor entre las ventanas: la corta
+      detecta una hora pico, la larga evita que una pausa esconda la demanda.
+    - Se recalcula si hubo pedidos, si cambió la versión del inventario
+      (reposiciones, también de otros procesos) o cada `intervalo` segundos
+      para que las tasas decaigan sin actividad.
+    """
+
+    def __init__(
+        self,
+        servicios: "Servicios",
+        ventanas: Sequence[float] = (15 * 60, 60 * 60),
+        minutos_critico: float = 30.0,
+        minutos_bajo: float = 90.0,
+        intervalo: float = 30.0,
+        revision: float = 1.0,
+    ):
+        self._servicios = servicios
+        self._repo = servicios.repo
+        self._consumo = ConsumoVentanas(ventanas)
+        self.minutos_critico = minutos_critico
+        self.minutos_bajo = minutos_bajo
+        self.intervalo = intervalo
+        self.revision = revision
+        # pedido_id -> [creado_en, cantidades, contado]; se olvida al salir de la ventana larga
+        self._vistos: Dict[int, list] = {}
+        self._eventos: "queue.SimpleQueue[Evento]" = queue.SimpleQueue()
+        self._cancelar = servicios.bus.suscribir(TEMA_PEDIDOS, self._eventos.put)
+        self._versiones: Tuple[int, ...] = ()
+        self._ultimo_calculo = 0.0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self.panorama = armar_panorama(self._consumo.ventanas, [], 0.0)
+
+    def iniciar(self) -> "VigilanteInventario":
+        self._hilo = threading.Thread(target=self._bucle, name="ordify-pronostico", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._cancelar()
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _bucle(self):
+        caliente = False
+        while True:
+            try:
+                if not caliente:
+                    self.calentar()
+                    caliente = True
+                    self.revisar(forzar=True)
+                else:
+                    self.revisar()
+            except Exception as e:
+                # Base ocupada o reiniciándose: se reintenta en la próxima revisión sin avisar;
+                # cualquier otro error se registra para que el pronóstico no quede congelado a escondidas
+                if not error_transitorio(e):
+                    _log.exception("Falló la revisión del pronóstico de inventario")
+            if self._detener.wait(self.revision):
+                return
+
+    # ----------------------- CONSUMO -----------------------
+
+    def calentar(self):
+        """Carga el consumo de la ventana larga: pedidos en curso o archivados y cuentas cobradas de hoy."""
+        desde = time.time() - self._consumo.ventanas[-1]
+        for p in self._repo.listar_pedidos():
+            if p.creado_en >= desde:
+                self._contar(p.id, p.creado_en, agrupar_cantidades(p.items), p.estado != "cancelado")
+        for p in self._repo.listar_archivados(desde):
+            self._contar(p.id, p.creado_en, agrupar_cantidades(p.items), p.estado != "cancelado")
+        archivo = self._servicios.archivo
+        if archivo is None:
+            return
+        cobrados: Dict[int, list] = {}
+        for lote in archivo.lotes(desde=date.fromtimestamp(desde)):
+            for fila in lote:
+                creado_en = float(fila[_I["creado_en"]])
+                if creado_en < desde:
+                    continue
+                _, cantidades = cobrados.setdefault(int(fila[_I["pedido"]]), [creado_en, {}])
+                clave = (fila[_I["tipo"]], fila[_I["nombre"]])
+                cantidades[clave] = cantidades.get(clave, 0) + int(fila[_I["cantidad"]])
+        for pedido_id, (creado_en, cantidades) in cobrados.items():
+            self._contar(pedido_id, creado_en, cantidades, True)
+
+    def _contar(self, pedido_id: int, creado_en: float, cantidades: Dict[Clave, int], contado: bool):
+        if pedido_id in self._vistos:
+            return
+        self._vistos[pedido_id] = [creado_en, cantidades, contado]
+        if contado:
+            for clave, cantidad in cantidades.items():
+                self._consumo.sumar(clave, cantidad, creado_en)
+
+    def _aplicar(self, evento: Evento):
+        if evento.tipo == "resincronizar":
+            # Se perdieron avisos de otros procesos: lo que falte se recupera de la base
+            self.calentar()
+            return
+        p: Optional[Pedido] = evento.pedido
+        if p is None or p.creado_en < time.time() - self._consumo.ventanas[-1]:
+            return
+        visto = self._vistos.get(p.id)
+        if visto is None:
+            self._contar(p.id, p.creado_en, agrupar_cantidades(p.items), p.estado != "cancelado")
+        elif visto[2] and p.estado == "cancelado":
+            visto[2] = False
+            for clave, cantidad in visto[1].items():
+                self._consumo.sumar(clave, -cantidad, visto[0])
+
+    # ----------------------- PRONÓSTICO -----------------------
+
+    def _nivel(self, stock: int, minutos: Optional[float]) -> str:
+        if stock <= 0:
+            return "agotado"
+        if minutos is None:
+            return ""
+        if minutos <= self.minutos_critico:
+            return "critico"
+        if minutos <= self.minutos_bajo:
+            return "bajo"
+        return ""
+
+    def revisar(self, forzar: bool = False) -> bool:
+        """Procesa los eventos encolados y recalcula si hace falta; devuelve si recalculó."""
+        hubo_eventos = False
+        while True:
+            try:
+                evento = self._eventos.get_nowait()
+            except queue.Empty:
+                break
+            self._aplicar(evento)
+            hubo_eventos = True
+        categorias = self._servicios.menu.categorias()
+        versiones = tuple(self._repo.version_inventario(t) for t in categorias)
+        ahora = time.time()
+        if not (forzar or hubo_eventos or versiones != self._versiones
+                or ahora - self._ultimo_calculo >= self.intervalo):
+            return False
+        with medir("pronostico:recalcular"):
+            self._versiones = versiones
+            self._ultimo_calculo = ahora
+            self._recalcular(ahora)
+        return True
+
+    def _recalcular(self, ahora: float):
+        self._consumo.podar(ahora)
+        limite = ahora - self._consumo.ventanas[-1]
+        for pedido_id in [i for i, (creado_en, _, _) in self._vistos.items() if creado_en < limite]:
+            del self._vistos[pedido_id]
+
+        productos = []
+        for tipo, items in self._repo.obtener_inventario().items():
+            for nombre, info in items.items():
+                stock = int(info["stock"])
+                por_hora = tuple(self._consumo.por_hora((tipo, nombre), ahora))
+                tasa = max(por_hora)
+                minutos = stock / tasa * 60.0 if tasa > 0 else None
+                productos.append(PronosticoProducto(tipo, nombre, stock, por_hora, minutos, self._nivel(stock, minutos)))
+        self.panorama = armar_panorama(self._consumo.ventanas, productos, ahora)
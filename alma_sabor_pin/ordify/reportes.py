@@ -0,0 +1,214 @@
+import csv
+import importlib.util
+import io
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from .cuentas import COLUMNAS, ArchivoCuentas
+
+
+# ============================================================
+#  REPORTES DE VENTAS E INVENTARIO (recorrido por lotes del archivo)
+# ============================================================
+# El archivo se lee de a `tamano_lote` filas y cada lote se agrega sobre
+# acumuladores pequeños (uno por producto, mesero, hora...): la memoria no
+# depende de cuántos días se resumen. Con pandas instalado cada lote se
+# agrega vectorizado (groupby); sin pandas, fila por fila en Python puro.
+
+_I = {columna: i for i, columna in enumerate(COLUMNAS)}
+
+
+@dataclass(slots=True)
+class ResumenVentas:
+    desde: Optional[date]
+    hasta: Optional[date]
+    motor: str = "python"
+    lineas: int = 0
+    cuentas: int = 0
+    pedidos: int = 0
+    unidades: int = 0
+    importe: float = 0.0
+    # tabla -> clave -> [valores]; ver TABLAS para las columnas de cada una
+    acumulado: Dict[str, Dict[Any, List[float]]] = field(
+        default_factory=lambda: {nombre: {} for nombre in TABLAS}
+    )
+
+    def sumar(self, tabla: str, clave, *valores):
+        fila = self.acumulado[tabla].get(clave)
+        if fila is None:
+            self.acumulado[tabla][clave] = list(valores)
+        else:
+            for i, valor in enumerate(valores):
+                fila[i] += valor
+
+    def tabla(self, nombre: str) -> List[Dict[str, Any]]:
+        """Filas listas para mostrar o exportar, de mayor a menor importe (por_hora/por_dia en orden)."""
+        claves, valores = TABLAS[nombre]
+        filas = []
+        for clave, acumulado in self.acumulado[nombre].items():
+            fila = dict(zip(claves, clave if isinstance(clave, tuple) else (clave,)))
+            fila.update(zip(valores, acumulado))
+            fila["importe"] = round(fila["importe"], 2)
+            filas.append(fila)
+        if nombre in ("por_hora", "por_dia"):
+            return sorted(filas, key=lambda f: f[claves[0]])
+        return sorted(filas, key=lambda f: f["importe"], reverse=True)
+
+
+# tabla -> (columnas de la clave, columnas acumuladas)
+TABLAS = {
+    "por_producto": (("tipo", "nombre"), ("unidades", "importe")),
+    "por_estacion": (("tipo",), ("unidades", "importe")),
+    "por_mesero": (("creado_por",), ("pedidos", "unidades", "importe")),
+    "por_hora": (("hora",), ("pedidos", "unidades", "importe")),
+    "por_dia": (("dia",), ("cuentas", "pedidos", "importe")),
+}
+
+
+def _agregar_python(resumen: ResumenVentas, lote: List[List[str]]):
+    i_tipo, i_nombre, i_cant, i_imp = _I["tipo"], _I["nombre"], _I["cantidad"], _I["importe"]
+    i_mesero, i_hora, i_dia = _I["creado_por"], _I["hora"], _I["dia"]
+    i_ped, i_cta = _I["nuevo_pedido"], _I["nueva_cuenta"]
+    for fila in lote:
+        cantidad = int(fila[i_cant])
+        importe = float(fila[i_imp])
+        nuevo_pedido = int(fila[i_ped])
+        nueva_cuenta = int(fila[i_cta])
+        resumen.sumar("por_producto", (fila[i_tipo], fila[i_nombre]), cantidad, importe)
+        resumen.sumar("por_estacion", fila[i_tipo], cantidad, importe)
+        resumen.sumar("por_mesero", fila[i_mesero], nuevo_pedido, cantidad, importe)
+        resumen.sumar("por_hora", int(fila[i_hora]), nuevo_pedido, cantidad, importe)
+        resumen.sumar("por_dia", fila[i_dia], nueva_cuenta, nuevo_pedido, importe)
+        resumen.lineas += 1
+        resumen.cuentas += nueva_cuenta
+        resumen.pedidos += nuevo_pedido
+        resumen.unidades += cantidad
+        resumen.importe += importe
+
+
+def _agregar_pandas(resumen: ResumenVentas, df):
+    for tabla, (claves, valores) in TABLAS.items():
+        columnas = [{"unidades": "cantidad", "pedidos": "nuevo_pedido", "cuentas": "nueva_cuenta"}.get(v, v) for v in valores]
+        agrupado = df.groupby(list(claves), sort=False)[columnas].sum()
+        for clave, fila in zip(agrupado.index, agrupado.itertuples(index=False)):
+            resumen.sumar(tabla, clave.item() if hasattr(clave, "item") else clave, *fila)
+    resumen.lineas += len(df)
+    resumen.cuentas += int(df["nueva_cuenta"].sum())
+    resumen.pedidos += int(df["nuevo_pedido"].sum())
+    resumen.unidades += int(df["cantidad"].sum())
+    resumen.importe += float(df["importe"].sum())
+
+
+def resumir_ventas(archivo: ArchivoCuentas, desde: Optional[date] = None, hasta: Optional[date] = None,
+                   tamano_lote: int = 10_000, motor: str = "auto") -> ResumenVentas:
+    """Ventas por producto, estación, mesero, hora y día entre `desde` y `hasta` (inclusive).
+
+    motor: "pandas", "python" o "auto" (pandas si está instalado).
+    """
+    if motor == "auto":
+        try:
+            import pandas  # noqa: F401
+            motor = "pandas"
+        except ImportError:
+            motor = "python"
+    resumen = ResumenVentas(desde, hasta, motor)
+    if motor == "pandas":
+        import pandas as pd
+
+        tipos = {"dia": str, "cerrada_por": str, "creado_por": str, "tipo": str, "nombre": str}
+        for ruta in archivo.archivos(desde, hasta):
+            for df in pd.read_csv(ruta, chunksize=tamano_lote, dtype=tipos, keep_default_na=False):
+                _agregar_pandas(resumen, df)
+    else:
+        for lote in archivo.lotes(desde, hasta, tamano_lote):
+            _agregar_python(resumen, lote)
+    resumen.importe = round(resumen.importe, 2)
+    return resumen
+
+
+def reporte_inventario(inventario: Dict[str, Dict[str, Dict[str, float]]], resumen: ResumenVentas) -> List[Dict[str, Any]]:
+    """Stock actual junto a lo vendido en el período, por producto."""
+    vendidos = resumen.acumulado["por_producto"]
+    filas = []
+    for tipo, productos in inventario.items():
+        for nombre, info in productos.items():
+            unidades, importe = vendidos.get((tipo, nombre), (0, 0.0))
+            filas.append({
+                "tipo": tipo,
+                "nombre": nombre,
+                "stock": info["stock"],
+                "precio": info["precio"],
+                "vendidos": int(unidades),
+                "importe": round(importe, 2),
+                "valor_stock": round(info["stock"] * info["precio"], 2),
+            })
+    return filas
+
+
+# ============================================================
+#  EXPORTACIÓN (CSV siempre; Parquet si hay pyarrow)
+# ============================================================
+
+def parquet_disponible() -> bool:
+    """Sin importar pyarrow (cientos de ms): la pestaña solo decide si ofrece el botón."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def a_csv(filas: List[Dict[str, Any]]) -> bytes:
+    salida = io.StringIO()
+    if filas:
+        escritor = csv.DictWriter(salida, fieldnames=list(filas[0]))
+        escritor.writeheader()
+        escritor.writerows(filas)
+    return salida.getvalue().encode("utf-8")
+
+
+def a_parquet(filas: List[Dict[str, Any]]) -> bytes:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Exportar a Parquet requiere pyarrow (pip install pyarrow).")
+    salida = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(filas), salida)
+    return salida.getvalue()
+
+
+def exportar(resumen: ResumenVentas, directorio: str, formato: str = "csv",
+             inventario: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    """Escribe cada tabla del resumen (y el inventario, si se pasa) como <tabla>.<formato>."""
+    convertir = a_parquet if formato == "parquet" else a_csv
+    os.makedirs(directorio, exist_ok=True)
+    tablas = {nombre: resumen.tabla(nombre) for nombre in TABLAS}
+    if inventario is not None:
+        tablas["inventario"] = inventario
+    rutas = []
+    for nombre, filas in tablas.items():
+        ruta = os.path.join(directorio, f"{nombre}.{formato}")
+        with open(ruta, "wb") as f:
+            f.write(convertir(filas))
+        rutas.append(ruta)
+    return rutas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .configuracion import Configuracion
+
+    parser = argparse.ArgumentParser(description="Reporte de ventas de cierre de día")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None)
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None)
+    parser.add_argument("--salida", default="reportes")
+    parser.add_argument("--formato", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--motor", choices=("auto", "pandas", "python"), default="auto")
+    args = parser.parse_args()
+
+    config = Configuracion.desde_entorno()
+    archivo = ArchivoCuentas(os.path.join(config.directorio_datos, "cuentas"))
+    resumen = resumir_ventas(archivo, args.desde, args.hasta, motor=args.motor)
+    for ruta in exportar(resumen, args.salida, args.formato):
+        print(ruta)
+    print(f"{resumen.cuentas} cuentas, {resumen.pedidos} pedidos, ${resumen.importe:,.2f} ({resumen.motor})")
@@ -0,0 +1,261 @@
+import itertools
+import sys
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+from .modelos import Mesa, Pago, Pedido
+
+
+# ============================================================
+#  INTERFAZ DE REPOSITORIO (memoria, SQLite, SQL Server...)
+# ============================================================
+
+# Fuente única de versiones: cada cambio recibe un número nuevo y creciente
+_VERSIONES = itertools.count(1)
+
+# Pedidos que ya no cambian: candidatos a salir del conjunto activo
+ESTADOS_TERMINADOS = ("entregado", "cancelado")
+
+
+def elegir_archivables(terminados: List[Tuple[int, float]], antes_de: float, maximo: Optional[int]) -> List[int]:
+    """Ids a archivar de (id, creado_en) terminados en orden de id: los anteriores a `antes_de`
+    y, si aun así quedarían más de `maximo`, los más antiguos hasta dejar `maximo`."""
+    exceso = len(terminados) - maximo if maximo is not None else 0
+    return [pedido_id for n, (pedido_id, creado_en) in enumerate(terminados) if n < exceso or creado_en < antes_de]
+
+
+def error_transitorio(error: BaseException) -> bool:
+    """True si es la base ocupada o bloqueada por otro proceso: un hilo de fondo solo reintenta.
+
+    No importa sqlite3: si nadie lo cargó (backend en memoria), el error no puede venir de ahí.
+    """
+    sqlite3 = sys.modules.get("sqlite3")
+    if sqlite3 is None or not isinstance(error, sqlite3.OperationalError):
+        return False
+    nombre = getattr(error, "sqlite_errorname", "")
+    mensaje = str(error).lower()
+    return nombre.startswith(("SQLITE_BUSY", "SQLITE_LOCKED")) or "locked" in mensaje or "busy" in mensaje
+
+
+class Repositorio(ABC):
+    """Contrato que usan las funciones de negocio para mesas, pedidos e inventario.
+
+    Las vistas nunca hablan con una implementación concreta: así el modo en
+    memoria sigue disponible para pruebas y se puede añadir un backend de
+    SQL Server sin tocar la interfaz de usuario.
+    """
+
+    def __init__(self):
+        # tipo -> versión; la clave None cubre la lista de categorías
+        self._versiones_inventario: Dict[Optional[str], int] = {}
+        # "mesas" / "pedidos" / "pagos" -> versión
+        self._versiones_sala: Dict[str, int] = {}
+
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias operaciones en un único commit (no-op si el backend no lo necesita)."""
+        yield
+
+    # ----------------------- MESAS -----------------------
+
+    @abstractmethod
+    def listar_mesas(self) -> List[Mesa]: ...
+
+    @abstractmethod
+    def obtener_mesa(self, numero: int) -> Optional[Mesa]: ...
+
+    @abstractmethod
+    def crear_mesa(self, numero: int, comensales: int) -> bool: ...
+
+    @abstractmethod
+    def eliminar_mesa(self, numero: int): ...
+
+    # ----------------------- INVENTARIO -----------------------
+
+    @abstractmethod
+    def obtener_inventario(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Inventario {tipo: {nombre: {"stock", "precio"}}} (solo lectura)."""
+
+    @abstractmethod
+    def categorias_inventario(self) -> List[str]:
+        """Tipos de producto en el orden del menú."""
+
+    @abstractmethod
+    def obtener_categoria(self, tipo: str) -> Dict[str, Dict[str, float]]:
+        """Productos de una categoría {nombre: {"stock", "precio"}} (solo lectura)."""
+
+    @abstractmethod
+    def reponer_stock(self, items_list: List[Dict[str, Any]]) -> List[str]:
+        """Suma unidades al stock de varios productos en una sola transacción.
+
+        `items_list` usa la forma de los pedidos ({tipo, nombre, cantidad}).
+        Todo o nada: un producto desconocido (KeyError) o una cantidad no
+        positiva (ValueError) no repone ninguno. Se registra como evento
+        "inventario_repuesto". Devuelve las categorías afectadas.
+        """
+
+    def version_inventario(self, tipo: Optional[str] = None) -> int:
+        """Cambia cada vez que cambia el stock o el precio de algún producto de `tipo`.
+
+        Sin tipo, la versión de la lista de categorías. Leerla es O(1): sirve
+        para saber si una vista derivada del inventario sigue vigente.
+        """
+        return self._versiones_inventario.get(tipo, 0)
+
+    def _inventario_cambiado(self, tipos: Iterable[Optional[str]]):
+        """Invalida las vistas derivadas de esas categorías (llamar después de aplicar el cambio)."""
+        for tipo in set(tipos):
+            self._versiones_inventario[tipo] = next(_VERSIONES)
+
+    # ----------------------- VERSIONES DE MESAS Y PEDIDOS -----------------------
+
+    def version_mesas(self) -> int:
+        """Cambia cada vez que se crea o elimina una mesa (O(1), como version_inventario)."""
+        return self._versiones_sala.get("mesas", 0)
+
+    def version_pedidos(self) -> int:
+        """Cambia con cada pedido creado, modificado, cancelado o eliminado."""
+        return self._versiones_sala.get("pedidos", 0)
+
+    def version_pagos(self) -> int:
+        """Cambia con cada pago parcial registrado (y al eliminar una mesa con pagos)."""
+        return self._versiones_sala.get("pagos", 0)
+
+    def _sala_cambiada(self, tipos_evento: Iterable[str]):
+        """Invalida las vistas de mesas/pedidos/pagos según los eventos aplicados (llamar después de aplicarlos).
+
+        Los eventos "inventario_*" solo mueven version_inventario (ver _inventario_cambiado).
+        """
+        secciones = set()
+        for tipo in tipos_evento:
+            if tipo.startswith("inventario_"):
+                continue
+            if tipo.startswith("mesa_"):
+                secciones.add("mesas")
+                if tipo == "mesa_eliminada":
+                    secciones.add("pagos")   # sus pagos se descartan con ella
+            elif tipo.startswith("pago_"):
+                secciones.add("pagos")
+            else:
+                secciones.add("pedidos")
+        for seccion in secciones:
+            self._versiones_sala[seccion] = next(_VERSIONES)
+
+    def cambios_externos(self, tipos_evento: Iterable[str] = (), tipos_inventario: Iterable[Optional[str]] = ()):
+        """Avanza las versiones por cambios que otro proceso ya confirmó en el mismo almacenamiento."""
+        tipos_evento = list(tipos_evento)
+        if tipos_evento:
+            self._sala_cambiada(tipos_evento)
+        tipos_inventario = list(tipos_inventario)
+        if tipos_inventario:
+            self._inventario_cambiado(tipos_inventario)
+
+    # ----------------------- PEDIDOS -----------------------
+
+    @abstractmethod
+    def obtener_pedido(self, pedido_id: int) -> Optional[Pedido]: ...
+
+    @abstractmethod
+    def listar_pedidos(self, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        """Pedidos del conjunto activo ordenados por id, opcionalmente sin los de un estado."""
+
+    @abstractmethod
+    def pedidos_por_estado(self, estado: str) -> List[Pedido]:
+        """Solo el conjunto activo (los archivados no se listan por estado)."""
+
+    @abstractmethod
+    def pedidos_de_mesa(self, mesa_num: int, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        """Todos los pedidos de la mesa, activos y archivados, ordenados por id (para la cuenta)."""
+
+    @abstractmethod
+    def pedidos_pendientes_estacion(self, tipo: str) -> List[Pedido]: ...
+
+    @abstractmethod
+    def total_mesa(self, mesa_num: int) -> float:
+        """Total acumulado de los pedidos no cancelados de la mesa (también los archivados)."""
+
+    @abstractmethod
+    def agregar_pedido(self, mesa_num: int, items_list: List[Dict[str, Any]], creador: str) -> Pedido:
+        """Reserva el stock de todos los items, asigna id y guarda el pedido de forma atómica.
+
+        Cada línea guarda el precio vigente al momento del pedido y el pedido su
+        total. Si algún producto no alcanza lanza `StockInsuficiente` y no
+        descuenta nada. KeyError si la mesa no existe (se comprueba en la
+        misma transacción que guarda el pedido) o un producto es desconocido.
+        """
+
+    @abstractmethod
+    def actualizar_estado_pedido(self, pedido_id: int, estado: str) -> bool:
+        """Pasa un pedido pendiente a `estado`; False si no existe o ya no estaba pendiente.
+
+        Un pedido cancelado (stock devuelto) o ya entregado no cambia más.
+        """
+
+    @abstractmethod
+    def actualizar_estado_produccion(self, pedido_id: int, tipo: str, estado: str) -> bool:
+        """Pasa la estación `tipo` de un pedido pendiente de "pendiente" a `estado`.
+
+        False si el pedido no existe o ya no está pendiente (cancelado,
+        entregado, archivado), o si esa estación no tiene productos o ya envió.
+        """
+
+    @abstractmethod
+    def cancelar_pedido(self, pedido_id: int) -> bool:
+        """Marca un pedido pendiente como cancelado y devuelve su stock."""
+
+    @abstractmethod
+    def eliminar_pedido(self, pedido_id: int):
+        """Borra el pedido (activo o archivado); si seguía pendiente devuelve su stock."""
+
+    # ----------------------- ARCHIVO FRÍO -----------------------
+
+    @abstractmethod
+    def archivar_pedidos(self, antes_de: float, maximo: Optional[int] = None) -> int:
+        """Saca del conjunto activo los pedidos terminados (ver elegir_archivables).
+
+        Quedan en un almacén compacto fuera de los índices (columnas en
+        memoria, bloques zlib en SQLite): listar_pedidos,
+        pedidos_por_estado y las colas ya no los recorren, pero
+        obtener_pedido, pedidos_de_mesa, total_mesa y eliminar_pedido los
+        siguen viendo hasta que se cobra la mesa. Se registra como evento
+        "pedidos_archivados". Devuelve cuántos movió.
+        """
+
+    @abstractmethod
+    def listar_archivados(self, desde: float = 0.0) -> List[Pedido]:
+        """Pedidos archivados creados desde `desde` (recorre el archivo: no es para vistas)."""
+
+    @abstractmethod
+    def tamano_conjunto(self) -> Dict[str, int]:
+        """{"activos", "terminados_activos", "archivados", "archivo_bytes"}: tamaño del conjunto de trabajo."""
+
+    # ----------------------- PAGOS -----------------------
+
+    @abstractmethod
+    def registrar_pago(
+        self,
+        mesa_num: int,
+        importe: float,
+        cobrado_por: str,
+        comensal: int = 0,
+        lineas: Iterable[Tuple[int, int, int]] = (),
+    ) -> Pago:
+        """Anota un pago parcial de la ocupación actual de la mesa (evento "pago_registrado").
+
+        `lineas` son (pedido_id, orden, unidades) cobradas por ítem. No valida
+        contra el saldo: eso lo hace Servicios.registrar_pago dentro de una
+        transacción. KeyError si la mesa no existe.
+        """
+
+    @abstractmethod
+    def anular_pago(self, mesa_num: int, pago_id: int) -> bool:
+        """Descarta un pago de la mesa (evento "pago_anulado"); False si no estaba.
+
+        Deshace a mano un pago cuando el backend no tiene rollback (en
+        memoria, transaccion() es solo un candado).
+        """
+
+    @abstractmethod
+    def pagos_de_mesa(self, mesa_num: int) -> List[Pago]:
+        """Pagos de la ocupación actual de la mesa, en orden de registro."""
@@ -0,0 +1,499 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+from .bitacora import Bitacora
+from .catalogo import CATALOGO
+from .historial import HistorialColumnar
+from .modelos import (
+    Mesa, Pago, Pedido, codificar_produccion, lineas_desde_items,
+    pago_a_dict, pago_desde_dict, pedido_a_dict, pedido_desde_dict,
+)
+from .repositorio import ESTADOS_TERMINADOS, Repositorio, elegir_archivables
+from .reservas import MotorReservas, cantidades_reposicion
+from .secuencias import GeneradorIds
+
+
+# ============================================================
+#  REPOSITORIO EN MEMORIA (mesas + pedidos + inventario)
+# ============================================================
+
+class RepositorioMemoria(Repositorio):
+    """Estado único del restaurante, compartido por todas las sesiones.
+
+    Todas las mutaciones pasan por un mismo candado; las lecturas devuelven
+    copias de las listas para que una vista pueda iterarlas mientras otra
+    sesión registra pedidos.
+
+    Los pedidos se guardan por id y con índices secundarios (mesa, estado y
+    estación pendiente), así cada consulta de las vistas cuesta lo que mide
+    su resultado y no lo que mide el turno completo. Los terminados pasan
+    al archivo frío (un HistorialColumnar, fuera de los índices) con
+    archivar_pedidos, así la memoria del turno no crece con lo ya servido.
+
+    Con `bitacora`, cada mutación se registra como evento y se aplica con el
+    mismo código que la reproduce al arrancar: instantánea + eventos
+    posteriores. Cada `instantanea_cada` eventos se guarda una instantánea
+    nueva en segundo plano, así el reinicio no depende del volumen del día.
+    """
+
+    def __init__(
+        self,
+        inventario: Dict[str, Dict[str, Dict[str, float]]],
+        ids: Optional[GeneradorIds] = None,
+        bitacora: Optional[Bitacora] = None,
+        instantanea_cada: int = 500,
+    ):
+        super().__init__()
+        self._lock = threading.RLock()
+        self.inventario = inventario
+        CATALOGO.registrar_inventario(inventario)
+        self.ids = ids if ids is not None else GeneradorIds()
+        self.reservas = MotorReservas(inventario)
+        self._mesas: Dict[int, Mesa] = {}
+        self._pedidos: Dict[int, Pedido] = {}
+        # Índices secundarios: clave -> ids (dict usado como conjunto ordenado)
+        self._por_mesa: Dict[int, Dict[int, None]] = {}
+        self._por_estado: Dict[str, Dict[int, None]] = {}
+        self._pendientes_por_estacion: Dict[str, Dict[int, None]] = {}
+        # Total acumulado por mesa (pedidos no cancelados), mantenido en cada mutación
+        self._total_por_mesa: Dict[int, float] = {}
+        # Pagos parciales de la ocupación actual de cada mesa (se descartan al eliminarla)
+        self._pagos: Dict[int, List[Pago]] = {}
+        # Archivo frío: pedidos terminados por columnas, con índices por id y por mesa
+        self._archivo = HistorialColumnar()
+
+        # Bitácora: reservas en curso fuera del candado y congelamiento para instantáneas
+        self.bitacora = bitacora
+        self._instantanea_cada = instantanea_cada
+        self._desde_instantanea = 0
+        self._instantanea_en_curso = False
+        self._quieto = threading.Condition(self._lock)
+        self._en_vuelo = 0
+        self._congelado = False
+        self._reproduciendo = False
+        if bitacora is not None:
+            self._recuperar()
+
+    @contextmanager
+    def transaccion(self):
+        with self._lock:
+            yield
+
+    # ----------------------- MESAS -----------------------
+
+    def listar_mesas(self) -> List[Mesa]:
+        with self._lock:
+            return list(self._mesas.values())
+
+    def obtener_mesa(self, numero: int) -> Optional[Mesa]:
+        return self._mesas.get(numero)
+
+    def obtener_inventario(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return self.inventario
+
+    def categorias_inventario(self) -> List[str]:
+        return list(self.inventario)
+
+    def obtener_categoria(self, tipo: str) -> Dict[str, Dict[str, float]]:
+        return self.inventario.get(tipo, {})
+
+    def crear_mesa(self, numero: int, comensales: int) -> bool:
+        with self._lock:
+            if numero in self._mesas:
+                return False
+            datos = {"numero": numero, "comensales": comensales, "id": self.ids.siguiente("mesa")}
+            self._aplicar_mesa_creada(datos)
+            self._registrar("mesa_creada", datos)
+            return True
+
+    def eliminar_mesa(self, numero: int):
+        with self._lock:
+            if self._aplicar_mesa_eliminada({"numero": numero}):
+                self._registrar("mesa_eliminada", {"numero": numero})
+
+    def _aplicar_mesa_creada(self, datos: Dict[str, Any]):
+        self._mesas[datos["numero"]] = Mesa(numero=datos["numero"], comensales=datos["comensales"], id=datos["id"])
+
+    def _aplicar_mesa_eliminada(self, datos: Dict[str, Any]) -> bool:
+        self._pagos.pop(datos["numero"], None)
+        return self._mesas.pop(datos["numero"], None) is not None
+
+    # ----------------------- PAGOS -----------------------
+
+    def registrar_pago(
+        self,
+        mesa_num: int,
+        importe: float,
+        cobrado_por: str,
+        comensal: int = 0,
+        lineas: Iterable[Tuple[int, int, int]] = (),
+    ) -> Pago:
+        with self._lock:
+            mesa = self._mesas.get(mesa_num)
+            if mesa is None:
+                raise KeyError(f"No existe la mesa {mesa_num}")
+            pago = Pago(
+                id=self.ids.siguiente("pago"),
+                mesa_numero=mesa_num,
+                cuenta=mesa.id,
+                importe=round(importe, 2),
+                cobrado_por=sys.intern(cobrado_por),
+                comensal=comensal,
+                lineas=[tuple(linea) for linea in lineas],
+                creado_en=time.time(),
+            )
+            self._pagos.setdefault(mesa_num, []).append(pago)
+            self._registrar("pago_registrado", pago_a_dict(pago))
+            return pago
+
+    def _aplicar_pago_registrado(self, datos: Dict[str, Any]):
+        pago = pago_desde_dict(datos)
+        self._pagos.setdefault(pago.mesa_numero, []).append(pago)
+
+    def anular_pago(self, mesa_num: int, pago_id: int) -> bool:
+        with self._lock:
+            datos = {"mesa_numero": mesa_num, "id": pago_id}
+            if not self._aplicar_pago_anulado(datos):
+                return False
+            self._registrar("pago_anulado", datos)
+            return True
+
+    def _aplicar_pago_anulado(self, datos: Dict[str, Any]) -> bool:
+        pagos = self._pagos.get(datos["mesa_numero"], [])
+        restantes = [p for p in pagos if p.id != datos["id"]]
+        if len(restantes) == len(pagos):
+            return False
+        self._pagos[datos["mesa_numero"]] = restantes
+        return True
+
+    def pagos_de_mesa(self, mesa_num: int) -> List[Pago]:
+        with self._lock:
+            return list(self._pagos.get(mesa_num, ()))
+
+    # ----------------------- REPOSICIÓN -----------------------
+
+    def reponer_stock(self, items_list: List[Dict[str, Any]]) -> List[str]:
+        cantidades = cantidades_reposicion(items_list)
+        for tipo, nombre in cantidades:
+            if nombre not in self.inventario.get(tipo, {}):
+                raise KeyError(f"Producto desconocido: {tipo}/{nombre}")
+        datos = {"items": [[tipo, nombre, cantidad] for (tipo, nombre), cantidad in cantidades.items()]}
+        with self._lock:
+            self._aplicar_inventario_repuesto(datos)
+            self._registrar("inventario_repuesto", datos)
+        tipos = list(dict.fromkeys(tipo for tipo, _ in cantidades))
+        self._inventario_cambiado(tipos)
+        return tipos
+
+    def _aplicar_inventario_repuesto(self, datos: Dict[str, Any]):
+        # Dentro del candado, como liberar: una instantánea ve la reposición completa o nada
+        self.reservas.sumar({(tipo, nombre): cantidad for tipo, nombre, cantidad in datos["items"]})
+
+    # ----------------------- ÍNDICES -----------------------
+
+    def _indexar(self, p: Pedido):
+        self._por_mesa.setdefault(p.mesa_numero, {})[p.id] = None
+        self._por_estado.setdefault(p.estado, {})[p.id] = None
+        for tipo, estado in p.produccion_estados.items():
+            if estado == "pendiente":
+                self._pendientes_por_estacion.setdefault(tipo, {})[p.id] = None
+
+    def _desindexar(self, p: Pedido):
+        self._por_mesa.get(p.mesa_numero, {}).pop(p.id, None)
+        self._por_estado.get(p.estado, {}).pop(p.id, None)
+        for tipo in p.produccion_estados:
+            self._pendientes_por_estacion.get(tipo, {}).pop(p.id, None)
+
+    def _resolver(self, ids) -> List[Pedido]:
+        pedidos = self._pedidos
+        return [pedidos[i] for i in ids]
+
+    # ----------------------- PEDIDOS -----------------------
+
+    def obtener_pedido(self, pedido_id: int) -> Optional[Pedido]:
+        p = self._pedidos.get(pedido_id)
+        if p is not None or pedido_id not in self._archivo:
+            return p
+        with self._lock:
+            return self._archivo.obtener(pedido_id)
+
+    def listar_pedidos(self, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        """Pedidos activos ordenados por id, opcionalmente sin los de un estado."""
+        with self._lock:
+            if excluir_estado is None:
+                return list(self._pedidos.values())
+            ids: List[int] = []
+            for estado, bucket in self._por_estado.items():
+                if estado != excluir_estado:
+                    ids.extend(bucket)
+            ids.sort()
+            return self._resolver(ids)
+
+    def pedidos_por_estado(self, estado: str) -> List[Pedido]:
+        with self._lock:
+            return self._resolver(sorted(self._por_estado.get(estado, ())))
+
+    def pedidos_de_mesa(self, mesa_num: int, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        with self._lock:
+            pedidos = self._resolver(self._por_mesa.get(mesa_num, ()))
+            archivados = self._archivo.de_mesa(mesa_num)
+            if archivados:
+                pedidos = sorted(archivados + pedidos, key=lambda p: p.id)
+            return [p for p in pedidos if p.estado != excluir_estado]
+
+    def pedidos_pendientes_estacion(self, tipo: str) -> List[Pedido]:
+        with self._lock:
+            return self._resolver(self._pendientes_por_estacion.get(tipo, ()))
+
+    def total_mesa(self, mesa_num: int) -> float:
+        return round(self._total_por_mesa.get(mesa_num, 0.0), 2)
+
+    def _sumar_a_mesa(self, mesa_num: int, importe: float):
+        self._total_por_mesa[mesa_num] = round(self._total_por_mesa.get(mesa_num, 0.0) + importe, 2)
+
+    def agregar_pedido(self, mesa_num: int, items_list: List[Dict[str, Any]], creador: str) -> Pedido:
+        """Reserva el stock (todo o nada, candados por producto) y luego asigna id y guarda.
+
+        La mesa se vuelve a comprobar con el candado tomado, al guardar: si
+        desapareció durante la reserva, el stock se libera.
+        """
+        lineas = lineas_desde_items(items_list)
+        produccion_estados = {linea.tipo: "pendiente" for linea in lineas}
+
+        with self._lock:
+            if mesa_num not in self._mesas:
+                raise KeyError(f"No existe la mesa {mesa_num}")
+            # Una instantánea en curso espera a que no haya reservas a medio guardar
+            self._quieto.wait_for(lambda: not self._congelado)
+            self._en_vuelo += 1
+        try:
+            self.reservas.reservar(lineas)
+            self._inventario_cambiado(produccion_estados)
+            for linea in lineas:
+                linea.precio = self.inventario[linea.tipo][linea.nombre]["precio"]
+            with self._lock:
+                if mesa_num not in self._mesas:
+                    # Se cobró o eliminó mientras se reservaba: el pedido no tendría cuenta a la que cargarse
+                    self.reservas.liberar(lineas)
+                    self._inventario_cambiado(produccion_estados)
+                    raise KeyError(f"No existe la mesa {mesa_num}")
+                nuevo_pedido = Pedido(
+                    id=self.ids.siguiente("pedido"),
+                    mesa_numero=mesa_num,
+                    items=lineas,
+                    estado="pendiente",
+                    creado_por=sys.intern(creador),
+                    produccion=codificar_produccion(produccion_estados),
+                    total=round(sum(linea.subtotal for linea in lineas), 2),
+                    creado_en=time.time(),
+                )
+                self._insertar(nuevo_pedido)
+                self._registrar("pedido_creado", pedido_a_dict(nuevo_pedido))
+                return nuevo_pedido
+        finally:
+            with self._lock:
+                self._en_vuelo -= 1
+                self._quieto.notify_all()
+
+    def _insertar(self, p: Pedido):
+        self._pedidos[p.id] = p
+        self._indexar(p)
+        if p.estado != "cancelado":
+            self._sumar_a_mesa(p.mesa_numero, p.total)
+
+    def _aplicar_pedido_creado(self, datos: Dict[str, Any]):
+        p = pedido_desde_dict(datos)
+        self.reservas.reservar(p.items)
+        self._insertar(p)
+
+    def actualizar_estado_pedido(self, pedido_id: int, estado: str) -> bool:
+        with self._lock:
+            datos = {"id": pedido_id, "estado": estado}
+            if not self._aplicar_estado_pedido(datos):
+                return False
+            self._registrar("estado_pedido", datos)
+            return True
+
+    def _aplicar_estado_pedido(self, datos: Dict[str, Any]) -> bool:
+        p = self._pedidos.get(datos["id"])
+        estado = datos["estado"]
+        # Solo sale de "pendiente": lo cancelado ya devolvió su stock y no se factura
+        if p is None or p.estado != "pendiente" or estado == "pendiente":
+            return False
+        self._por_estado.get(p.estado, {}).pop(p.id, None)
+        p.estado = estado
+        self._por_estado.setdefault(estado, {})[p.id] = None
+        return True
+
+    def actualizar_estado_produccion(self, pedido_id: int, tipo: str, estado: str) -> bool:
+        with self._lock:
+            datos = {"id": pedido_id, "tipo": tipo, "estado": estado}
+            if not self._aplicar_estado_produccion(datos):
+                return False
+            self._registrar("estado_produccion", datos)
+            return True
+
+    def _aplicar_estado_produccion(self, datos: Dict[str, Any]) -> bool:
+        p = self._pedidos.get(datos["id"])
+        tipo, estado = datos["tipo"], datos["estado"]
+        # Como actualizar_estado_pedido: un pedido terminado ya no cambia su producción
+        if p is None or p.estado != "pendiente" or p.estado_produccion(tipo) != "pendiente" or estado == "pendiente":
+            return False
+        p.fijar_estado_produccion(tipo, estado)
+        self._pendientes_por_estacion.setdefault(tipo, {}).pop(p.id, None)
+        return True
+
+    def cancelar_pedido(self, pedido_id: int) -> bool:
+        with self._lock:
+            p = self._aplicar_pedido_cancelado({"id": pedido_id})
+            if p is None:
+                return False
+            self._registrar("pedido_cancelado", {"id": pedido_id})
+        self._inventario_cambiado(p.produccion_estados)
+        return True
+
+    def _aplicar_pedido_cancelado(self, datos: Dict[str, Any]) -> Optional[Pedido]:
+        p = self._pedidos.get(datos["id"])
+        if p is None or p.estado != "pendiente":
+            return None
+        for tipo, estado in p.produccion_estados.items():
+            if estado == "pendiente":
+                self._aplicar_estado_produccion({"id": p.id, "tipo": tipo, "estado": "cancelado"})
+        self._aplicar_estado_pedido({"id": p.id, "estado": "cancelado"})
+        self._sumar_a_mesa(p.mesa_numero, -p.total)
+        # Dentro del candado: una instantánea nunca ve el pedido cancelado sin su stock devuelto
+        self.reservas.liberar(p.items)
+        return p
+
+    def eliminar_pedido(self, pedido_id: int):
+        with self._lock:
+            p = self._aplicar_pedido_eliminado({"id": pedido_id})
+            if p is None:
+                return
+            self._registrar("pedido_eliminado", {"id": pedido_id})
+        if p.estado == "pendiente":
+            self._inventario_cambiado(p.produccion_estados)
+
+    def _aplicar_pedido_eliminado(self, datos: Dict[str, Any]) -> Optional[Pedido]:
+        p = self._pedidos.pop(datos["id"], None)
+        if p is None:
+            p = self._archivo.quitar(datos["id"])
+            if p is not None and p.estado != "cancelado":
+                self._sumar_a_mesa(p.mesa_numero, -p.total)
+            return p
+        self._desindexar(p)
+        if p.estado != "cancelado":
+            self._sumar_a_mesa(p.mesa_numero, -p.total)
+        if p.estado == "pendiente":
+            # Lo entregado ya se consumió; lo cancelado ya se devolvió
+            self.reservas.liberar(p.items)
+        return p
+
+    # ----------------------- ARCHIVO FRÍO -----------------------
+
+    def archivar_pedidos(self, antes_de: float, maximo: Optional[int] = None) -> int:
+        with self._lock:
+            terminados = sorted(
+                (pedido_id, self._pedidos[pedido_id].creado_en)
+                for estado in ESTADOS_TERMINADOS
+                for pedido_id in self._por_estado.get(estado, ())
+            )
+            ids = elegir_archivables(terminados, antes_de, maximo)
+            if not ids:
+                return 0
+            datos = {"ids": ids}
+            self._aplicar_pedidos_archivados(datos)
+            self._registrar("pedidos_archivados", datos)
+            return len(ids)
+
+    def _aplicar_pedidos_archivados(self, datos: Dict[str, Any]):
+        # El total por mesa no cambia: la cuenta sigue incluyendo lo archivado
+        pedidos = [p for p in (self._pedidos.pop(i, None) for i in datos["ids"]) if p is not None]
+        for p in pedidos:
+            self._desindexar(p)
+            self._archivo.agregar(p)
+
+    def listar_archivados(self, desde: float = 0.0) -> List[Pedido]:
+        with self._lock:
+            return self._archivo.desde(desde)
+
+    def tamano_conjunto(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "activos": len(self._pedidos),
+                "terminados_activos": sum(len(self._por_estado.get(e, ())) for e in ESTADOS_TERMINADOS),
+                "archivados": len(self._archivo),
+                "archivo_bytes": self._archivo.bytes_usados(),
+            }
+
+    # ----------------------- BITÁCORA -----------------------
+
+    def _registrar(self, tipo: str, datos: Dict[str, Any]):
+        """Anota el evento ya aplicado (llamar con el candado tomado, para que el orden coincida)."""
+        self._sala_cambiada((tipo,))
+        if self.bitacora is None or self._reproduciendo:
+            return
+        self.bitacora.registrar(tipo, datos)
+        self._desde_instantanea += 1
+        if self._desde_instantanea >= self._instantanea_cada and not self._instantanea_en_curso:
+            self._instantanea_en_curso = True
+            threading.Thread(target=self.guardar_instantanea, name="ordify-instantanea", daemon=True).start()
+
+    def _serializar(self) -> Dict[str, Any]:
+        return {
+            "inventario": {
+                tipo: {nombre: dict(info) for nombre, info in productos.items()}
+                for tipo, productos in self.inventario.items()
+            },
+            "mesas": [[m.numero, m.comensales, m.estado, m.id] for m in self._mesas.values()],
+            "pedidos": [pedido_a_dict(p) for p in self._pedidos.values()],
+            "pagos": [pago_a_dict(p) for pagos in self._pagos.values() for p in pagos],
+            "archivados": [pedido_a_dict(p) for p in self._archivo],
+        }
+
+    def guardar_instantanea(self):
+        """Congela las mutaciones un instante, copia el estado y lo escribe fuera del candado."""
+        if self.bitacora is None:
+            return
+        try:
+            with self._lock:
+                self._congelado = True
+                try:
+                    self._quieto.wait_for(lambda: self._en_vuelo == 0)
+                    estado = self._serializar()
+                    hasta = self.bitacora.rotar()
+                    self._desde_instantanea = 0
+                finally:
+                    self._congelado = False
+                    self._quieto.notify_all()
+            self.bitacora.guardar_instantanea(estado, hasta)
+        finally:
+            self._instantanea_en_curso = False
+
+    def _recuperar(self):
+        estado, eventos = self.bitacora.recuperar()
+        self._reproduciendo = True
+        try:
+            if estado is not None:
+                self.inventario.clear()
+                self.inventario.update(estado["inventario"])
+                CATALOGO.registrar_inventario(self.inventario)
+                for numero, comensales, estado_mesa, mesa_id in estado["mesas"]:
+                    self._mesas[numero] = Mesa(numero=numero, comensales=comensales, estado=estado_mesa, id=mesa_id)
+                for datos in estado["pedidos"]:
+                    self._insertar(pedido_desde_dict(datos))
+                for datos in estado.get("pagos", []):   # instantáneas anteriores no los traen
+                    self._aplicar_pago_registrado(datos)
+                for datos in estado.get("archivados", []):
+                    p = pedido_desde_dict(datos)
+                    self._archivo.agregar(p)
+                    if p.estado != "cancelado":
+                        self._sumar_a_mesa(p.mesa_numero, p.total)
+            for evento in eventos:
+                getattr(self, f"_aplicar_{evento['tipo']}")(evento["datos"])
+        finally:
+            self._reproduciendo = False
+        self._desde_instantanea = len(eventos)
@@ -0,0 +1,728 @@
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+from .bitacora import Bitacora
+from .catalogo import CATALOGO
+from .modelos import (
+    LineaPedido, Mesa, Pago, Pedido, codificar_produccion, comprimir_pedidos, descomprimir_pedidos,
+    lineas_desde_items, pago_a_dict, pedido_a_dict,
+)
+from .pool import PoolConexiones
+from .repositorio import ESTADOS_TERMINADOS, Repositorio, elegir_archivables
+from .reservas import StockInsuficiente, agrupar_cantidades, cantidades_reposicion
+
+
+# ============================================================
+#  ESQUEMA
+# ============================================================
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS secuencias (
+    nombre TEXT PRIMARY KEY,
+    valor  INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS mesas (
+    numero     INTEGER PRIMARY KEY,
+    comensales INTEGER NOT NULL,
+    estado     TEXT    NOT NULL DEFAULT 'activa',
+    id         INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inventario (
+    tipo   TEXT    NOT NULL,
+    nombre TEXT    NOT NULL,
+    stock  INTEGER NOT NULL,
+    precio REAL    NOT NULL,
+    PRIMARY KEY (tipo, nombre)
+);
+
+CREATE TABLE IF NOT EXISTS pedidos (
+    id          INTEGER PRIMARY KEY,
+    mesa_numero INTEGER NOT NULL,
+    estado      TEXT    NOT NULL DEFAULT 'pendiente',
+    creado_por  TEXT    NOT NULL DEFAULT '',
+    total       REAL    NOT NULL DEFAULT 0,
+    creado_en   REAL    NOT NULL DEFAULT 0     -- epoch de la confirmación
+);
+CREATE INDEX IF NOT EXISTS ix_pedidos_mesa   ON pedidos (mesa_numero);
+CREATE INDEX IF NOT EXISTS ix_pedidos_estado ON pedidos (estado);
+
+CREATE TABLE IF NOT EXISTS pedido_items (
+    pedido_id INTEGER NOT NULL REFERENCES pedidos (id) ON DELETE CASCADE,
+    orden     INTEGER NOT NULL,
+    tipo      TEXT    NOT NULL,
+    nombre    TEXT    NOT NULL,
+    cantidad  INTEGER NOT NULL,
+    precio    REAL    NOT NULL DEFAULT 0,   -- precio unitario al momento del pedido
+    PRIMARY KEY (pedido_id, orden)
+);
+
+-- Estado de producción por estación: {"comida_italiana": "pendiente", ...}
+CREATE TABLE IF NOT EXISTS produccion (
+    pedido_id INTEGER NOT NULL REFERENCES pedidos (id) ON DELETE CASCADE,
+    tipo      TEXT    NOT NULL,
+    estado    TEXT    NOT NULL,
+    PRIMARY KEY (pedido_id, tipo)
+);
+CREATE INDEX IF NOT EXISTS ix_produccion_estacion ON produccion (tipo, estado, pedido_id);
+
+-- Archivo frío: pedidos terminados fuera de las tablas activas hasta que se cobra su mesa.
+-- Un bloque comprimido por mesa y pasada; el bloque se borra cuando no le queda ningún pedido.
+CREATE TABLE IF NOT EXISTS bloques_archivados (
+    id          INTEGER PRIMARY KEY,
+    datos       BLOB    NOT NULL     -- zlib(JSON) de los pedidos (modelos.comprimir_pedidos)
+);
+CREATE TABLE IF NOT EXISTS pedidos_archivados (
+    id          INTEGER PRIMARY KEY,
+    mesa_numero INTEGER NOT NULL,
+    estado      TEXT    NOT NULL,
+    total       REAL    NOT NULL,
+    creado_en   REAL    NOT NULL,
+    bloque      INTEGER NOT NULL REFERENCES bloques_archivados(id)
+);
+CREATE INDEX IF NOT EXISTS ix_pedidos_archivados_mesa   ON pedidos_archivados (mesa_numero);
+CREATE INDEX IF NOT EXISTS ix_pedidos_archivados_creado ON pedidos_archivados (creado_en);
+CREATE INDEX IF NOT EXISTS ix_pedidos_archivados_bloque ON pedidos_archivados (bloque);
+
+-- Pagos parciales de la ocupación actual de cada mesa; se borran con la mesa (la cuenta ya quedó archivada)
+CREATE TABLE IF NOT EXISTS pagos (
+    id          INTEGER PRIMARY KEY,
+    mesa_numero INTEGER NOT NULL,
+    cuenta      INTEGER NOT NULL,               -- mesas.id de la ocupación cobrada
+    importe     REAL    NOT NULL,
+    cobrado_por TEXT    NOT NULL DEFAULT '',
+    comensal    INTEGER NOT NULL DEFAULT 0,     -- 0 = a cuenta de la mesa
+    lineas      TEXT    NOT NULL DEFAULT '[]',  -- JSON [[pedido_id, orden, unidades], ...] cobradas por ítem
+    creado_en   REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pagos_mesa ON pagos (mesa_numero);
+
+-- Cambios confirmados, para avisar a los demás procesos que usan la misma base (ver sincronizacion.py)
+CREATE TABLE IF NOT EXISTS cambios (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    origen TEXT    NOT NULL,              -- RepositorioSQLite.origen del proceso que confirmó
+    tipo   TEXT    NOT NULL,              -- evento (mesa_creada, estado_pedido...) o "inventario"
+    clave  INTEGER,                       -- id del pedido o número de mesa
+    tipos  TEXT    NOT NULL DEFAULT '',   -- "inventario": categorías separadas por coma ('' = la lista)
+    ts     REAL    NOT NULL
+);
+"""
+
+# Columnas añadidas después de la primera versión del esquema: (tabla, columna, definición)
+MIGRACIONES = [
+    ("pedidos", "total", "REAL NOT NULL DEFAULT 0"),
+    ("pedido_items", "precio", "REAL NOT NULL DEFAULT 0"),
+    ("pedidos", "creado_en", "REAL NOT NULL DEFAULT 0"),
+]
+
+# Filtros sobre `pedidos`. Son cadenas fijas para que sqlite3 reutilice las
+# sentencias preparadas de su caché en lugar de recompilarlas.
+_FILTRO_ID = "id = ?"
+_FILTRO_TODOS = "1 = 1"
+_FILTRO_EXCLUIR_ESTADO = "estado <> ?"
+_FILTRO_ESTADO = "estado = ?"
+_FILTRO_MESA = "mesa_numero = ?"
+_FILTRO_MESA_EXCLUIR_ESTADO = "mesa_numero = ? AND estado <> ?"
+_FILTRO_IDS = "id IN (SELECT value FROM json_each(?))"
+_FILTRO_MESA_SIN_ESTADO = "mesa_numero = ? AND estado IS NOT ?"
+_FILTRO_DESDE = "creado_en >= ?"
+_FILTRO_ESTACION_PENDIENTE = (
+    "id IN (SELECT pedido_id FROM produccion WHERE tipo = ? AND estado = 'pendiente')"
+)
+
+
+# ============================================================
+#  CONEXIONES
+# ============================================================
+
+def crear_conexion_sqlite(ruta: str) -> sqlite3.Connection:
+    """Conexión configurada para WAL; pensada para vivir dentro de un PoolConexiones."""
+    conn = sqlite3.connect(
+        ruta,
+        isolation_level=None,       # las transacciones se controlan a mano
+        check_same_thread=False,    # el pool garantiza un solo hilo a la vez
+        cached_statements=256,
+        timeout=10.0,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def crear_pool_sqlite(ruta: str, tamano: int = 5) -> PoolConexiones:
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    return PoolConexiones(lambda: crear_conexion_sqlite(ruta), tamano=tamano)
+
+
+# ============================================================
+#  REPOSITORIO SQLITE (WAL + commits agrupados)
+# ============================================================
+
+class RepositorioSQLite(Repositorio):
+    """Persistencia local en un archivo SQLite.
+
+    - Modo WAL con `synchronous=NORMAL`: los lectores no bloquean al escritor
+      y cada commit cuesta un append al log, no un fsync del archivo entero.
+    - Todas las sentencias son constantes con parámetros, así que la caché de
+      sentencias preparadas de sqlite3 las compila una sola vez.
+    - `transaccion()` agrupa varias operaciones en un único commit; las
+      transacciones anidadas se funden con la exterior.
+    - Las versiones de inventario avanzan después del COMMIT, nunca antes:
+      quien vea una versión nueva ya puede leer los datos que la causaron.
+    - Con `bitacora`, los cambios confirmados se anotan para auditoría (la
+      base ya es durable: aquí la bitácora no se reproduce al arrancar).
+    - Cada transacción deja sus eventos en la tabla `cambios`, en el mismo
+      commit, firmados con `origen`: otros procesos sobre el mismo archivo
+      los leen con un SincronizadorProcesos. Las filas de más de
+      `retencion_cambios` segundos se podan aquí mismo (como mucho una vez
+      por minuto), haya o no sincronizador.
+    """
+
+    def __init__(
+        self,
+        pool: PoolConexiones,
+        inventario_inicial: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None,
+        bitacora: Optional[Bitacora] = None,
+        retencion_cambios: float = 3600.0,
+    ):
+        super().__init__()
+        self._pool = pool
+        self.bitacora = bitacora
+        self.retencion_cambios = retencion_cambios
+        self._ultima_poda = 0.0
+        self._local = threading.local()   # categorías y eventos de la transacción del hilo
+        self.origen = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        with self._pool.conexion() as conn:
+            conn.executescript(ESQUEMA)
+            self._migrar(conn)
+        if inventario_inicial:
+            self._sembrar_inventario(inventario_inicial)
+        self._registrar_catalogo()
+
+    # ----------------------- TRANSACCIONES -----------------------
+
+    @contextmanager
+    def transaccion(self):
+        """Presta una conexión al hilo y agrupa todo lo que ocurra dentro en un commit."""
+        with self._pool.conexion() as conn:
+            if conn.in_transaction:
+                # Anidada: se confirma junto con la transacción exterior
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.tipos_cambiados = set()
+            self._local.eventos = []
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._local.tipos_cambiados = set()
+                self._local.eventos = []
+                raise
+            self._registrar_cambios(conn)
+            conn.execute("COMMIT")
+            tipos, self._local.tipos_cambiados = self._local.tipos_cambiados, set()
+            eventos, self._local.eventos = self._local.eventos, []
+            if tipos:
+                self._inventario_cambiado(tipos)
+            if eventos:
+                self._sala_cambiada(tipo for tipo, _ in eventos)
+            if self.bitacora is not None:
+                for tipo, datos in eventos:
+                    self.bitacora.registrar(tipo, datos)
+
+    def _marcar_inventario(self, tipos):
+        """Anota categorías modificadas; su versión avanza al confirmar la transacción."""
+        self._local.tipos_cambiados.update(tipos)
+
+    def _registrar_cambios(self, conn: sqlite3.Connection):
+        """Eventos e inventario de la transacción en `cambios`, para los demás procesos."""
+        ts = time.time()
+        filas = [
+            (self.origen, tipo, datos.get("id", datos.get("numero")), "", ts)
+            for tipo, datos in self._local.eventos
+        ]
+        tipos = self._local.tipos_cambiados
+        if tipos:
+            filas.append((self.origen, "inventario", None, ",".join(t or "" for t in tipos), ts))
+        if filas:
+            conn.executemany("INSERT INTO cambios (origen, tipo, clave, tipos, ts) VALUES (?, ?, ?, ?, ?)", filas)
+        if ts - self._ultima_poda >= 60:
+            # En la misma transacción de escritura: no hace falta otro candado ni otro commit
+            self._ultima_poda = ts
+            conn.execute("DELETE FROM cambios WHERE ts < ?", (ts - self.retencion_cambios,))
+
+    def _anotar(self, tipo: str, datos: Dict[str, Any]):
+        """Evento de auditoría; se registra (y avanza version_mesas/pedidos) solo si la transacción se confirma."""
+        self._local.eventos.append((tipo, datos))
+
+    @staticmethod
+    def _migrar(conn: sqlite3.Connection):
+        for tabla, columna, definicion in MIGRACIONES:
+            columnas = {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+            if columna not in columnas:
+                conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+
+    @contextmanager
+    def _lectura(self):
+        """Instantánea consistente (WAL) para lecturas de varias sentencias."""
+        with self._pool.conexion() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+
+    def _consultar(self, sql: str, params=()) -> List[tuple]:
+        with self._pool.conexion() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _siguiente_id(conn: sqlite3.Connection, nombre: str) -> int:
+        """Secuencia persistida en la misma transacción que la inserción."""
+        conn.execute(
+            "INSERT INTO secuencias (nombre, valor) VALUES (?, 0) ON CONFLICT (nombre) DO NOTHING",
+            (nombre,),
+        )
+        conn.execute("UPDATE secuencias SET valor = valor + 1 WHERE nombre = ?", (nombre,))
+        return conn.execute("SELECT valor FROM secuencias WHERE nombre = ?", (nombre,)).fetchone()[0]
+
+    def _registrar_catalogo(self):
+        """Registra en el CATALOGO los productos de la base: los únicos que aceptan los pedidos."""
+        productos: Dict[str, List[str]] = {}
+        for tipo, nombre in self._consultar("SELECT tipo, nombre FROM inventario"):
+            productos.setdefault(tipo, []).append(nombre)
+        CATALOGO.registrar_inventario(productos)
+
+    def _sembrar_inventario(self, inventario: Dict[str, Dict[str, Dict[str, float]]]):
+        filas = [
+            (tipo, nombre, info["stock"], info["precio"])
+            for tipo, items in inventario.items()
+            for nombre, info in items.items()
+        ]
+        with self.transaccion() as conn:
+            conn.executemany(
+                "INSERT INTO inventario (tipo, nombre, stock, precio) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (tipo, nombre) DO NOTHING",
+                filas,
+            )
+            self._marcar_inventario([None, *inventario])
+
+    # ----------------------- MESAS -----------------------
+
+    def listar_mesas(self) -> List[Mesa]:
+        filas = self._consultar("SELECT numero, comensales, estado, id FROM mesas ORDER BY id")
+        return [Mesa(numero=n, comensales=c, estado=e, id=i) for n, c, e, i in filas]
+
+    def obtener_mesa(self, numero: int) -> Optional[Mesa]:
+        filas = self._consultar("SELECT numero, comensales, estado, id FROM mesas WHERE numero = ?", (numero,))
+        if not filas:
+            return None
+        n, c, e, i = filas[0]
+        return Mesa(numero=n, comensales=c, estado=e, id=i)
+
+    def crear_mesa(self, numero: int, comensales: int) -> bool:
+        with self.transaccion() as conn:
+            existe = conn.execute("SELECT 1 FROM mesas WHERE numero = ?", (numero,)).fetchone()
+            if existe:
+                return False
+            mesa_id = self._siguiente_id(conn, "mesa")
+            conn.execute(
+                "INSERT INTO mesas (numero, comensales, estado, id) VALUES (?, ?, 'activa', ?)",
+                (numero, comensales, mesa_id),
+            )
+            self._anotar("mesa_creada", {"numero": numero, "comensales": comensales, "id": mesa_id})
+            return True
+
+    def eliminar_mesa(self, numero: int):
+        with self.transaccion() as conn:
+            if conn.execute("DELETE FROM mesas WHERE numero = ?", (numero,)).rowcount:
+                conn.execute("DELETE FROM pagos WHERE mesa_numero = ?", (numero,))
+                self._anotar("mesa_eliminada", {"numero": numero})
+
+    # ----------------------- PAGOS -----------------------
+
+    def registrar_pago(
+        self,
+        mesa_num: int,
+        importe: float,
+        cobrado_por: str,
+        comensal: int = 0,
+        lineas: Iterable[Tuple[int, int, int]] = (),
+    ) -> Pago:
+        with self.transaccion() as conn:
+            fila = conn.execute("SELECT id FROM mesas WHERE numero = ?", (mesa_num,)).fetchone()
+            if fila is None:
+                raise KeyError(f"No existe la mesa {mesa_num}")
+            pago = Pago(
+                id=self._siguiente_id(conn, "pago"),
+                mesa_numero=mesa_num,
+                cuenta=fila[0],
+                importe=round(importe, 2),
+                cobrado_por=cobrado_por,
+                comensal=comensal,
+                lineas=[tuple(linea) for linea in lineas],
+                creado_en=time.time(),
+            )
+            conn.execute(
+                "INSERT INTO pagos (id, mesa_numero, cuenta, importe, cobrado_por, comensal, lineas, creado_en) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (pago.id, mesa_num, pago.cuenta, pago.importe, cobrado_por, comensal,
+                 json.dumps(pago.lineas), pago.creado_en),
+            )
+            self._anotar("pago_registrado", pago_a_dict(pago))
+        return pago
+
+    def anular_pago(self, mesa_num: int, pago_id: int) -> bool:
+        with self.transaccion() as conn:
+            if not conn.execute("DELETE FROM pagos WHERE id = ? AND mesa_numero = ?", (pago_id, mesa_num)).rowcount:
+                return False
+            self._anotar("pago_anulado", {"mesa_numero": mesa_num, "id": pago_id})
+        return True
+
+    def pagos_de_mesa(self, mesa_num: int) -> List[Pago]:
+        filas = self._consultar(
+            "SELECT id, mesa_numero, cuenta, importe, cobrado_por, comensal, lineas, creado_en "
+            "FROM pagos WHERE mesa_numero = ? ORDER BY id",
+            (mesa_num,),
+        )
+        return [
+            Pago(id=i, mesa_numero=m, cuenta=c, importe=imp, cobrado_por=sys.intern(por), comensal=com,
+                 lineas=[tuple(linea) for linea in json.loads(lineas)], creado_en=ts)
+            for i, m, c, imp, por, com, lineas, ts in filas
+        ]
+
+    # ----------------------- INVENTARIO -----------------------
+
+    @staticmethod
+    def _reservar(conn: sqlite3.Connection, lineas: List[LineaPedido]) -> Dict[tuple, float]:
+        """Descuento condicional (compare-and-swap en SQL) de cada producto.
+
+        Corre dentro de la transacción del pedido: si algún producto no
+        alcanza se lanza StockInsuficiente y el ROLLBACK deshace el resto.
+        Devuelve el precio vigente de cada producto reservado.
+        """
+        precios: Dict[tuple, float] = {}
+        faltantes = []
+        for (tipo, nombre), cantidad in agrupar_cantidades(lineas).items():
+            cursor = conn.execute(
+                "UPDATE inventario SET stock = stock - ? WHERE tipo = ? AND nombre = ? AND stock >= ? AND ? > 0",
+                (cantidad, tipo, nombre, cantidad, cantidad),
+            )
+            fila = conn.execute(
+                "SELECT stock, precio FROM inventario WHERE tipo = ? AND nombre = ?", (tipo, nombre)
+            ).fetchone()
+            if fila is None:
+                raise KeyError(f"Producto desconocido: {tipo}/{nombre}")
+            if cursor.rowcount == 0:
+                faltantes.append((tipo, nombre, cantidad, fila[0]))
+            precios[(tipo, nombre)] = fila[1]
+        if faltantes:
+            raise StockInsuficiente(faltantes)
+        return precios
+
+    @staticmethod
+    def _liberar(conn: sqlite3.Connection, pedido_id: int) -> List[str]:
+        """Devuelve el stock del pedido; retorna las categorías afectadas."""
+        tipos = [fila[0] for fila in conn.execute(
+            "SELECT DISTINCT tipo FROM pedido_items WHERE pedido_id = ?", (pedido_id,)
+        )]
+        conn.execute(
+            "UPDATE inventario SET stock = stock + ("
+            "  SELECT SUM(i.cantidad) FROM pedido_items i"
+            "  WHERE i.pedido_id = ? AND i.tipo = inventario.tipo AND i.nombre = inventario.nombre"
+            ") WHERE (tipo, nombre) IN (SELECT tipo, nombre FROM pedido_items WHERE pedido_id = ?)",
+            (pedido_id, pedido_id),
+        )
+        return tipos
+
+    def reponer_stock(self, items_list: List[Dict[str, Any]]) -> List[str]:
+        cantidades = cantidades_reposicion(items_list)
+        with self.transaccion() as conn:
+            for (tipo, nombre), cantidad in cantidades.items():
+                cursor = conn.execute(
+                    "UPDATE inventario SET stock = stock + ? WHERE tipo = ? AND nombre = ?", (cantidad, tipo, nombre)
+                )
+                if cursor.rowcount == 0:
+                    raise KeyError(f"Producto desconocido: {tipo}/{nombre}")   # ROLLBACK de lo ya sumado
+            tipos = list(dict.fromkeys(tipo for tipo, _ in cantidades))
+            self._marcar_inventario(tipos)
+            self._anotar("inventario_repuesto", {
+                "items": [[tipo, nombre, cantidad] for (tipo, nombre), cantidad in cantidades.items()]
+            })
+        return tipos
+
+    def obtener_inventario(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        inventario: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for tipo, nombre, stock, precio in self._consultar(
+            "SELECT tipo, nombre, stock, precio FROM inventario ORDER BY rowid"
+        ):
+            inventario.setdefault(tipo, {})[nombre] = {"stock": stock, "precio": precio}
+        return inventario
+
+    def categorias_inventario(self) -> List[str]:
+        return [fila[0] for fila in self._consultar(
+            "SELECT tipo FROM inventario GROUP BY tipo ORDER BY MIN(rowid)"
+        )]
+
+    def obtener_categoria(self, tipo: str) -> Dict[str, Dict[str, float]]:
+        return {
+            nombre: {"stock": stock, "precio": precio}
+            for nombre, stock, precio in self._consultar(
+                "SELECT nombre, stock, precio FROM inventario WHERE tipo = ? ORDER BY rowid", (tipo,)
+            )
+        }
+
+    # ----------------------- PEDIDOS -----------------------
+
+    def _cargar_pedidos(self, filtro: str, params=()) -> List[Pedido]:
+        """Hidrata pedidos con sus items y estados de producción (3 consultas, sin N+1)."""
+        with self._lectura() as conn:
+            cabeceras = conn.execute(
+                f"SELECT id, mesa_numero, estado, creado_por, total, creado_en FROM pedidos WHERE {filtro} ORDER BY id",
+                params,
+            ).fetchall()
+            if not cabeceras:
+                return []
+            items = conn.execute(
+                "SELECT pedido_id, tipo, nombre, cantidad, precio FROM pedido_items "
+                f"WHERE pedido_id IN (SELECT id FROM pedidos WHERE {filtro}) ORDER BY pedido_id, orden",
+                params,
+            ).fetchall()
+            produccion = conn.execute(
+                "SELECT pedido_id, tipo, estado FROM produccion "
+                f"WHERE pedido_id IN (SELECT id FROM pedidos WHERE {filtro})",
+                params,
+            ).fetchall()
+
+        pedidos: Dict[int, Pedido] = {
+            pid: Pedido(
+                id=pid, mesa_numero=mesa, items=[], estado=sys.intern(estado),
+                creado_por=sys.intern(creador), total=total, creado_en=creado_en,
+            )
+            for pid, mesa, estado, creador, total, creado_en in cabeceras
+        }
+        for pid, tipo, nombre, cantidad, precio in items:
+            pedidos[pid].items.append(LineaPedido.crear(tipo, nombre, cantidad, precio))
+        for pid, tipo, estado in produccion:
+            pedidos[pid].fijar_estado_produccion(tipo, estado)
+        return list(pedidos.values())
+
+    def obtener_pedido(self, pedido_id: int) -> Optional[Pedido]:
+        pedidos = self._cargar_pedidos(_FILTRO_ID, (pedido_id,))
+        if pedidos:
+            return pedidos[0]
+        with self._lectura() as conn:
+            archivados = self._cargar_archivados(conn, _FILTRO_ID, (pedido_id,))
+        return archivados[0] if archivados else None
+
+    def listar_pedidos(self, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        if excluir_estado is None:
+            return self._cargar_pedidos(_FILTRO_TODOS)
+        return self._cargar_pedidos(_FILTRO_EXCLUIR_ESTADO, (excluir_estado,))
+
+    def pedidos_por_estado(self, estado: str) -> List[Pedido]:
+        return self._cargar_pedidos(_FILTRO_ESTADO, (estado,))
+
+    def pedidos_de_mesa(self, mesa_num: int, excluir_estado: Optional[str] = None) -> List[Pedido]:
+        with self._lectura() as conn:
+            if excluir_estado is None:
+                pedidos = self._cargar_pedidos(_FILTRO_MESA, (mesa_num,))
+            else:
+                pedidos = self._cargar_pedidos(_FILTRO_MESA_EXCLUIR_ESTADO, (mesa_num, excluir_estado))
+            archivados = self._cargar_archivados(conn, _FILTRO_MESA_SIN_ESTADO, (mesa_num, excluir_estado))
+        if not archivados:
+            return pedidos
+        return sorted(pedidos + archivados, key=lambda p: p.id)
+
+    def pedidos_pendientes_estacion(self, tipo: str) -> List[Pedido]:
+        return self._cargar_pedidos(_FILTRO_ESTACION_PENDIENTE, (tipo,))
+
+    def total_mesa(self, mesa_num: int) -> float:
+        # Usa ix_pedidos_mesa: cuesta lo que miden los pedidos de la mesa
+        filas = self._consultar(
+            "SELECT COALESCE(SUM(total), 0.0) FROM ("
+            "  SELECT total FROM pedidos WHERE mesa_numero = ? AND estado <> 'cancelado'"
+            "  UNION ALL"
+            "  SELECT total FROM pedidos_archivados WHERE mesa_numero = ? AND estado <> 'cancelado'"
+            ")",
+            (mesa_num, mesa_num),
+        )
+        return round(filas[0][0], 2)
+
+    def agregar_pedido(self, mesa_num: int, items_list: List[Dict[str, Any]], creador: str) -> Pedido:
+        lineas = lineas_desde_items(items_list)
+        produccion_estados = {linea.tipo: "pendiente" for linea in lineas}
+
+        with self.transaccion() as conn:
+            if conn.execute("SELECT 1 FROM mesas WHERE numero = ?", (mesa_num,)).fetchone() is None:
+                raise KeyError(f"No existe la mesa {mesa_num}")
+            precios = self._reservar(conn, lineas)
+            self._marcar_inventario(produccion_estados)
+            for linea in lineas:
+                linea.precio = precios[(linea.tipo, linea.nombre)]
+            total = round(sum(linea.subtotal for linea in lineas), 2)
+            pedido_id = self._siguiente_id(conn, "pedido")
+            creado_en = time.time()
+            conn.execute(
+                "INSERT INTO pedidos (id, mesa_numero, estado, creado_por, total, creado_en) "
+                "VALUES (?, ?, 'pendiente', ?, ?, ?)",
+                (pedido_id, mesa_num, creador, total, creado_en),
+            )
+            conn.executemany(
+                "INSERT INTO pedido_items (pedido_id, orden, tipo, nombre, cantidad, precio) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (pedido_id, orden, linea.tipo, linea.nombre, linea.cantidad, linea.precio)
+                    for orden, linea in enumerate(lineas)
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO produccion (pedido_id, tipo, estado) VALUES (?, ?, ?)",
+                [(pedido_id, tipo, estado) for tipo, estado in produccion_estados.items()],
+            )
+            pedido = Pedido(
+                id=pedido_id,
+                mesa_numero=mesa_num,
+                items=lineas,
+                estado="pendiente",
+                creado_por=creador,
+                produccion=codificar_produccion(produccion_estados),
+                total=total,
+                creado_en=creado_en,
+            )
+            self._anotar("pedido_creado", pedido_a_dict(pedido))
+        return pedido
+
+    def actualizar_estado_pedido(self, pedido_id: int, estado: str) -> bool:
+        if estado == "pendiente":
+            return False
+        with self.transaccion() as conn:
+            cursor = conn.execute(
+                "UPDATE pedidos SET estado = ? WHERE id = ? AND estado = 'pendiente'", (estado, pedido_id)
+            )
+            if not cursor.rowcount:
+                return False
+            self._anotar("estado_pedido", {"id": pedido_id, "estado": estado})
+        return True
+
+    def actualizar_estado_produccion(self, pedido_id: int, tipo: str, estado: str) -> bool:
+        if estado == "pendiente":
+            return False
+        with self.transaccion() as conn:
+            cursor = conn.execute(
+                "UPDATE produccion SET estado = ? WHERE pedido_id = ? AND tipo = ? AND estado = 'pendiente' "
+                "AND EXISTS (SELECT 1 FROM pedidos WHERE id = ? AND estado = 'pendiente')",
+                (estado, pedido_id, tipo, pedido_id),
+            )
+            if not cursor.rowcount:
+                return False
+            self._anotar("estado_produccion", {"id": pedido_id, "tipo": tipo, "estado": estado})
+            return True
+
+    def cancelar_pedido(self, pedido_id: int) -> bool:
+        with self.transaccion() as conn:
+            cursor = conn.execute(
+                "UPDATE pedidos SET estado = 'cancelado' WHERE id = ? AND estado = 'pendiente'", (pedido_id,)
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(
+                "UPDATE produccion SET estado = 'cancelado' WHERE pedido_id = ? AND estado = 'pendiente'",
+                (pedido_id,),
+            )
+            self._marcar_inventario(self._liberar(conn, pedido_id))
+            self._anotar("pedido_cancelado", {"id": pedido_id})
+            return True
+
+    def eliminar_pedido(self, pedido_id: int):
+        with self.transaccion() as conn:
+            fila = conn.execute("SELECT estado FROM pedidos WHERE id = ?", (pedido_id,)).fetchone()
+            if fila is None:
+                self._soltar_archivado(conn, pedido_id)
+                return
+            if fila[0] == "pendiente":
+                # Lo entregado ya se consumió; lo cancelado ya se devolvió
+                self._marcar_inventario(self._liberar(conn, pedido_id))
+            # items y produccion se borran en cascada
+            conn.execute("DELETE FROM pedidos WHERE id = ?", (pedido_id,))
+            self._anotar("pedido_eliminado", {"id": pedido_id})
+
+    # ----------------------- ARCHIVO FRÍO -----------------------
+
+    def archivar_pedidos(self, antes_de: float, maximo: Optional[int] = None) -> int:
+        with self.transaccion() as conn:
+            terminados = conn.execute(
+                "SELECT id, creado_en FROM pedidos WHERE estado IN (?, ?) ORDER BY id", ESTADOS_TERMINADOS
+            ).fetchall()
+            ids = elegir_archivables(terminados, antes_de, maximo)
+            if not ids:
+                return 0
+            clave = json.dumps(ids)
+            por_mesa: Dict[int, List[Pedido]] = {}
+            for p in self._cargar_pedidos(_FILTRO_IDS, (clave,)):
+                por_mesa.setdefault(p.mesa_numero, []).append(p)
+            for mesa, grupo in por_mesa.items():
+                bloque = conn.execute(
+                    "INSERT INTO bloques_archivados (datos) VALUES (?)", (comprimir_pedidos(grupo),)
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO pedidos_archivados (id, mesa_numero, estado, total, creado_en, bloque) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(p.id, mesa, p.estado, p.total, p.creado_en, bloque) for p in grupo],
+                )
+            # items y produccion se borran en cascada
+            conn.execute(f"DELETE FROM pedidos WHERE {_FILTRO_IDS}", (clave,))
+            self._anotar("pedidos_archivados", {"ids": ids})
+        return len(ids)
+
+    def _cargar_archivados(self, conn: sqlite3.Connection, filtro: str, params=()) -> List[Pedido]:
+        """Descomprime solo los bloques que contienen pedidos archivados que cumplen el filtro."""
+        filas = conn.execute(f"SELECT id, bloque FROM pedidos_archivados WHERE {filtro}", params).fetchall()
+        if not filas:
+            return []
+        ids = {pedido_id for pedido_id, _ in filas}
+        bloques = conn.execute(
+            f"SELECT datos FROM bloques_archivados WHERE {_FILTRO_IDS}", (json.dumps(sorted({b for _, b in filas})),)
+        ).fetchall()
+        return sorted((p for (datos,) in bloques for p in descomprimir_pedidos(datos) if p.id in ids),
+                      key=lambda p: p.id)
+
+    def _soltar_archivado(self, conn: sqlite3.Connection, pedido_id: int):
+        fila = conn.execute("SELECT bloque FROM pedidos_archivados WHERE id = ?", (pedido_id,)).fetchone()
+        if fila is None:
+            return
+        conn.execute("DELETE FROM pedidos_archivados WHERE id = ?", (pedido_id,))
+        conn.execute(
+            "DELETE FROM bloques_archivados WHERE id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM pedidos_archivados WHERE bloque = ?)",
+            (fila[0], fila[0]),
+        )
+        self._anotar("pedido_eliminado", {"id": pedido_id})
+
+    def listar_archivados(self, desde: float = 0.0) -> List[Pedido]:
+        with self._lectura() as conn:
+            return self._cargar_archivados(conn, _FILTRO_DESDE, (desde,))
+
+    def tamano_conjunto(self) -> Dict[str, int]:
+        with self._lectura() as conn:
+            activos, terminados = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(estado IN (?, ?)), 0) FROM pedidos", ESTADOS_TERMINADOS
+            ).fetchone()
+            archivados = conn.execute("SELECT COUNT(*) FROM pedidos_archivados").fetchone()[0]
+            bytes_ = conn.execute("SELECT COALESCE(SUM(LENGTH(datos)), 0) FROM bloques_archivados").fetchone()[0]
+        return {"activos": activos, "terminados_activos": terminados, "archivados": archivados, "archivo_bytes": bytes_}
@@ -0,0 +1,112 @@
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from .modelos import LineaPedido
+
+
+# ============================================================
+#  RESERVA ATÓMICA DE STOCK
+# ============================================================
+
+Clave = Tuple[str, str]  # (tipo, nombre)
+
+
+class StockInsuficiente(ValueError):
+    """El pedido pide más unidades de las disponibles; no se descontó nada."""
+
+    def __init__(self, faltantes: List[Tuple[str, str, int, int]]):
+        # faltantes: [(tipo, nombre, pedido, disponible)]
+        self.faltantes = faltantes
+        detalle = ", ".join(
+            f"{nombre} (pedido {pedido}, disponible {disponible})"
+            for _, nombre, pedido, disponible in faltantes
+        )
+        super().__init__(f"Stock insuficiente: {detalle}")
+
+
+def agrupar_cantidades(lineas: Iterable[LineaPedido]) -> Dict[Clave, int]:
+    """Suma las cantidades por producto (un pedido puede repetir producto)."""
+    cantidades: Dict[Clave, int] = {}
+    for linea in lineas:
+        clave = (linea.tipo, linea.nombre)
+        cantidades[clave] = cantidades.get(clave, 0) + linea.cantidad
+    return cantidades
+
+
+def cantidades_reposicion(items_list: Iterable[Dict]) -> Dict[Clave, int]:
+    """Unidades a sumar por producto en una reposición ({tipo, nombre, cantidad}, fusiona repetidos)."""
+    cantidades: Dict[Clave, int] = {}
+    for it in items_list:
+        cantidad = int(it["cantidad"])
+        if cantidad <= 0:
+            raise ValueError(f"Cantidad a reponer inválida para {it['nombre']}: {cantidad}")
+        clave = (it["tipo"], it["nombre"])
+        cantidades[clave] = cantidades.get(clave, 0) + cantidad
+    if not cantidades:
+        raise ValueError("La reposición no tiene productos.")
+    return cantidades
+
+
+class MotorReservas:
+    """Valida y descuenta todos los items de un pedido como una sola operación.
+
+    Cada producto tiene su propio candado y se toman siempre en orden de
+    clave (sin interbloqueos). Dos pedidos que no comparten productos, por
+    ejemplo uno de bebidas y otro de comida mexicana, no se esperan entre sí.
+    """
+
+    def __init__(self, inventario: Dict[str, Dict[str, Dict[str, float]]]):
+        self._inventario = inventario
+        self._candados: Dict[Clave, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _candado(self, clave: Clave) -> threading.Lock:
+        candado = self._candados.get(clave)
+        if candado is None:
+            with self._lock:
+                candado = self._candados.setdefault(clave, threading.Lock())
+        return candado
+
+    def _bloquear(self, claves: List[Clave]) -> List[threading.Lock]:
+        tomados = []
+        for clave in sorted(claves):
+            candado = self._candado(clave)
+            candado.acquire()
+            tomados.append(candado)
+        return tomados
+
+    def reservar(self, lineas: List[LineaPedido]):
+        """Todo o nada: si falta stock de algún producto lanza StockInsuficiente sin tocar nada."""
+        cantidades = agrupar_cantidades(lineas)
+        for tipo, nombre in cantidades:
+            if nombre not in self._inventario.get(tipo, {}):
+                raise KeyError(f"Producto desconocido: {tipo}/{nombre}")
+
+        tomados = self._bloquear(list(cantidades))
+        try:
+            faltantes = []
+            for (tipo, nombre), cantidad in cantidades.items():
+                disponible = self._inventario[tipo][nombre]["stock"]
+                if cantidad <= 0 or disponible < cantidad:
+                    faltantes.append((tipo, nombre, cantidad, disponible))
+            if faltantes:
+                raise StockInsuficiente(faltantes)
+            for (tipo, nombre), cantidad in cantidades.items():
+                self._inventario[tipo][nombre]["stock"] -= cantidad
+        finally:
+            for candado in tomados:
+                candado.release()
+
+    def liberar(self, lineas: List[LineaPedido]):
+        """Devuelve al inventario el stock de un pedido cancelado o eliminado."""
+        self.sumar(agrupar_cantidades(lineas))
+
+    def sumar(self, cantidades: Dict[Clave, int]):
+        """Suma unidades al stock (devoluciones y reposiciones) con los mismos candados que reservar."""
+        tomados = self._bloquear(list(cantidades))
+        try:
+            for (tipo, nombre), cantidad in cantidades.items():
+                self._inventario[tipo][nombre]["stock"] += cantidad
+        finally:
+            for candado in tomados:
+                candado.release()
@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+try:  # bloqueo entre procesos (solo POSIX)
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# ============================================================
+#  GENERADOR DE IDS (secuencias con nombre, nunca reutiliza)
+# ============================================================
+
+class GeneradorIds:
+    """Secuencias monótonas con nombre ("pedido", "mesa", ...).
+
+    Cada llamada a `siguiente` es O(1) y protegida por candado. Si se indica
+    `ruta`, el contador se persiste en un JSON reservando bloques de ids
+    (esquema hi/lo): solo se escribe a disco una vez cada `bloque` ids y, tras
+    un reinicio, la secuencia continúa después del último bloque reservado,
+    así que un id nunca se repite aunque se borre el pedido más reciente.
+    """
+
+    def __init__(self, ruta: Optional[str] = None, bloque: int = 50):
+        self._lock = threading.Lock()
+        self._ruta = ruta
+        self._bloque = max(1, bloque)
+        self._actual: Dict[str, int] = {}   # último id entregado
+        self._limite: Dict[str, int] = {}   # último id reservado en disco
+
+    def siguiente(self, nombre: str) -> int:
+        with self._lock:
+            valor = self._actual.get(nombre)
+            if valor is None or valor >= self._limite.get(nombre, 0):
+                valor = self._reservar_bloque(nombre)
+            valor += 1
+            self._actual[nombre] = valor
+            return valor
+
+    # ----------------------- PERSISTENCIA -----------------------
+
+    def _reservar_bloque(self, nombre: str) -> int:
+        """Reserva el siguiente bloque y devuelve el id base (último usado)."""
+        base = max(self._actual.get(nombre, 0), self._limite.get(nombre, 0))
+        if self._ruta is None:
+            self._limite[nombre] = base + self._bloque
+            return base
+
+        directorio = os.path.dirname(os.path.abspath(self._ruta))
+        os.makedirs(directorio, exist_ok=True)
+        with open(self._ruta + ".lock", "a") as candado:
+            if fcntl is not None:
+                fcntl.flock(candado, fcntl.LOCK_EX)
+            try:
+                datos = self._leer()
+                # Otro proceso pudo haber reservado bloques más adelante
+                base = max(base, datos.get(nombre, 0))
+                datos[nombre] = base + self._bloque
+                self._escribir(datos)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(candado, fcntl.LOCK_UN)
+        self._limite[nombre] = base + self._bloque
+        return base
+
+    def _leer(self) -> Dict[str, int]:
+        try:
+            with open(self._ruta, "r", encoding="utf-8") as f:
+                return {k: int(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+
+    def _escribir(self, datos: Dict[str, int]):
+        tmp = self._ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._ruta)
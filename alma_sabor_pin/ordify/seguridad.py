@@ -0,0 +1,253 @@
+import base64
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .modelos import Usuario
+
+
+# ============================================================
+#  HASH DE PINES
+# ============================================================
+# Un PIN de 6 dígitos tiene solo 10^6 combinaciones: el hash lento por sí
+# solo no lo protege si alguien copia la base, por eso además se separa la
+# "pimienta" (secreto del servidor, fuera de la base) y se limita la tasa de
+# intentos en el login.
+
+ALGORITMO = "pbkdf2_sha256"
+ITERACIONES = 200_000
+
+
+def hashear_pin(pin: str, iteraciones: int = ITERACIONES, sal: Optional[bytes] = None) -> str:
+    """Hash con sal y PBKDF2: "pbkdf2_sha256$iteraciones$sal_hex$hash_hex"."""
+    sal = sal if sal is not None else secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", pin.encode(), sal, iteraciones)
+    return f"{ALGORITMO}${iteraciones}${sal.hex()}${digest.hex()}"
+
+
+def verificar_pin(pin: str, guardado: str) -> bool:
+    """Recalcula el hash con la sal guardada y compara en tiempo constante."""
+    algoritmo, iteraciones, sal_hex, digest_hex = guardado.split("$")
+    if algoritmo != ALGORITMO:
+        raise ValueError(f"Algoritmo de hash no soportado: {algoritmo}")
+    digest = hashlib.pbkdf2_hmac("sha256", pin.encode(), bytes.fromhex(sal_hex), int(iteraciones))
+    return hmac.compare_digest(digest, bytes.fromhex(digest_hex))
+
+
+def cargar_pimienta(ruta: str) -> bytes:
+    """Secreto del servidor: ORDIFY_PIMIENTA (hex) o un archivo 0600 que se crea la primera vez."""
+    entorno = os.environ.get("ORDIFY_PIMIENTA")
+    if entorno:
+        return bytes.fromhex(entorno)
+    try:
+        with open(ruta, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    pimienta = secrets.token_bytes(32)
+    try:
+        fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Otro proceso la creó primero: usar la suya
+        with open(ruta, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(pimienta)
+    return pimienta
+
+
+# ============================================================
+#  ALMACÉN DE USUARIOS
+# ============================================================
+
+class AlmacenUsuarios:
+    """Usuarios indexados por HMAC(pimienta, PIN), con el PIN guardado como hash lento.
+
+    - Búsqueda O(1): el índice HMAC es rápido y no revela el PIN sin la
+      pimienta; luego se verifica un único hash lento, no uno por usuario.
+    - Un PIN inexistente también paga un hash lento (contra un hash señuelo),
+      así un fallo tarda lo mismo que un acierto sin caché.
+    - Caché de verificación: tras un acierto, el mismo PIN entra sin hash
+      lento durante `ttl_cache` segundos. Los fallos nunca se cachean.
+    """
+
+    def __init__(self, pimienta: bytes, iteraciones: int = ITERACIONES, ttl_cache: float = 900.0):
+        self._pimienta = pimienta
+        self._iteraciones = iteraciones
+        self._ttl = ttl_cache
+        self._lock = threading.Lock()
+        self._usuarios: Dict[bytes, Tuple[str, Usuario]] = {}   # índice -> (hash lento, usuario)
+        self._verificados: Dict[bytes, float] = {}               # índice -> vence
+        self._senuelo = hashear_pin(secrets.token_hex(8), iteraciones)
+
+    def _indice(self, pin: str) -> bytes:
+        return hmac.new(self._pimienta, pin.encode(), hashlib.sha256).digest()
+
+    def registrar(self, pin: str, usuario: Usuario):
+        """Da de alta (o cambia el PIN de) un usuario."""
+        indice = self._indice(pin)
+        guardado = hashear_pin(pin, self._iteraciones)
+        with self._lock:
+            actual = self._usuarios.get(indice)
+            if actual is not None and actual[1] != usuario:
+                raise ValueError("Ese PIN ya está asignado a otro usuario.")
+            self._usuarios[indice] = (guardado, usuario)
+            self._verificados.pop(indice, None)
+
+    def eliminar(self, pin: str):
+        indice = self._indice(pin)
+        with self._lock:
+            self._usuarios.pop(indice, None)
+            self._verificados.pop(indice, None)
+
+    def autenticar(self, pin: str) -> Optional[Usuario]:
+        indice = self._indice(pin)
+        entrada = self._usuarios.get(indice)
+        if entrada is None:
+            verificar_pin(pin, self._senuelo)
+            return None
+        guardado, usuario = entrada
+        vence = self._verificados.get(indice)
+        if vence is not None and vence > time.monotonic():
+            return usuario
+        if not verificar_pin(pin, guardado):
+            return None
+        self._verificados[indice] = time.monotonic() + self._ttl
+        return usuario
+
+    def __len__(self) -> int:
+        return len(self._usuarios)
+
+    # ----------------------- SESIONES FIRMADAS -----------------------
+
+    def _firma(self, carga: bytes) -> bytes:
+        return hmac.new(self._pimienta, b"sesion:" + carga, hashlib.sha256).hexdigest().encode()
+
+    def firmar_sesion(self, usuario: Usuario, ttl: float) -> str:
+        """Token de sesión sin estado: lo acepta cualquier proceso con la misma pimienta hasta que vence."""
+        datos = json.dumps([usuario.rol, usuario.nombre, int(time.time() + ttl)], ensure_ascii=False)
+        carga = base64.urlsafe_b64encode(datos.encode()).rstrip(b"=")
+        return (carga + b"." + self._firma(carga)).decode()
+
+    def verificar_sesion(self, token: str) -> Optional[Usuario]:
+        carga, _, firma = token.encode().partition(b".")
+        if not carga or not hmac.compare_digest(firma, self._firma(carga)):
+            return None
+        rol, nombre, vence = json.loads(base64.urlsafe_b64decode(carga + b"=" * (-len(carga) % 4)))
+        if vence <= time.time():
+            return None
+        return Usuario(rol=rol, nombre=nombre)
+
+
+# ============================================================
+#  LIMITADOR DE INTENTOS (token bucket)
+# ============================================================
+
+CLIENTE_SIN_DIRECCION = "local"
+
+Red = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def redes_confiables(proxies: Iterable[str]) -> Tuple[Red, ...]:
+    """IPs o redes CIDR de los proxies cuyo X-Forwarded-For se acepta (vacías se ignoran)."""
+    return tuple(ipaddress.ip_network(p.strip(), strict=False) for p in proxies if p.strip())
+
+
+def clave_cliente(direccion: Optional[str], reenviado: Optional[str], confiables: Tuple[Red, ...]) -> str:
+    """Dirección con la que el limitador identifica al cliente.
+
+    - Es la del otro extremo de la conexión. X-Forwarded-For solo se lee si
+      esa conexión viene de un proxy de `confiables`, y se recorre de derecha
+      a izquierda hasta el primer salto que no es un proxy confiable (lo de
+      la izquierda lo escribe el propio cliente).
+    - Un salto malformado no sirve de clave, porque el cliente podría
+      cambiarlo en cada intento; en ese caso cuenta el proxy.
+    - Sin dirección conocida, todos comparten CLIENTE_SIN_DIRECCION: abrir
+      otra sesión no da un bucket nuevo.
+    """
+    if not direccion:
+        return CLIENTE_SIN_DIRECCION
+    try:
+        par = ipaddress.ip_address(direccion)
+    except ValueError:
+        return direccion
+    if not reenviado or not any(par in red for red in confiables):
+        return direccion
+    for salto in reversed(reenviado.split(",")):
+        try:
+            ip = ipaddress.ip_address(salto.strip())
+        except ValueError:
+            return direccion
+        if not any(ip in red for red in confiables):
+            return str(ip)
+    return direccion
+
+
+class LimitadorIntentos:
+    """Token bucket por cliente más uno global para todo el proceso.
+
+    Cada intento de login consume una ficha del cliente y otra del global.
+    Las fichas se reponen a `tasa` por segundo hasta `capacidad`. El bucket
+    global acota los intentos de quien abre muchas sesiones a la vez. Solo se
+    recuerdan los `max_clientes` clientes más recientes. El cliente se
+    identifica con `clave` (ver clave_cliente y `proxies_confiables`).
+    """
+
+    def __init__(
+        self,
+        capacidad: float = 5,
+        tasa: float = 1 / 12,
+        capacidad_global: float = 60,
+        tasa_global: float = 2.0,
+        max_clientes: int = 10_000,
+        proxies_confiables: Iterable[str] = (),
+    ):
+        self._confiables = redes_confiables(proxies_confiables)
+        self._capacidad = capacidad
+        self._tasa = tasa
+        self._capacidad_global = capacidad_global
+        self._tasa_global = tasa_global
+        self._max_clientes = max_clientes
+        self._lock = threading.Lock()
+        self._clientes: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()   # clave -> (fichas, instante)
+        self._global = (capacidad_global, time.monotonic())
+
+    @staticmethod
+    def _reponer(estado: Tuple[float, float], capacidad: float, tasa: float, ahora: float) -> float:
+        fichas, instante = estado
+        return min(capacidad, fichas + (ahora - instante) * tasa)
+
+    def clave(self, direccion: Optional[str], reenviado: Optional[str] = None) -> str:
+        return clave_cliente(direccion, reenviado, self._confiables)
+
+    def consumir(self, clave: str) -> Tuple[bool, float]:
+        """(permitido, segundos de espera si no lo está)."""
+        ahora = time.monotonic()
+        with self._lock:
+            estado = self._clientes.pop(clave, None)
+            fichas = self._capacidad if estado is None else self._reponer(estado, self._capacidad, self._tasa, ahora)
+            fichas_global = self._reponer(self._global, self._capacidad_global, self._tasa_global, ahora)
+
+            if fichas >= 1 and fichas_global >= 1:
+                fichas -= 1
+                fichas_global -= 1
+                espera = 0.0
+            else:
+                espera = max(
+                    (1 - fichas) / self._tasa if fichas < 1 else 0.0,
+                    (1 - fichas_global) / self._tasa_global if fichas_global < 1 else 0.0,
+                )
+
+            self._clientes[clave] = (fichas, ahora)
+            self._global = (fichas_global, ahora)
+            while len(self._clientes) > self._max_clientes:
+                self._clientes.popitem(last=False)
+        return espera == 0.0, espera
@@ -0,0 +1,336 @@
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .colas import EntradaCola, PlanificadorEstaciones, ReglasPrioridad
+from .eventos import BusEventos, Evento, TEMA_PEDIDOS, tema_estacion
+from .menu import MenuCacheado
+from .metricas import medido
+from .modelos import Pago, Pedido, Usuario
+from .pagos import ClaveLinea, LibroCuenta, LibrosCuenta
+from .repositorio import Repositorio
+from .tablas import TablasSala
+
+if TYPE_CHECKING:  # solo para anotaciones: no cargar hashlib/secrets ni sqlite3 al importar
+    from .bitacora import Bitacora
+    from .ciclo_vida import GestorCicloVida
+    from .cuentas import ArchivoCuentas, CuentaCerrada
+    from .pool import PoolConexiones
+    from .pronostico import VigilanteInventario
+    from .seguridad import AlmacenUsuarios, LimitadorIntentos
+    from .sincronizacion import SincronizadorProcesos
+
+
+# ============================================================
+#  SERVICIOS DE NEGOCIO (sin Streamlit)
+# ============================================================
+
+# Estación (tipo de producto) que atiende cada rol de cocina/bar
+ESTACION_POR_ROL = {
+    "chef_italiano": "comida_italiana",
+    "chef_mexicano": "comida_mexicana",
+    "barista": "bebidas",
+}
+
+
+class Servicios:
+    """Operaciones del restaurante sobre un repositorio y un bus de eventos.
+
+    Es lo que antes vivía en app.py leyendo `st.session_state`: ahora la
+    vista de Streamlit, una API o un benchmark crean (o comparten) una
+    instancia y llaman a los mismos métodos. Toda mutación de pedidos se
+    publica en el bus para las pantallas de estación.
+    """
+
+    def __init__(
+        self,
+        repo: Repositorio,
+        bus: Optional[BusEventos] = None,
+        usuarios: Optional["AlmacenUsuarios"] = None,
+        limitador: Optional["LimitadorIntentos"] = None,
+        bitacora: Optional["Bitacora"] = None,
+        pool: Optional["PoolConexiones"] = None,
+        reglas: Optional[ReglasPrioridad] = None,
+        archivo: Optional["ArchivoCuentas"] = None,
+    ):
+        self.repo = repo
+        self.bus = bus if bus is not None else BusEventos()
+        self.usuarios = usuarios
+        self.limitador = limitador
+        self.bitacora = bitacora
+        self.pool = pool
+        self.archivo = archivo
+        self.menu = MenuCacheado(repo)
+        self.tablas = TablasSala(repo)
+        self.libros = LibrosCuenta(repo)
+        self.sincronizador: Optional["SincronizadorProcesos"] = None   # ver construir_servicios
+        self.vigilante: Optional["VigilanteInventario"] = None
+        self.ciclo_vida: Optional["GestorCicloVida"] = None
+        # Leer el pedido y publicarlo es atómico: un aviso de otro proceso leído antes de un
+        # cambio local no puede publicarse después de él (las colas verían un estado viejo)
+        self._publicacion = threading.Lock()
+        self.colas = PlanificadorEstaciones(repo, self.bus, reglas)
+
+    # ----------------------- USUARIOS -----------------------
+
+    @medido()
+    def autenticar_pin(self, pin: str) -> Optional[Usuario]:
+        return self.usuarios.autenticar(pin) if self.usuarios is not None else None
+
+    def iniciar_sesion(
+        self, pin: str, direccion: Optional[str], reenviado: Optional[str] = None
+    ) -> Tuple[Optional[Usuario], float]:
+        """(usuario o None, segundos de espera si el limitador rechazó el intento).
+
+        `direccion` es la del otro extremo de la conexión y `reenviado` su
+        X-Forwarded-For, que solo cuenta si viene de un proxy confiable.
+        """
+        if self.limitador is not None:
+            permitido, espera = self.limitador.consumir(self.limitador.clave(direccion, reenviado))
+            if not permitido:
+                return None, espera
+        return self.autenticar_pin(pin), 0.0
+
+    # ----------------------- MESAS -----------------------
+
+    @medido()
+    def crear_mesa(self, numero: int, comensales: int) -> bool:
+        return self.repo.crear_mesa(numero, comensales)
+
+    @medido()
+    def eliminar_mesa_por_numero(self, mesa_num: int):
+        self.repo.eliminar_mesa(mesa_num)
+
+    # ----------------------- CUENTAS Y PAGOS -----------------------
+
+    @medido()
+    def libro_cuenta(self, mesa_num: int) -> Optional[LibroCuenta]:
+        """Líneas, pagos y saldo de la mesa (cacheado por versión, ver pagos.py); None si no existe."""
+        return self.libros.libro(mesa_num)
+
+    @medido()
+    def registrar_pago(
+        self,
+        mesa_num: int,
+        cobrado_por: str,
+        importe: Optional[float] = None,
+        comensal: int = 0,
+        lineas: Optional[Dict[ClaveLinea, int]] = None,
+    ) -> Pago:
+        """Cobra una parte de la cuenta contra el saldo de la mesa.
+
+        - Por ítem: `lineas` {(pedido_id, orden): unidades}; el importe sale
+          de esas unidades.
+        - Partes iguales, por comensal o a cuenta: `importe`, y `comensal`
+          para que el reparto por comensal descuente lo que ya pagó.
+
+        Se valida contra el libro leído dentro de la transacción, así dos
+        cobros simultáneos (también de otro proceso) no superan el saldo.
+        KeyError si la mesa no existe; ValueError si el pago no cabe.
+        """
+        with self.repo.transaccion():
+            libro = self.libros.libro(mesa_num, fresco=True)
+            if libro is None:
+                raise KeyError(f"No existe la mesa {mesa_num}")
+            if lineas:
+                importe = libro.importe_items(lineas)
+            # NaN no es mayor, menor ni igual a nada: dejaría pasar cualquier pago posterior
+            if importe is None or not math.isfinite(importe) or importe <= 0:
+                raise ValueError("El importe del pago debe ser un número mayor que cero.")
+            if round(importe, 2) > libro.saldo:
+                raise ValueError(f"El pago (${importe:.2f}) supera el saldo de la mesa (${libro.saldo:.2f}).")
+            if not 0 <= comensal <= libro.mesa.comensales:
+                raise ValueError(f"La mesa {mesa_num} tiene {libro.mesa.comensales} comensales.")
+            return self.repo.registrar_pago(
+                mesa_num, importe, cobrado_por, comensal,
+                [(pedido_id, orden, unidades) for (pedido_id, orden), unidades in (lineas or {}).items()],
+            )
+
+    @medido()
+    def cerrar_cuenta(self, mesa_num: int, cobrado_por: str) -> Optional["CuentaCerrada"]:
+        """Cobra el saldo de la mesa: archiva su cuenta y sus pagos y libera la mesa y sus pedidos.
+
+        Lo que quede por pagar se registra como un último pago. Los pedidos
+        aún pendientes se dan por entregados (están pagados: su stock no
+        vuelve al inventario) y los cancelados no se facturan. Todo ocurre
+        en una transacción y la cuenta se archiva antes de borrar nada: si
+        archivar falla, la mesa sigue abierta con sus pagos. Devuelve None
+        si la mesa no existe.
+        """
+        from .cuentas import resumir_cuenta
+
+        with self.repo.transaccion():
+            libro = self.libros.libro(mesa_num, fresco=True)
+            if libro is None:
+                return None
+            mesa = libro.mesa
+            saldo = self.repo.registrar_pago(mesa_num, libro.saldo, cobrado_por) if libro.saldo > 0 else None
+            pagos = self.repo.pagos_de_mesa(mesa_num)
+            pedidos = self.repo.pedidos_de_mesa(mesa_num)
+            cobrados = [p for p in pedidos if p.estado != "cancelado"]
+            try:
+                if self.archivo is not None:
+                    cuenta = self.archivo.archivar(mesa, cobrados, cobrado_por, pagos=pagos)
+                else:
+                    cuenta = resumir_cuenta(mesa, cobrados, cobrado_por)
+            except BaseException:
+                # SQLite deshace todo con la transacción; en memoria el pago del saldo ya se aplicó
+                if saldo is not None:
+                    self.repo.anular_pago(mesa_num, saldo.id)
+                raise
+            for p in pedidos:
+                if p.estado == "pendiente":
+                    self.repo.actualizar_estado_pedido(p.id, "entregado")
+                self.repo.eliminar_pedido(p.id)
+            self.repo.eliminar_mesa(mesa_num)
+        for p in pedidos:
+            self._publicar_cambio("pedido_eliminado", p, eliminado=True)
+        return cuenta
+
+    # ----------------------- INVENTARIO -----------------------
+
+    @medido()
+    def reponer_stock(self, items_list: List[Dict[str, Any]]) -> List[str]:
+        """Repone varios productos en una transacción ({tipo, nombre, cantidad} por línea).
+
+        El menú, las tablas y el pronóstico de agotamiento lo ven por la
+        versión del inventario, también en los demás procesos.
+        """
+        return self.repo.reponer_stock(items_list)
+
+    # ----------------------- PEDIDOS -----------------------
+
+    @medido()
+    def crear_pedido(self, mesa_num: int, items_list: List[Dict[str, Any]], creador: str) -> Pedido:
+        """Registra un nuevo pedido con items de varias categorías.
+
+        Todo el carrito entra en una sola llamada: una reserva y un commit. La
+        reserva de stock es atómica: si algún producto no alcanza lanza
+        StockInsuficiente y no se descuenta nada. KeyError si la mesa no existe.
+        """
+        pedido = self.repo.agregar_pedido(mesa_num, items_list, creador)
+        self._publicar_cambio("pedido_creado", pedido)
+        return pedido
+
+    @medido()
+    def filtrar_pedidos_por_estacion(self, tipo: str) -> List[Pedido]:
+        """Pedidos pendientes para una estación (chef/barista)."""
+        # El índice solo contiene pedidos con al menos un item de ese tipo
+        return self.repo.pedidos_pendientes_estacion(tipo)
+
+    @medido()
+    def cola_estacion(self, tipo: str) -> List[EntradaCola]:
+        """Cola priorizada de una estación, con espera y tiempo estimado por pedido (ver colas.py)."""
+        return self.colas.cola(tipo)
+
+    @medido()
+    def obtener_pedidos_por_mesa(self, mesa_num: int) -> List[Pedido]:
+        """Obtiene todos los pedidos (no cancelados) de una mesa."""
+        return self.repo.pedidos_de_mesa(mesa_num, excluir_estado="cancelado")
+
+    @medido()
+    def calcular_total_pedido(self, p: Pedido) -> float:
+        """Total con los precios capturados al crear el pedido (se mantiene en el repositorio)."""
+        return p.total
+
+    @medido()
+    def calcular_total_mesa(self, mesa_num: int) -> float:
+        return self.repo.total_mesa(mesa_num)
+
+    @medido()
+    def marcar_pedido_entregado(self, pedido_id: int) -> bool:
+        """Marca un pedido pendiente como entregado; False si no existe o ya no estaba pendiente."""
+        if not self.repo.actualizar_estado_pedido(pedido_id, "entregado"):
+            return False
+        self._publicar_pedido("pedido_entregado", pedido_id)
+        return True
+
+    @medido()
+    def marcar_estacion_enviada(self, pedido_id: int, tipo: str) -> bool:
+        """Marca lo de una estación como enviado; False si el pedido o la estación ya no estaban pendientes."""
+        if not self.repo.actualizar_estado_produccion(pedido_id, tipo, "enviado"):
+            return False
+        self._publicar_pedido("estacion_enviada", pedido_id)
+        return True
+
+    @medido()
+    def cancelar_pedido(self, pedido_id: int) -> bool:
+        """Cancela un pedido pendiente y devuelve su stock al inventario."""
+        if not self.repo.cancelar_pedido(pedido_id):
+            return False
+        self._publicar_pedido("pedido_cancelado", pedido_id)
+        return True
+
+    @medido()
+    def eliminar_pedido_por_id(self, pedido_id: int):
+        pedido = self.repo.obtener_pedido(pedido_id)
+        self.repo.eliminar_pedido(pedido_id)
+        if pedido is not None:
+            self._publicar_cambio("pedido_eliminado", pedido, eliminado=True)
+
+    # ----------------------- EVENTOS -----------------------
+
+    @medido()
+    def _publicar_cambio(self, tipo_evento: str, pedido: Pedido, eliminado: bool = False):
+        """Avisa del cambio al tema general y a cada estación que participa en el pedido."""
+        temas = [TEMA_PEDIDOS] + [tema_estacion(t) for t in pedido.produccion_estados]
+        foto = None
+        if not eliminado:
+            # Copia: el repositorio en memoria comparte sus objetos vivos
+            foto = pedido.copiar()
+        self.bus.publicar(temas, Evento(tipo=tipo_evento, pedido_id=pedido.id, pedido=foto))
+
+    def _publicar_pedido(self, tipo_evento: str, pedido_id: int):
+        with self._publicacion:
+            pedido = self.repo.obtener_pedido(pedido_id)
+            if pedido is not None:
+                self._publicar_cambio(tipo_evento, pedido)
+
+    def notificar_externo(self, tipo_evento: str, pedido_id: int):
+        """Publica un cambio que confirmó otro proceso (ver sincronizacion.py).
+
+        Si el pedido ya no existe no se sabe en qué estaciones estaba: el
+        aviso va a todas, y cada cola lo quita si lo tenía.
+        """
+        with self._publicacion:
+            pedido = self.repo.obtener_pedido(pedido_id)
+            if pedido is not None:
+                self._publicar_cambio(tipo_evento, pedido)
+                return
+            temas = [TEMA_PEDIDOS] + [tema_estacion(t) for t in self.repo.categorias_inventario()]
+            self.bus.publicar(temas, Evento(tipo=tipo_evento, pedido_id=pedido_id))
+
+    def resincronizar(self):
+        """Tras perder avisos de otros procesos: invalida cachés y despierta a todas las pantallas."""
+        categorias = self.repo.categorias_inventario()
+        self.repo.cambios_externos(["mesa_creada", "pedido_creado", "pago_registrado"], [None, *categorias])
+        self.colas.invalidar()
+        temas = [TEMA_PEDIDOS] + [tema_estacion(t) for t in categorias]
+        self.bus.publicar(temas, Evento(tipo="resincronizar", pedido_id=0))
+
+
+# ============================================================
+#  CARRITO (líneas {tipo, nombre, cantidad} antes de confirmar)
+# ============================================================
+
+def cantidad_en_carrito(carrito: List[Dict[str, Any]], tipo: str, nombre: str) -> int:
+    return sum(linea["cantidad"] for linea in carrito if linea["tipo"] == tipo and linea["nombre"] == nombre)
+
+
+def agregar_al_carrito(carrito: List[Dict[str, Any]], tipo: str, nombre: str, cantidad: int, stock_disponible: int) -> Optional[str]:
+    """Suma una línea al carrito (fusiona productos repetidos).
+
+    Devuelve un mensaje de error si, con lo que ya hay en el carrito, se
+    supera el stock disponible; en ese caso el carrito no cambia.
+    """
+    en_carrito = cantidad_en_carrito(carrito, tipo, nombre)
+    if cantidad < 1:
+        return "La cantidad debe ser al menos 1."
+    if en_carrito + cantidad > stock_disponible:
+        return f"Stock insuficiente de {nombre}: disponible {stock_disponible}, en carrito {en_carrito}."
+    for linea in carrito:
+        if linea["tipo"] == tipo and linea["nombre"] == nombre:
+            linea["cantidad"] += cantidad
+            return None
+    carrito.append({"nombre": nombre, "cantidad": int(cantidad), "tipo": tipo})
+    return None
@@ -0,0 +1,114 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from .repositorio import error_transitorio
+from .repositorio_sqlite import RepositorioSQLite, crear_conexion_sqlite
+from .servicios import Servicios
+
+_log = logging.getLogger(__name__)
+
+
+# ============================================================
+#  SINCRONIZACIÓN ENTRE PROCESOS (misma base SQLite)
+# ============================================================
+# Varios servidores (Streamlit, API) pueden abrir el mismo archivo: la base
+# es la fuente de verdad y cada proceso guarda cachés derivadas (menú,
+# tablas, colas de estación, long-poll). Cada transacción deja sus eventos en
+# la tabla `cambios`; este hilo los lee y actualiza las cachés locales como
+# si el cambio hubiera ocurrido en el proceso.
+
+class SincronizadorProcesos:
+    """Aplica en este proceso los cambios que confirmaron otros procesos.
+
+    Cada `intervalo` segundos consulta `PRAGMA data_version` en una conexión
+    propia. Es una lectura en memoria que solo cambia cuando otra conexión
+    confirmó algo, así que sin actividad no toca la tabla. Si cambió, lee
+    las filas nuevas de `cambios` que no son de este proceso y por cada una:
+
+    - avanza version_mesas / version_pedidos / version_pagos / version_inventario;
+    - publica el pedido en el bus (una vez por pedido y revisión), que
+      despierta a las colas de estación y a los clientes en long-poll/SSE.
+
+    Si faltan filas (el proceso estuvo detenido más que la retención de
+    `cambios`, ver RepositorioSQLite.retencion_cambios), no se reproducen:
+    se invalida todo con Servicios.resincronizar.
+    """
+
+    def __init__(self, servicios: Servicios, ruta: str, intervalo: float = 0.2):
+        if not isinstance(servicios.repo, RepositorioSQLite):
+            raise TypeError("La sincronización entre procesos requiere el backend SQLite.")
+        self.servicios = servicios
+        self.intervalo = intervalo
+        self._origen = servicios.repo.origen
+        self._conn = crear_conexion_sqlite(ruta)
+        self._lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        # Lo anterior ya está en la base; se sigue desde el último número asignado (aunque se haya podado)
+        fila = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios'").fetchone()
+        self._ultimo = fila[0] if fila else 0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self.aplicados = 0
+        self.resincronizaciones = 0
+
+    def iniciar(self) -> "SincronizadorProcesos":
+        self._hilo = threading.Thread(target=self._bucle, name="ordify-sincronizacion", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        self._conn.close()
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.revisar()
+            except Exception as e:
+                # Base ocupada o reiniciándose: se reintenta en el próximo intervalo sin avisar
+                if not error_transitorio(e):
+                    _log.exception("Falló la revisión de cambios de otros procesos")
+
+    def revisar(self) -> int:
+        """Aplica los cambios externos pendientes; devuelve cuántos aplicó."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return 0
+            self._data_version = version
+            filas = self._conn.execute(
+                "SELECT seq, origen, tipo, clave, tipos FROM cambios WHERE seq > ? ORDER BY seq",
+                (self._ultimo,),
+            ).fetchall()
+            if not filas:
+                return 0
+            perdidas = filas[0][0] != self._ultimo + 1
+            self._ultimo = filas[-1][0]
+        if perdidas:
+            self.resincronizaciones += 1
+            self.servicios.resincronizar()
+            return len(filas)
+        return self._aplicar([f for f in filas if f[1] != self._origen])
+
+    def _aplicar(self, filas: List[tuple]) -> int:
+        tipos_evento: List[str] = []
+        tipos_inventario: List[Optional[str]] = []
+        pedidos: Dict[int, str] = {}   # pedido_id -> último evento, en orden de llegada
+        for _, _, tipo, clave, tipos in filas:
+            if tipo == "inventario":
+                tipos_inventario.extend(t or None for t in tipos.split(","))
+                continue
+            tipos_evento.append(tipo)
+            # Los archivados ya terminaron: no están en ninguna cola, solo cambia version_pedidos
+            if not tipo.startswith(("mesa_", "inventario_", "pago_")) and tipo != "pedidos_archivados":
+                pedidos.pop(clave, None)
+                pedidos[clave] = tipo
+        # Primero las versiones: quien despierte por el bus ya ve las cachés invalidadas
+        self.servicios.repo.cambios_externos(tipos_evento, tipos_inventario)
+        for pedido_id, tipo in pedidos.items():
+            self.servicios.notificar_externo(tipo, pedido_id)
+        self.aplicados += len(filas)
+        return len(filas)
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List
+
+from .repositorio import Repositorio
+
+
+# ============================================================
+#  TABLAS CACHEADAS (filas de las pestañas de administración)
+# ============================================================
+
+@dataclass(slots=True, frozen=True)
+class Tabla:
+    version: Hashable
+    filas: List[Dict[str, Any]]
+
+    def paginas(self, por_pagina: int) -> int:
+        return max(1, -(-len(self.filas) // por_pagina))
+
+    def pagina(self, numero: int, por_pagina: int) -> List[Dict[str, Any]]:
+        """Filas de la página `numero` (desde 1); solo esas viajan al navegador."""
+        inicio = (numero - 1) * por_pagina
+        return self.filas[inicio:inicio + por_pagina]
+
+
+class TablasSala:
+    """Filas de mesas, pedidos activos e inventario, reconstruidas solo si cambian.
+
+    Igual que MenuCacheado: cada tabla guarda la versión del repositorio con
+    la que se construyó (version_mesas, version_pedidos, version_inventario)
+    y la versión se lee antes que los datos. Un rerun sin cambios devuelve
+    la misma lista sin recorrer pedidos ni formatear filas.
+    """
+
+    def __init__(self, repo: Repositorio):
+        self._repo = repo
+        self._tablas: Dict[Hashable, Tabla] = {}
+
+    def _tabla(self, clave: Hashable, version: Hashable, construir: Callable[[], List[Dict[str, Any]]]) -> Tabla:
+        tabla = self._tablas.get(clave)
+        if tabla is None or tabla.version != version:
+            tabla = Tabla(version, construir())
+            self._tablas[clave] = tabla
+        return tabla
+
+    def mesas(self) -> Tabla:
+        return self._tabla("mesas", self._repo.version_mesas(), lambda: [
+            {"Mesa": m.numero, "Comensales": m.comensales, "Estado": m.estado}
+            for m in self._repo.listar_mesas()
+        ])
+
+    def pedidos_activos(self) -> Tabla:
+        """Pedidos no entregados (pendientes y cancelados), como en la pestaña Pedidos."""
+        return self._tabla("pedidos_activos", self._repo.version_pedidos(), lambda: [
+            {
+                "ID": p.id,
+                "Mesa": p.mesa_numero,
+                "Tipos": " / ".join(t.replace("_", " ").title() for t in sorted(p.produccion_estados)),
+                "Estado": p.estado,
+                "Total aprox": round(p.total, 2),
+            }
+            for p in self._repo.listar_pedidos(excluir_estado="entregado")
+        ])
+
+    def inventario(self, tipo: str) -> Tabla:
+        return self._tabla(("inventario", tipo), self._repo.version_inventario(tipo), lambda: [
+            {"Producto": nombre, "Stock": info["stock"], "Precio": info["precio"]}
+            for nombre, info in self._repo.obtener_categoria(tipo).items()
+        ])
@@ -0,0 +1,7 @@
+# ============================================================
+#  VISTAS DE STREAMLIT POR ROL
+# ============================================================
+# login (sin sesión), sala (administrador y mesero), admin (pestañas solo
+# de administrador) y estacion (chefs y barista). app.py importa cada
+# módulo recién cuando una sesión lo necesita; comun tiene lo compartido
+# (CONFIG, los Servicios del proceso y las tablas paginadas).
@@ -0,0 +1,179 @@
+import datetime
+import time
+
+import streamlit as st
+from typing import Any, Dict
+
+from ordify.metricas import METRICAS, medido
+
+from vistas.comun import obtener_servicios
+
+
+# ============================================================
+#  PESTAÑAS SOLO DE ADMINISTRADOR
+# ============================================================
+
+def describir_evento(tipo: str, datos: Dict[str, Any]) -> str:
+    if tipo == "pedido_creado":
+        return f"Pedido {datos['id']} en mesa {datos['mesa_numero']} (total ${datos['total']})"
+    if tipo == "estado_pedido":
+        return f"Pedido {datos['id']} → {datos['estado']}"
+    if tipo == "estado_produccion":
+        return f"Pedido {datos['id']}, {datos['tipo'].replace('_', ' ')} → {datos['estado']}"
+    if tipo in ("pedido_cancelado", "pedido_eliminado"):
+        return f"Pedido {datos['id']}"
+    if tipo == "mesa_creada":
+        return f"Mesa {datos['numero']} ({datos['comensales']} comensales)"
+    if tipo == "mesa_eliminada":
+        return f"Mesa {datos['numero']}"
+    if tipo == "pago_registrado":
+        quien = f"comensal {datos['comensal']}" if datos["comensal"] else "a cuenta"
+        return f"Pago ${datos['importe']} en mesa {datos['mesa_numero']} ({quien})"
+    if tipo == "pago_anulado":
+        return f"Pago {datos['id']} anulado en mesa {datos['mesa_numero']}"
+    if tipo == "pedidos_archivados":
+        return f"{len(datos['ids'])} pedido(s) archivados"
+    if tipo == "inventario_repuesto":
+        return "Reposición: " + ", ".join(f"{cantidad} x {nombre}" for _, nombre, cantidad in datos["items"])
+    return str(datos)
+
+
+@medido()
+def vista_auditoria():
+    bitacora = obtener_servicios().bitacora
+    col1, col2, col3 = st.columns(3)
+    actor = col1.text_input("Usuario", key="audit_actor").strip() or None
+    tipo = col2.selectbox(
+        "Evento",
+        ["Todos", "pedido_creado", "estado_pedido", "estado_produccion", "pedido_cancelado",
+         "pedido_eliminado", "mesa_creada", "mesa_eliminada", "pago_registrado", "pago_anulado",
+         "pedidos_archivados", "inventario_repuesto"],
+        key="audit_tipo",
+    )
+    limite = col3.number_input("Últimos", min_value=10, max_value=5000, value=200, step=50, key="audit_limite")
+
+    registros = bitacora.ultimos(int(limite), actor=actor, tipo=None if tipo == "Todos" else tipo)
+    if not registros:
+        st.info("No hay eventos registrados con esos filtros.")
+        return
+    st.dataframe(
+        [
+            {
+                "#": r["n"],
+                "Fecha": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["ts"])),
+                "Usuario": r["actor"],
+                "Evento": r["tipo"].replace("_", " "),
+                "Detalle": describir_evento(r["tipo"], r["datos"]),
+            }
+            for r in registros
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+TITULOS_REPORTE = {
+    "por_producto": "Por producto",
+    "por_estacion": "Por estación",
+    "por_mesero": "Por mesero",
+    "por_hora": "Por hora",
+    "por_dia": "Por día",
+    "inventario": "Inventario",
+}
+
+
+def vista_reportes():
+    """Ventas de las cuentas archivadas en un rango de días, con descarga en CSV/Parquet."""
+    from ordify.reportes import TABLAS, a_csv, a_parquet, parquet_disponible, reporte_inventario, resumir_ventas
+
+    servicios = obtener_servicios()
+    if servicios.archivo is None:
+        st.info("El archivo de cuentas no está configurado.")
+        return
+    hoy = datetime.date.today()
+    col1, col2 = st.columns(2)
+    desde = col1.date_input("Desde", value=hoy, key="reporte_desde")
+    hasta = col2.date_input("Hasta", value=hoy, key="reporte_hasta")
+    if st.button("Generar reporte"):
+        resumen = resumir_ventas(servicios.archivo, desde, hasta)
+        tablas = {nombre: resumen.tabla(nombre) for nombre in TABLAS}
+        tablas["inventario"] = reporte_inventario(servicios.repo.obtener_inventario(), resumen)
+        st.session_state.reporte_ventas = (resumen, tablas)
+
+    if "reporte_ventas" not in st.session_state:
+        return
+    resumen, tablas = st.session_state.reporte_ventas
+    st.caption(f"{resumen.desde} a {resumen.hasta} · {resumen.lineas:,} líneas · motor {resumen.motor}")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Cuentas", f"{resumen.cuentas:,}")
+    c2.metric("Pedidos", f"{resumen.pedidos:,}")
+    c3.metric("Ventas", f"${resumen.importe:,.2f}")
+
+    con_parquet = parquet_disponible()
+    for nombre, filas in tablas.items():
+        st.markdown(f"#### {TITULOS_REPORTE[nombre]}")
+        if not filas:
+            st.info("Sin ventas en el período.")
+            continue
+        st.dataframe(filas, use_container_width=True, hide_index=True)
+        d1, d2 = st.columns(2)
+        d1.download_button("CSV", a_csv(filas), file_name=f"{nombre}.csv", mime="text/csv", key=f"csv_{nombre}")
+        if con_parquet:
+            d2.download_button("Parquet", a_parquet(filas), file_name=f"{nombre}.parquet",
+                               mime="application/octet-stream", key=f"parquet_{nombre}")
+
+
+def vista_rendimiento():
+    """Secciones más lentas (p95) desde el arranque o el último reinicio de métricas."""
+    filas = METRICAS.resumen()
+    st.caption(
+        "Latencias por vista, pestaña y función de negocio desde "
+        + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(METRICAS.desde))
+        + ". Los percentiles son aproximados (cubetas logarítmicas)."
+    )
+    if not filas:
+        st.info("Todavía no hay mediciones.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Sección": f["seccion"],
+                    "Llamadas": f["llamadas"],
+                    "Por rerun": round(f["por_rerun"], 2),
+                    "p50 (ms)": round(f["p50_ms"], 3),
+                    "p95 (ms)": round(f["p95_ms"], 3),
+                    "p99 (ms)": round(f["p99_ms"], 3),
+                    "Máx (ms)": round(f["max_ms"], 3),
+                    "Total (s)": round(f["total_s"], 3),
+                }
+                for f in filas
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    desglose = st.session_state.get("desglose_anterior") or {}
+    if desglose:
+        st.markdown("#### Rerun anterior de esta sesión")
+        st.table([
+            {"Sección": nombre, "Llamadas": int(llamadas), "Tiempo (ms)": round(segundos * 1000, 3)}
+            for nombre, (llamadas, segundos) in sorted(desglose.items(), key=lambda kv: kv[1][1], reverse=True)
+        ])
+
+    servicios = obtener_servicios()
+    pool = servicios.pool
+    if pool is not None:
+        st.markdown("#### Pool de conexiones")
+        st.table([{k: round(v, 3) for k, v in pool.metricas().items()}])
+
+    st.markdown("#### Conjunto de trabajo")
+    ciclo_vida = servicios.ciclo_vida
+    if ciclo_vida is None:
+        st.caption("Archivado automático desactivado (ORDIFY_INTERVALO_ARCHIVO=0).")
+    st.table([ciclo_vida.metricas() if ciclo_vida is not None else servicios.repo.tamano_conjunto()])
+
+    with st.expander("Exportación Prometheus"):
+        st.code(METRICAS.a_prometheus(), language="text")
+    if st.button("Reiniciar métricas"):
+        METRICAS.reiniciar()
+        st.rerun()
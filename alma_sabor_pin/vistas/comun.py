@@ -0,0 +1,64 @@
+import streamlit as st
+from typing import Callable
+
+from ordify.configuracion import Configuracion, construir_servicios
+from ordify.metricas import METRICAS, medido
+from ordify.servicios import Servicios
+from ordify.tablas import Tabla
+
+
+# ============================================================
+#  CONFIGURACIÓN GENERAL
+# ============================================================
+
+# Variables ORDIFY_* (datos, backend, pool, intervalo de estaciones, métricas)
+CONFIG = Configuracion.desde_entorno()
+
+
+# ============================================================
+#  SERVICIOS DEL PROCESO
+# ============================================================
+
+@st.cache_resource
+def obtener_servicios() -> Servicios:
+    """Núcleo único del proceso: todas las sesiones (mesero, chefs, barista) lo comparten."""
+    return construir_servicios(CONFIG)
+
+
+@st.cache_resource
+def iniciar_exportacion_metricas() -> bool:
+    """Arranca (una vez por proceso) la exportación configurada por entorno."""
+    if CONFIG.metricas_archivo:
+        METRICAS.exportar_periodicamente(CONFIG.metricas_archivo)
+    if CONFIG.metricas_puerto:
+        METRICAS.servir_prometheus(CONFIG.metricas_puerto)
+    return True
+
+
+# ============================================================
+#  TABLAS PAGINADAS
+# ============================================================
+
+@st.fragment
+@medido()
+def mostrar_tabla(clave: str, obtener: Callable[[], Tabla]):
+    """Una página de la tabla; cambiar de página solo vuelve a ejecutar este fragmento.
+
+    `obtener` devuelve la tabla cacheada (ver ordify/tablas.py): las filas se
+    arman solo cuando cambia la versión de sus datos y al navegador viaja una
+    página de CONFIG.filas_por_pagina filas, no la lista completa.
+    """
+    tabla = obtener()
+    por_pagina = CONFIG.filas_por_pagina
+    paginas = tabla.paginas(por_pagina)
+    llave = f"pagina_{clave}"
+    if st.session_state.get(llave, 1) > paginas:
+        st.session_state[llave] = paginas   # la tabla se achicó desde la última vez
+    pagina = 1
+    if paginas > 1:
+        pagina = int(st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=llave))
+    filas = tabla.pagina(pagina, por_pagina)
+    st.dataframe(filas, use_container_width=True, hide_index=True)
+    if paginas > 1:
+        inicio = (pagina - 1) * por_pagina
+        st.caption(f"Filas {inicio + 1}–{inicio + len(filas)} de {len(tabla.filas)}")
@@ -0,0 +1,88 @@
+import streamlit as st
+
+from ordify.metricas import medido
+from ordify.modelos import Usuario
+from ordify.servicios import ESTACION_POR_ROL
+
+from vistas.comun import CONFIG, obtener_servicios
+
+
+# ============================================================
+#  ESTACIONES (chefs y barista)
+# ============================================================
+
+def minutos(segundos: float) -> str:
+    return f"{segundos / 60:.0f} min"
+
+
+@st.fragment(run_every=CONFIG.intervalo_cola_estacion)
+@medido()
+def panel_estacion(tipo: str):
+    """Se refresca solo (sin rerun de toda la página) cada CONFIG.intervalo_cola_estacion segundos."""
+    # Cola compartida del proceso, en orden de preparación (espera, comensales, resto del pedido)
+    cola = obtener_servicios().cola_estacion(tipo)
+
+    if not cola:
+        st.info("No hay pedidos pendientes para tu estación.")
+        return
+
+    for entrada in cola:
+        p = entrada.pedido
+        titulo = (
+            f"{entrada.posicion + 1}. Pedido #{p.id} - Mesa {p.mesa_numero} · "
+            f"espera {minutos(entrada.espera_s)} · listo en ~{minutos(entrada.estimado_s)}"
+        )
+        with st.expander(titulo, expanded=entrada.posicion == 0):
+            st.write(f"Estado general del pedido: {p.estado}")
+            st.write(f"Creado por: {p.creado_por}")
+            st.write(f"Comensales: {entrada.comensales} · prioridad {entrada.puntaje:.1f}")
+            st.write("Detalle de productos para tu estación:")
+
+            rows = []
+            total = 0.0
+            for it in p.items:
+                if it.tipo != tipo:
+                    continue
+                nombre = it.nombre
+                cant = it.cantidad
+                precio = it.precio
+                subtotal = precio * cant
+                total += subtotal
+                rows.append({
+                    "Producto": nombre,
+                    "Cantidad": cant,
+                    "Precio": precio,
+                    "Subtotal": round(subtotal, 2),
+                })
+            st.table(rows)
+            st.write(f"**Total aprox para esta estación:** ${round(total, 2)}")
+
+            if st.button("Pedido enviado", key=f"enviado_{tipo}_{p.id}"):
+                if obtener_servicios().marcar_estacion_enviada(p.id, tipo):
+                    st.success("Pedido marcado como enviado para esta estación.")
+                    st.rerun(scope="fragment")
+                else:
+                    st.warning("El pedido ya no está pendiente (se canceló, se entregó o ya se envió).")
+
+
+@medido()
+def vista_chef_barista():
+    usuario: Usuario = st.session_state.usuario_actual
+
+    st.sidebar.markdown(f"**Usuario:** {usuario.nombre}")
+    st.sidebar.markdown(f"**Rol:** {usuario.rol.replace('_', ' ').title()}")
+
+    st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+    st.subheader("Pedidos pendientes por estación")
+
+    tipo = ESTACION_POR_ROL.get(usuario.rol)
+
+    if not tipo:
+        st.error("Rol no reconocido para vista de cocina/bar.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+
+    panel_estacion(tipo)
+
+    st.caption("Vista de solo lectura sobre el pedido. Solo se marca como enviado para sacar de la lista.")
+    st.markdown('</div>', unsafe_allow_html=True)
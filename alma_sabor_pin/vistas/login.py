@@ -0,0 +1,51 @@
+from typing import Optional, Tuple
+
+import streamlit as st
+
+from ordify.metricas import medido
+
+from vistas.comun import obtener_servicios
+
+
+# ============================================================
+#  LOGIN POR PIN
+# ============================================================
+
+def origen_cliente() -> Tuple[Optional[str], Optional[str]]:
+    """(dirección de la conexión, X-Forwarded-For) para el limitador de intentos.
+
+    El limitador decide si la cabecera cuenta (solo detrás de un proxy
+    confiable). Streamlit da None en localhost y en versiones sin
+    st.context.ip_address: esos clientes comparten un bucket.
+    """
+    contexto = getattr(st, "context", None)
+    direccion = getattr(contexto, "ip_address", None)
+    cabeceras = getattr(contexto, "headers", None) or {}
+    return direccion, cabeceras.get("X-Forwarded-For")
+
+
+@medido()
+def vista_login():
+    st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+    st.title("Ordify")
+    st.subheader("Acceso al sistema de gestión")
+    st.markdown("### Inicio de sesión por PIN ")
+
+    with st.form("form_login"):
+        pin = st.text_input("PIN", max_chars=6, type="password", help="Ingresa tu PIN de 6 dígitos")
+        submitted = st.form_submit_button("Ingresar")
+
+    if submitted:
+        if len(pin) != 6 or not pin.isdigit():
+            st.error("El PIN debe tener exactamente 6 dígitos numéricos.")
+        else:
+            usuario, espera = obtener_servicios().iniciar_sesion(pin, *origen_cliente())
+            if espera:
+                st.error(f"Demasiados intentos. Espera {espera:.0f} segundos e inténtalo de nuevo.")
+            elif usuario is None:
+                st.error("PIN inválido. Verifica tus datos.")
+            else:
+                st.session_state.usuario_actual = usuario
+                st.success(f"Bienvenido, {usuario.nombre} ({usuario.rol}).")
+                st.rerun()
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,508 @@
+import time
+
+import streamlit as st
+from typing import Any, Dict, List
+
+from ordify.menu import NINGUNO
+from ordify.metricas import medido, medir
+from ordify.modelos import Usuario
+from ordify.reservas import StockInsuficiente
+from ordify.servicios import agregar_al_carrito, cantidad_en_carrito
+
+from vistas.comun import mostrar_tabla, obtener_servicios
+
+
+# ============================================================
+#  CARRITO (callbacks de sesión)
+# ============================================================
+
+def quitar_del_carrito(indice: int):
+    carrito = st.session_state.carrito
+    if 0 <= indice < len(carrito):
+        del carrito[indice]
+
+
+def vaciar_carrito():
+    st.session_state.carrito = []
+
+
+# ============================================================
+#  CUENTAS (división y pagos parciales)
+# ============================================================
+
+MODOS_DIVISION = ["A cuenta", "Partes iguales", "Por comensal", "Por ítem"]
+
+
+def nombre_comensal(comensal: int) -> str:
+    return f"Comensal {comensal}" if comensal else "Mesa (a cuenta)"
+
+
+def pedir_cierre(cuenta: int):
+    st.session_state.confirmar_cierre = cuenta
+
+
+def cancelar_cierre():
+    st.session_state.pop("confirmar_cierre", None)
+
+
+def pagar(mesa_num: int, usuario: Usuario, mensaje: str, **pago):
+    try:
+        obtener_servicios().registrar_pago(mesa_num, usuario.nombre, **pago)
+    except (KeyError, ValueError) as e:
+        st.error(f"No se pudo registrar el pago. {e}")
+    else:
+        st.session_state.aviso_cobro = mensaje
+        st.rerun()
+
+
+# ============================================================
+#  ADMINISTRADOR Y MESERO
+# ============================================================
+
+@medido()
+def vista_admin_mesero():
+    usuario: Usuario = st.session_state.usuario_actual
+    servicios = obtener_servicios()
+    repo = servicios.repo
+    mesas = repo.listar_mesas()
+
+    st.sidebar.markdown(f"**Usuario:** {usuario.nombre}")
+    st.sidebar.markdown(f"**Rol:** {usuario.rol.capitalize()}")
+    if usuario.rol == "admin" and servicios.vigilante is not None:
+        alertas = servicios.vigilante.panorama.alertas
+        if alertas:
+            st.sidebar.warning(f"{len(alertas)} producto(s) con stock en riesgo. Revisa la pestaña Inventario.")
+
+    # Tabs dentro de card
+    st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+    nombres_tabs = ["Mesas", "Pedidos", "Inventario", "Cuentas"]
+    if usuario.rol == "admin":
+        nombres_tabs += ["Auditoría", "Rendimiento", "Reportes"]
+    tabs = st.tabs(nombres_tabs)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ----------------------- TAB MESAS -----------------------
+    with tabs[0], medir("tab:mesas"):
+        st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+        st.subheader("Gestión de mesas")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### Crear nueva mesa")
+            with st.form("form_mesa"):
+                num_mesa = st.number_input("Número de mesa", min_value=1, step=1)
+                comensales = st.number_input("Número de comensales", min_value=1, step=1)
+                crear = st.form_submit_button("Crear mesa")
+
+            if crear:
+                if servicios.crear_mesa(int(num_mesa), int(comensales)):
+                    mesas = repo.listar_mesas()
+                    st.success("Mesa creada correctamente.")
+                else:
+                    st.error("Ya existe una mesa con ese número.")
+
+        with col2:
+            st.markdown("#### Mesas registradas")
+            if mesas:
+                mostrar_tabla("mesas", servicios.tablas.mesas)
+            else:
+                st.info("No hay mesas registradas.")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ----------------------- TAB PEDIDOS -----------------------
+    with tabs[1], medir("tab:pedidos"):
+        st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+        st.subheader("Gestión de pedidos")
+
+        if not mesas:
+            st.warning("Primero debes registrar al menos una mesa.")
+        else:
+            col1, col2 = st.columns([2, 1])
+
+            # FORM NUEVO PEDIDO (carrito con cualquier número de líneas y categorías)
+            with col1:
+                st.markdown("### Crear nuevo pedido")
+
+                mesa_opciones = [m.numero for m in mesas]
+                mesa_seleccionada = st.selectbox("Mesa", mesa_opciones)
+
+                menu = servicios.menu
+                carrito: List[Dict[str, Any]] = st.session_state.carrito
+
+                aviso = st.session_state.pop("aviso_pedido", None)
+                if aviso is not None:
+                    st.success(f"Pedido {aviso} creado correctamente.")
+                    st.balloons()
+
+                st.markdown("#### Agrega platillos al carrito")
+
+                # Opciones precalculadas: solo se rehacen si cambia el inventario de la categoría
+                for tipo in menu.categorias():
+                    st.markdown(f"##### {tipo.replace('_', ' ').title()}")
+                    opciones_cat = menu.opciones(tipo)
+
+                    seleccion = st.selectbox(
+                        "Producto",
+                        opciones_cat.etiquetas,
+                        key=f"select_{tipo}"
+                    )
+
+                    if seleccion != NINGUNO:
+                        nombre_elegido = opciones_cat.nombre_por_etiqueta[seleccion]
+                        stock_disp = opciones_cat.stock[nombre_elegido]
+                        restante = stock_disp - cantidad_en_carrito(carrito, tipo, nombre_elegido)
+                        if stock_disp < 1:
+                            st.warning(f"{nombre_elegido} está agotado.")
+                            continue
+                        if restante < 1:
+                            st.info(f"Todo el stock de {nombre_elegido} ya está en el carrito.")
+                            continue
+                        cantidad = st.number_input(
+                            f"Cantidad para {nombre_elegido}",
+                            min_value=1,
+                            max_value=restante,
+                            value=1,
+                            step=1,
+                            key=f"qty_{tipo}"
+                        )
+                        if st.button("Agregar al carrito", key=f"agregar_{tipo}"):
+                            error = agregar_al_carrito(carrito, tipo, nombre_elegido, int(cantidad), stock_disp)
+                            if error:
+                                st.error(error)
+
+                # CARRITO: se confirma completo en un solo pedido (una reserva, un commit)
+                st.markdown("#### Carrito")
+                if not carrito:
+                    st.info("El carrito está vacío.")
+                else:
+                    total_carrito = 0.0
+                    for i, linea in enumerate(carrito):
+                        precio = menu.opciones(linea["tipo"]).precio.get(linea["nombre"], 0.0)
+                        subtotal = precio * linea["cantidad"]
+                        total_carrito += subtotal
+                        c_item, c_quitar = st.columns([4, 1])
+                        c_item.write(f"{linea['cantidad']} x {linea['nombre']} — ${subtotal:.2f}")
+                        c_quitar.button("Quitar", key=f"quitar_{i}", on_click=quitar_del_carrito, args=(i,))
+                    st.markdown(f"**Total estimado: ${total_carrito:.2f}**")
+                    st.button("Vaciar carrito", on_click=vaciar_carrito)
+
+                if st.button("Confirmar pedido"):
+                    if not carrito:
+                        st.error("Debes agregar al menos un producto al carrito.")
+                    else:
+                        try:
+                            pedido = servicios.crear_pedido(
+                                mesa_num=int(mesa_seleccionada),
+                                items_list=carrito,
+                                creador=usuario.nombre
+                            )
+                        except StockInsuficiente as e:
+                            st.error(f"No se pudo crear el pedido. {e}")
+                        except KeyError as e:
+                            # Otra sesión cobró o eliminó la mesa mientras se armaba el carrito
+                            st.error(f"No se pudo crear el pedido. {e.args[0]}")
+                        else:
+                            vaciar_carrito()
+                            st.session_state.aviso_pedido = pedido.id
+                            st.rerun()
+
+            # LISTADO Y ACCIONES SOBRE PEDIDOS
+            with col2:
+                st.markdown("### Pedidos activos")
+                pedidos_visibles = servicios.tablas.pedidos_activos().filas
+
+                if pedidos_visibles:
+                    mostrar_tabla("pedidos_activos", servicios.tablas.pedidos_activos)
+
+                    ids = [fila["ID"] for fila in pedidos_visibles]
+                    ped_sel = st.selectbox("Selecciona ID de pedido", ids)
+
+                    pedido_obj = repo.obtener_pedido(ped_sel)
+                    if pedido_obj is None:
+                        # La tabla es de antes: otra sesión lo eliminó o cobró su mesa
+                        st.warning(f"El pedido #{ped_sel} ya no existe. Actualiza la página.")
+                    else:
+                        st.write(f"Pedido #{pedido_obj.id} - Mesa {pedido_obj.mesa_numero}")
+                        st.write(f"Estado actual: **{pedido_obj.estado}**")
+
+                        detalle_rows = []
+                        for it in pedido_obj.items:
+                            tipo = it.tipo
+                            nombre = it.nombre
+                            cant = it.cantidad
+                            precio = it.precio
+                            subtotal = precio * cant
+                            detalle_rows.append({
+                                "Tipo": tipo.replace("_", " ").title(),
+                                "Producto": nombre,
+                                "Cantidad": cant,
+                                "Precio": precio,
+                                "Subtotal": round(subtotal, 2),
+                            })
+                        st.table(detalle_rows)
+
+                        if pedido_obj.estado == "pendiente":
+                            if st.button("Marcar como ENTREGADO"):
+                                if servicios.marcar_pedido_entregado(pedido_obj.id):
+                                    st.success("Estado actualizado a ENTREGADO. El pedido ya no aparecerá en esta lista.")
+                                    st.rerun()
+                                else:
+                                    st.error("El pedido ya no está pendiente (¿se canceló desde otra sesión?).")
+
+                            if st.button("Cancelar pedido"):
+                                servicios.cancelar_pedido(pedido_obj.id)
+                                st.warning("Pedido cancelado. Su stock volvió al inventario.")
+                                st.rerun()
+                        else:
+                            st.caption("Pedido cancelado: no se factura ni se puede entregar.")
+
+                        if usuario.rol == "admin":
+                            if st.button("Eliminar pedido"):
+                                servicios.eliminar_pedido_por_id(pedido_obj.id)
+                                st.warning("Pedido eliminado.")
+                                st.rerun()
+                else:
+                    st.info("No hay pedidos activos (todos entregados o sin pedidos).")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ----------------------- TAB INVENTARIO -----------------------
+    with tabs[2], medir("tab:inventario"):
+        st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+        if usuario.rol == "admin":
+            st.subheader("Inventario")
+            vista_alertas_stock()
+        else:
+            st.subheader("Inventario (solo lectura)")
+
+        for categoria in servicios.menu.categorias():
+            st.markdown(f"#### {categoria.replace('_', ' ').title()}")
+            mostrar_tabla(f"inventario_{categoria}", lambda categoria=categoria: servicios.tablas.inventario(categoria))
+
+        if usuario.rol == "admin":
+            vista_reposicion()
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ----------------------- TAB CUENTAS -----------------------
+    with tabs[3], medir("tab:cuentas"):
+        st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+        st.subheader("Cuentas por mesa")
+
+        aviso = st.session_state.pop("aviso_cobro", None)
+        if aviso:
+            st.success(aviso)
+        if not mesas:
+            st.info("No hay mesas activas para cobrar.")
+        else:
+            mesas_nums = [m.numero for m in mesas]
+            mesa_sel = st.selectbox("Selecciona la mesa para cobrar", mesas_nums, key="mesa_cobro")
+            vista_cuenta_mesa(mesa_sel, usuario)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ----------------------- TAB AUDITORÍA (solo admin) -----------------------
+    if usuario.rol == "admin":
+        # Solo las sesiones de administrador cargan estas vistas (y sus dependencias)
+        from vistas.admin import vista_auditoria, vista_rendimiento, vista_reportes
+
+        with tabs[4]:
+            st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+            st.subheader("Auditoría de cambios")
+            vista_auditoria()
+            st.markdown('</div>', unsafe_allow_html=True)
+        with tabs[5]:
+            st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+            st.subheader("Rendimiento")
+            vista_rendimiento()
+            st.markdown('</div>', unsafe_allow_html=True)
+        with tabs[6], medir("tab:reportes"):
+            st.markdown('<div class="ordify-section">', unsafe_allow_html=True)
+            st.subheader("Reportes de ventas")
+            vista_reportes()
+            st.markdown('</div>', unsafe_allow_html=True)
+
+
+@medido()
+def vista_alertas_stock():
+    """Alertas de agotamiento: solo lee el último cálculo del VigilanteInventario (ver ordify/pronostico.py)."""
+    from ordify.pronostico import formatear_minutos
+
+    vigilante = obtener_servicios().vigilante
+    if vigilante is None:
+        st.caption("Pronóstico de agotamiento desactivado (ORDIFY_INTERVALO_PRONOSTICO=0).")
+        return
+    panorama = vigilante.panorama
+    for p in panorama.alertas:
+        texto = f"**{p.nombre}** — stock {p.stock}"
+        if p.minutos_restantes is not None:
+            texto += f", se agota en {formatear_minutos(p.minutos_restantes)} al ritmo actual"
+        if p.nivel == "bajo":
+            st.warning(texto)
+        else:
+            st.error(texto)
+    if panorama.calculado_en and not panorama.alertas:
+        st.success("Ningún producto en riesgo de agotarse al ritmo actual.")
+    with st.expander("Pronóstico por producto"):
+        mostrar_tabla("pronostico", lambda: vigilante.panorama.tabla)
+        if panorama.calculado_en:
+            st.caption(f"Calculado a las {time.strftime('%H:%M:%S', time.localtime(panorama.calculado_en))}.")
+
+
+@medido()
+def vista_reposicion():
+    """Reposición de varios productos a la vez: una sola transacción para todo el formulario."""
+    servicios = obtener_servicios()
+    st.markdown("#### Reponer stock")
+    cantidades: Dict[tuple, Any] = {}
+    with st.form("form_reposicion", clear_on_submit=True):
+        for tipo in servicios.menu.categorias():
+            st.markdown(f"##### {tipo.replace('_', ' ').title()}")
+            columnas = st.columns(3)
+            for i, nombre in enumerate(servicios.menu.opciones(tipo).stock):
+                cantidades[(tipo, nombre)] = columnas[i % 3].number_input(
+                    nombre, min_value=0, step=1, value=0, key=f"reponer_{tipo}_{nombre}"
+                )
+        reponer = st.form_submit_button("Reponer")
+
+    if reponer:
+        items = [
+            {"tipo": tipo, "nombre": nombre, "cantidad": int(cantidad)}
+            for (tipo, nombre), cantidad in cantidades.items() if cantidad > 0
+        ]
+        if not items:
+            st.error("Indica al menos una cantidad a reponer.")
+            return
+        try:
+            servicios.reponer_stock(items)
+        except (KeyError, ValueError) as e:
+            st.error(f"No se pudo reponer. {e}")
+        else:
+            st.success(f"Stock repuesto: {len(items)} producto(s) en una sola operación.")
+
+
+@medido()
+def vista_cuenta_mesa(mesa_num: int, usuario: Usuario):
+    """Cuenta de la mesa: resumen, división y pagos parciales (el libro se cachea por versión, ver ordify/pagos.py)."""
+    servicios = obtener_servicios()
+    libro = servicios.libro_cuenta(mesa_num)
+    if libro is None:
+        st.warning("La mesa ya no existe.")
+        return
+    if not libro.lineas:
+        st.warning("Esta mesa no tiene pedidos registrados (o todos fueron cancelados).")
+        return
+    mesa = libro.mesa
+
+    st.markdown("### Resumen de cuenta")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Comensales", mesa.comensales)
+    col2.metric("Total", f"${libro.total:.2f}")
+    col3.metric("Pagado", f"${libro.pagado:.2f}")
+    col4.metric("Saldo", f"${libro.saldo:.2f}")
+    mostrar_tabla("cuenta", lambda: libro.tabla)
+    if libro.pagos:
+        with st.expander(f"Pagos registrados ({len(libro.pagos)})"):
+            st.dataframe(
+                [
+                    {
+                        "Hora": time.strftime("%H:%M:%S", time.localtime(p.creado_en)),
+                        "Quién paga": nombre_comensal(p.comensal),
+                        "Importe": p.importe,
+                        "Unidades por ítem": sum(u for _, _, u in p.lineas),
+                        "Cobrado por": p.cobrado_por,
+                    }
+                    for p in libro.pagos
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+
+    comensales = list(range(1, mesa.comensales + 1))
+    pendientes = [linea for linea in libro.lineas if linea.pendientes]
+    if libro.saldo > 0:
+        st.markdown("### Cobrar una parte")
+        modo = st.radio("Dividir la cuenta", MODOS_DIVISION, horizontal=True, key="modo_division")
+
+        if modo == "A cuenta":
+            importe = st.number_input("Importe", min_value=0.0, value=float(libro.saldo), step=1.0,
+                                      format="%.2f", key=f"importe_{mesa.id}")
+            comensal = st.selectbox("Quién paga", [0] + comensales, format_func=nombre_comensal, key=f"paga_{mesa.id}")
+            if st.button("Registrar pago parcial"):
+                pagar(mesa.numero, usuario, f"Pago de ${importe:.2f} registrado.", importe=importe, comensal=comensal)
+
+        elif modo == "Partes iguales":
+            faltan = [c for c in comensales if c not in libro.comensales_con_pago()]
+            personas = st.number_input("Personas que faltan por pagar", min_value=1, value=max(1, len(faltan)),
+                                       step=1, key=f"partes_{mesa.id}")
+            partes = libro.partes_iguales(int(personas))
+            st.write("**Cada parte:** " + ", ".join(f"${parte:.2f}" for parte in partes))
+            comensal = st.selectbox("Quién paga", faltan or [0], format_func=nombre_comensal,
+                                    key=f"paga_parte_{mesa.id}")
+            if st.button("Cobrar una parte"):
+                pagar(mesa.numero, usuario, f"{nombre_comensal(comensal)} pagó ${partes[0]:.2f}.",
+                      importe=partes[0], comensal=comensal)
+
+        elif modo == "Por comensal":
+            asignacion = {}
+            with st.expander("Asignar consumo a comensales", expanded=True):
+                for linea in pendientes:
+                    asignacion[linea.clave] = st.multiselect(
+                        f"{linea.pendientes} x {linea.nombre} (pedido {linea.pedido_id}) — ${linea.pendiente:.2f}",
+                        comensales, format_func=nombre_comensal,
+                        key=f"asignar_{mesa.id}_{linea.pedido_id}_{linea.orden}",
+                    )
+            montos = libro.por_comensal(asignacion)
+            st.dataframe(
+                [{"Quién paga": nombre_comensal(c), "Por pagar": m} for c, m in montos.items() if m > 0],
+                use_container_width=True,
+                hide_index=True,
+            )
+            candidatos = [c for c in comensales if montos[c] > 0]
+            if candidatos:
+                comensal = st.selectbox("Quién paga", candidatos, format_func=nombre_comensal,
+                                        key=f"paga_comensal_{mesa.id}")
+                if st.button("Cobrar a este comensal"):
+                    pagar(mesa.numero, usuario, f"{nombre_comensal(comensal)} pagó ${montos[comensal]:.2f}.",
+                          importe=montos[comensal], comensal=comensal)
+            else:
+                st.caption("Asigna productos a los comensales para ver cuánto paga cada uno.")
+
+        else:
+            unidades = {}
+            with st.form(f"form_items_{mesa.id}", clear_on_submit=True):
+                for linea in pendientes:
+                    # La clave incluye lo ya pagado: el máximo del control cambia tras cada cobro
+                    unidades[linea.clave] = st.number_input(
+                        f"{linea.nombre} (pedido {linea.pedido_id}) — ${linea.precio:.2f} c/u, quedan {linea.pendientes}",
+                        min_value=0, max_value=linea.pendientes, step=1, value=0,
+                        key=f"cobrar_{mesa.id}_{linea.pedido_id}_{linea.orden}_{linea.pagadas}",
+                    )
+                comensal = st.selectbox("Quién paga", [0] + comensales, format_func=nombre_comensal)
+                cobrar = st.form_submit_button("Cobrar ítems seleccionados")
+            if cobrar:
+                lineas = {clave: int(u) for clave, u in unidades.items() if u > 0}
+                if not lineas:
+                    st.error("Indica al menos una unidad a cobrar.")
+                else:
+                    pagar(mesa.numero, usuario, "Ítems cobrados.", lineas=lineas, comensal=comensal)
+
+    # Cierre en dos pasos con estado de sesión (un botón dentro de otro nunca llega a ejecutarse)
+    st.markdown("### Cerrar mesa")
+    if st.session_state.get("confirmar_cierre") != mesa.id:
+        etiqueta = f"Cobrar saldo (${libro.saldo:.2f}) y cerrar mesa" if libro.saldo > 0 else "Cerrar mesa"
+        st.button(etiqueta, on_click=pedir_cierre, args=(mesa.id,))
+        return
+    st.warning(f"Se cobrará el saldo de ${libro.saldo:.2f} y la cuenta de la mesa {mesa.numero} quedará archivada.")
+    col1, col2 = st.columns(2)
+    if col1.button("Confirmar pago y cerrar mesa", type="primary"):
+        cancelar_cierre()
+        try:
+            cerrada = servicios.cerrar_cuenta(mesa.numero, usuario.nombre)
+        except (KeyError, ValueError, OSError) as e:
+            # La transacción se deshizo: la mesa sigue abierta con sus pagos
+            st.error(f"No se pudo cerrar la mesa. {e}")
+        else:
+            if cerrada is None:
+                st.session_state.aviso_cobro = f"La mesa {mesa.numero} ya se había cerrado desde otra sesión."
+            else:
+                st.session_state.aviso_cobro = f"La mesa {mesa.numero} ha sido cobrada y su cuenta quedó archivada."
+            st.rerun()
+    col2.button("Cancelar", on_click=cancelar_cierre)
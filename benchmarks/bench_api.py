@@ -0,0 +1,168 @@
+"""Solicitudes por segundo de la API JSON frente a reruns de Streamlit para el mismo trabajo.
+
+Cada ciclo hace lo que un handheld y una pantalla de cocina piden por pedido:
+crear el pedido, leer la cola de la estación, marcarlo enviado en cada
+estación, marcarlo entregado y consultar la cuenta de la mesa. La API se
+llama con el cliente ASGI en proceso (sin red, igual que Streamlit en este
+benchmark). Además se mide cuánto tarda en despertar a N pantallas en
+long-poll cuando entra un pedido.
+
+La ruta Streamlit (AppTest, un rerun completo de la vista por interacción)
+solo se mide si Streamlit está instalado.
+
+Uso:
+  python benchmarks/bench_api.py
+  python benchmarks/bench_api.py --backend sqlite --ciclos 2000 --pantallas 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "alma_sabor_pin"))
+
+from ordify.api import ApiOrdify, ClienteAsgi  # noqa: E402
+from ordify.metricas import Histograma  # noqa: E402
+from ordify.modelos import Usuario  # noqa: E402
+from ordify.repositorio_memoria import RepositorioMemoria  # noqa: E402
+from ordify.repositorio_sqlite import RepositorioSQLite, crear_pool_sqlite  # noqa: E402
+from ordify.secuencias import GeneradorIds  # noqa: E402
+from ordify.seguridad import AlmacenUsuarios, LimitadorIntentos  # noqa: E402
+from ordify.servicios import Servicios  # noqa: E402
+
+ESTACIONES = ("comida_italiana", "comida_mexicana", "bebidas")
+MENU = {
+    "comida_italiana": ("Pizza Margherita", "Lasagna"),
+    "comida_mexicana": ("Tacos", "Burrito"),
+    "bebidas": ("Café", "Jugo Natural"),
+}
+MESAS = 20
+
+
+def crear_servicios(backend: str, datos: str, stock: int) -> Servicios:
+    """Como construir_servicios, pero con stock de sobra para que ningún ciclo se agote."""
+    inventario = {tipo: {nombre: {"stock": stock, "precio": 10.0} for nombre in nombres} for tipo, nombres in MENU.items()}
+    usuarios = AlmacenUsuarios(secrets.token_bytes(32))
+    usuarios.registrar("000000", Usuario(rol="admin", nombre="Administrador"))
+    pool = None
+    if backend == "memoria":
+        repo = RepositorioMemoria(inventario, ids=GeneradorIds())
+    else:
+        pool = crear_pool_sqlite(os.path.join(datos, "ordify.db"), 4)
+        repo = RepositorioSQLite(pool, inventario)
+    return Servicios(repo, usuarios=usuarios, limitador=LimitadorIntentos(), pool=pool)
+
+
+async def ciclos(mesero: ClienteAsgi, cocina: ClienteAsgi, n: int, semilla: int) -> Dict[str, Histograma]:
+    rnd = random.Random(semilla)
+    latencias: Dict[str, Histograma] = {}
+
+    async def medir(nombre: str, coro):
+        inicio = time.perf_counter()
+        respuesta = await coro
+        latencias.setdefault(nombre, Histograma()).observar(time.perf_counter() - inicio)
+        if respuesta.estado >= 400:
+            raise RuntimeError(f"{nombre}: {respuesta.estado} {respuesta.cuerpo!r}")
+        return respuesta
+
+    for _ in range(n):
+        mesa = rnd.randint(1, MESAS)
+        items = [{"tipo": t, "nombre": rnd.choice(MENU[t]), "cantidad": 1} for t in rnd.sample(ESTACIONES, rnd.randint(1, 3))]
+        pedido = (await medir("POST /pedidos", mesero.post("/pedidos", {"mesa": mesa, "items": items}))).json()
+        for tipo in pedido["produccion"]:
+            await medir("GET cola", cocina.get(f"/estaciones/{tipo}/cola"))
+            await medir("POST enviado", cocina.post(f"/pedidos/{pedido['id']}/enviado", {"tipo": tipo}))
+        await medir("POST entregado", mesero.post(f"/pedidos/{pedido['id']}/entregado"))
+        await medir("GET cuenta", mesero.get(f"/mesas/{mesa}/cuenta"))
+    return latencias
+
+
+async def despertar_pantallas(mesero: ClienteAsgi, cocina: ClienteAsgi, pantallas: int) -> float:
+    """Ms desde que se crea un pedido hasta que la última de N pantallas en long-poll recibe la cola."""
+    version = (await cocina.get("/estaciones/bebidas/cola")).json()["version"]
+    esperas = [asyncio.ensure_future(cocina.get(f"/estaciones/bebidas/cola?version={version}&esperar=10"))
+               for _ in range(pantallas)]
+    await asyncio.sleep(0.1)
+    inicio = time.perf_counter()
+    await mesero.post("/pedidos", {"mesa": 1, "items": [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1}]})
+    await asyncio.gather(*esperas)
+    return (time.perf_counter() - inicio) * 1000
+
+
+async def medir_api(backend: str, n: int, pantallas: int, semilla: int):
+    with tempfile.TemporaryDirectory() as datos:
+        servicios = crear_servicios(backend, datos, stock=n * 3 + 10)
+        for mesa in range(1, MESAS + 1):
+            servicios.crear_mesa(mesa, 4)
+        api = ApiOrdify(servicios)
+        anonimo = ClienteAsgi(api)
+        mesero = ClienteAsgi(api, (await anonimo.post("/sesiones", {"pin": "000000"})).json()["token"])
+        cocina = mesero   # el admin ve todas las estaciones
+
+        inicio = time.perf_counter()
+        latencias = await ciclos(mesero, cocina, n, semilla)
+        duracion = time.perf_counter() - inicio
+        despertar_ms = await despertar_pantallas(mesero, cocina, pantallas)
+        api.cerrar()
+    return latencias, duracion, despertar_ms
+
+
+def medir_streamlit(reruns: int) -> List[float]:
+    """Segundos por rerun de la vista de mesero y de una estación (AppTest), si hay Streamlit."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return []
+    import streamlit as st
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as datos:
+        os.environ["ORDIFY_DATOS"] = datos
+        st.cache_resource.clear()
+        for usuario in (Usuario(rol="mesero", nombre="Mesero"), Usuario(rol="barista", nombre="Barista")):
+            at = AppTest.from_file(str(RAIZ / "alma_sabor_pin" / "app.py"), default_timeout=120)
+            at.session_state["usuario_actual"] = usuario
+            at.run()
+            inicio = time.perf_counter()
+            for _ in range(reruns):
+                at.run()
+            resultados.append((time.perf_counter() - inicio) / reruns)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("memoria", "sqlite"), default="memoria")
+    parser.add_argument("--ciclos", type=int, default=1000)
+    parser.add_argument("--pantallas", type=int, default=100, help="clientes en long-poll sobre la misma estación")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns de Streamlit por vista (0 = omitir)")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    latencias, duracion, despertar_ms = asyncio.run(medir_api(args.backend, args.ciclos, args.pantallas, args.semilla))
+    solicitudes = sum(h.total for h in latencias.values())
+    print(f"API ({args.backend}): {solicitudes:,} solicitudes en {duracion:.2f} s = {solicitudes / duracion:,.0f} req/s")
+    print(f"{'endpoint':<18}{'llamadas':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nombre, h in sorted(latencias.items()):
+        print(f"{nombre:<18}{h.total:>10}{h.percentil(0.5) * 1000:>10.3f}"
+              f"{h.percentil(0.95) * 1000:>10.3f}{h.percentil(0.99) * 1000:>10.3f}")
+    print(f"{args.pantallas} pantallas en long-poll despertadas en {despertar_ms:.1f} ms (sin hilos por pantalla)")
+
+    if args.reruns:
+        reruns = medir_streamlit(args.reruns)
+        if not reruns:
+            print("\nStreamlit no está instalado: se omite la comparación con reruns.")
+        else:
+            for vista, segundos in zip(("mesero", "estación"), reruns):
+                print(f"Streamlit, vista {vista}: {segundos * 1000:.1f} ms por rerun = {1 / segundos:,.0f} interacciones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Archivo frío: costo de las consultas de la ruta caliente y memoria del turno antes y después de archivar.
+
+Un turno largo con pocas mesas abiertas y muchos pedidos ya entregados o
+cancelados (la mesa sigue abierta hasta que se cobra):
+
+- Consultas calientes: lo que recorren la pestaña Pedidos, los estados y
+  las colas de estación en cada rerun.
+- Cuenta de una mesa: pedidos_de_mesa sí descomprime lo archivado, así que
+  se mide para ver cuánto cuesta ese lado.
+- Archivar: una pasada del GestorCicloVida sobre todo el turno.
+- Conjunto de trabajo: pedidos en los índices y bytes del archivo; con el
+  backend en memoria, también la memoria que ocupa el repositorio.
+
+Uso:
+  python benchmarks/bench_archivo.py
+  python benchmarks/bench_archivo.py --pedidos 20000 --backend sqlite
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.configuracion import Configuracion, construir_servicios  # noqa: E402
+
+ITEMS = [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1},
+         {"tipo": "comida_mexicana", "nombre": "Tacos", "cantidad": 2}]
+
+
+def cronometrar(fn, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def esperar_instantaneas():
+    """El backend en memoria guarda instantáneas en un hilo: que no se mezclen con las mediciones."""
+    for hilo in threading.enumerate():
+        if hilo.name == "ordify-instantanea":
+            hilo.join()
+
+
+def consultas(servicios, repeticiones: int) -> dict:
+    repo = servicios.repo
+    return {
+        "listar sin entregados": cronometrar(lambda: repo.listar_pedidos(excluir_estado="entregado"), repeticiones),
+        "pedidos pendientes": cronometrar(lambda: repo.pedidos_por_estado("pendiente"), repeticiones),
+        "cola de estación": cronometrar(lambda: repo.pedidos_pendientes_estacion("bebidas"), repeticiones),
+        "cuenta de una mesa": cronometrar(lambda: repo.pedidos_de_mesa(1), repeticiones),
+    }
+
+
+def turno(datos: str, args):
+    servicios = construir_servicios(Configuracion(directorio_datos=datos, backend=args.backend,
+                                                  intervalo_sincronizacion=0, intervalo_pronostico=0,
+                                                  intervalo_archivo=0))
+    servicios.reponer_stock([{"tipo": t, "nombre": n, "cantidad": 1_000_000}
+                             for t, items in servicios.repo.obtener_inventario().items() for n in items])
+    with servicios.repo.transaccion():
+        for mesa in range(1, args.mesas + 1):
+            servicios.crear_mesa(mesa, 4)
+        for i in range(args.pedidos):
+            p = servicios.crear_pedido(i % args.mesas + 1, ITEMS, "Mesero")
+            if i < args.pedidos - args.pendientes:
+                servicios.marcar_pedido_entregado(p.id)
+    esperar_instantaneas()
+    return servicios
+
+
+def cerrar(servicios):
+    servicios.bitacora.cerrar()
+    if servicios.pool is not None:
+        servicios.pool.cerrar()
+
+
+def memoria_ocupada(datos: str, args):
+    """Memoria que retiene el turno antes y después de archivar (solo backend en memoria).
+
+    Se mide en un turno aparte: con tracemalloc activo todo lo demás es mucho más lento.
+    """
+    tracemalloc.start()
+    servicios = turno(datos, args)
+    gc.collect()
+    antes = tracemalloc.get_traced_memory()[0]
+    servicios.repo.archivar_pedidos(time.time() + 1)
+    esperar_instantaneas()
+    gc.collect()
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    cerrar(servicios)
+    return antes, despues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=10_000)
+    parser.add_argument("--mesas", type=int, default=20)
+    parser.add_argument("--pendientes", type=int, default=50, help="pedidos que siguen en curso")
+    parser.add_argument("--backend", default="memoria", choices=("memoria", "sqlite"))
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as datos:
+        servicios = turno(datos, args)
+        antes = consultas(servicios, args.repeticiones)
+        tamano_antes = servicios.repo.tamano_conjunto()
+        inicio = time.perf_counter()
+        archivados = servicios.repo.archivar_pedidos(time.time() + 1)
+        archivar = (time.perf_counter() - inicio) * 1000
+        despues = consultas(servicios, args.repeticiones)
+        tamano_despues = servicios.repo.tamano_conjunto()
+        cerrar(servicios)
+
+    print(f"{args.pedidos:,} pedidos en {args.mesas} mesas abiertas, {args.pendientes} en curso "
+          f"({args.backend}); archivar {archivados:,}: {archivar:.1f} ms")
+    print(f"{'':<24}{'antes ms':>12}{'después ms':>12}")
+    for nombre in antes:
+        print(f"{nombre:<24}{antes[nombre]:>12.4f}{despues[nombre]:>12.4f}")
+    print(f"conjunto antes:   {tamano_antes}")
+    print(f"conjunto después: {tamano_despues}")
+    if args.backend == "memoria":
+        with tempfile.TemporaryDirectory() as datos:
+            memoria_antes, memoria_despues = memoria_ocupada(datos, args)
+        print(f"memoria del turno: {memoria_antes / 1e6:.1f} MB -> {memoria_despues / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Arranque en frío de la app de Streamlit: tiempo hasta el primer render del login y de la vista de cada rol.
+
+Cada escenario corre en un proceso nuevo (nada importado ni cacheado) con
+streamlit.testing.v1.AppTest: se mide desde el arranque del proceso hasta
+que termina el primer run del script, y luego un rerun ya en caliente.
+También informa qué módulos cargó cada rol: las vistas de otros roles, los
+reportes o el pronóstico no deberían aparecer donde no se usan.
+
+Requiere streamlit instalado (la app no corre sin él).
+
+Uso:
+  python benchmarks/bench_arranque.py
+  python benchmarks/bench_arranque.py --backend memoria --repeticiones 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP = Path(__file__).resolve().parents[1] / "alma_sabor_pin" / "app.py"
+
+ROLES = {
+    "login": None,
+    "admin": ("admin", "Administrador"),
+    "mesero": ("mesero", "Mesero"),
+    "chef_italiano": ("chef_italiano", "Chef Italiano"),
+    "barista": ("barista", "Barista"),
+}
+VIGILADOS = ["vistas.login", "vistas.sala", "vistas.admin", "vistas.estacion",
+             "ordify.reportes", "ordify.pronostico", "sqlite3", "pandas", "pyarrow"]
+
+ESCENARIO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+from ordify.modelos import Usuario
+at = AppTest.from_file({app!r}, default_timeout=60)
+rol = {rol!r}
+if rol is not None:
+    at.session_state["usuario_actual"] = Usuario(rol=rol[0], nombre=rol[1])
+at.run()
+primero = time.perf_counter() - inicio
+t = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - t
+errores = [e.value for e in at.exception]
+print(json.dumps({{"primero": primero, "rerun": rerun, "errores": errores,
+                  "modulos": [m for m in {vigilados!r} if m in sys.modules]}}))
+"""
+
+
+def correr(rol, datos: str, backend: str) -> dict:
+    codigo = ESCENARIO.format(raiz=str(APP.parent), app=str(APP), rol=rol, vigilados=VIGILADOS)
+    entorno = dict(os.environ, ORDIFY_DATOS=datos, ORDIFY_BACKEND=backend)
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, env=entorno,
+                            cwd=str(APP.parent), check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="sqlite", choices=("sqlite", "memoria"))
+    parser.add_argument("--repeticiones", type=int, default=3, help="procesos por escenario (se informa la mediana)")
+    args = parser.parse_args()
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        sys.exit("streamlit no está instalado: este benchmark necesita ejecutar la app (pip install streamlit).")
+
+    print(f"{'escenario':<15}{'primer render ms':>18}{'rerun ms':>10}  módulos cargados")
+    for nombre, rol in ROLES.items():
+        with tempfile.TemporaryDirectory() as datos:
+            corridas = [correr(rol, datos, args.backend) for _ in range(args.repeticiones)]
+        primero = statistics.median(c["primero"] for c in corridas) * 1000
+        rerun = statistics.median(c["rerun"] for c in corridas) * 1000
+        errores = corridas[-1]["errores"]
+        detalle = ", ".join(corridas[-1]["modulos"]) + (f"  ERRORES: {errores}" if errores else "")
+        print(f"{nombre:<15}{primero:>18.0f}{rerun:>10.1f}  {detalle}")
+
+
+if __name__ == "__main__":
+    main()
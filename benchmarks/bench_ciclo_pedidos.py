@@ -0,0 +1,293 @@
+"""Carga sintética del ciclo de un pedido: crear, colas de estación, envío, entrega y cuentas.
+
+Simula un restaurante con N mesas, M meseros y K pedidos por minuto repartidos
+entre las tres estaciones, en tiempo virtual (determinista, repetible): cada
+estación revisa su cola cada INTERVALO segundos virtuales, marca lo que
+encuentra como enviado y el último envío entrega el pedido; cada pedido nuevo
+consulta además la cuenta de su mesa.
+
+Antes de medir se precargan S pedidos de historial (la mayoría entregados)
+para ver cómo escala cada operación con el volumen del turno.
+
+Uso:
+  python benchmarks/bench_ciclo_pedidos.py                          # 100, 1k y 10k pedidos en memoria
+  python benchmarks/bench_ciclo_pedidos.py --escalas 100,1000000    # hasta un millón
+  python benchmarks/bench_ciclo_pedidos.py --backend sqlite
+  python benchmarks/bench_ciclo_pedidos.py --guardar-baseline       # reescribe la baseline
+
+Sale con código 1 si alguna operación empeora más que `--tolerancia` respecto
+de la baseline guardada (benchmarks/baselines/ciclo_pedidos.json).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "alma_sabor_pin"))
+
+from ordify.metricas import Histograma  # noqa: E402
+from ordify.repositorio import Repositorio  # noqa: E402
+from ordify.repositorio_memoria import RepositorioMemoria  # noqa: E402
+from ordify.repositorio_sqlite import RepositorioSQLite, crear_pool_sqlite  # noqa: E402
+from ordify.secuencias import GeneradorIds  # noqa: E402
+from ordify.servicios import Servicios  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "ciclo_pedidos.json"
+ESTACIONES = ("comida_italiana", "comida_mexicana", "bebidas")
+MENU = {
+    "comida_italiana": {"Pizza Margherita": 12.99, "Lasagna": 14.50},
+    "comida_mexicana": {"Tacos": 10.99, "Burrito": 11.50},
+    "bebidas": {"Café": 3.99, "Jugo Natural": 4.50},
+}
+
+
+def inventario_ilimitado() -> Dict[str, Dict[str, Dict[str, float]]]:
+    return {
+        tipo: {nombre: {"stock": 10 ** 9, "precio": precio} for nombre, precio in productos.items()}
+        for tipo, productos in MENU.items()
+    }
+
+
+def items_aleatorios(rnd: random.Random) -> List[Dict[str, Any]]:
+    items = []
+    for tipo in rnd.sample(ESTACIONES, rnd.randint(1, 3)):
+        nombre = rnd.choice(list(MENU[tipo]))
+        items.append({"tipo": tipo, "nombre": nombre, "cantidad": rnd.randint(1, 3)})
+    return items
+
+
+# ============================================================
+#  SERVICIOS
+# ============================================================
+
+def cuenta_mesa(servicios: Servicios, mesa_num: int):
+    """Lo que calcula la pestaña Cuentas: líneas de consumo y total."""
+    pedidos = servicios.obtener_pedidos_por_mesa(mesa_num)
+    filas = [(p.id, it.tipo, it.nombre, it.cantidad, it.precio * it.cantidad) for p in pedidos for it in p.items]
+    return filas, servicios.calcular_total_mesa(mesa_num)
+
+
+def crear_repositorio(backend: str, directorio: str) -> Repositorio:
+    if backend == "memoria":
+        return RepositorioMemoria(inventario_ilimitado(), ids=GeneradorIds())
+    return RepositorioSQLite(crear_pool_sqlite(os.path.join(directorio, "ordify.db"), 4), inventario_ilimitado())
+
+
+def precargar(repo: Repositorio, pedidos: int, mesas: int, meseros: int, semilla: int) -> float:
+    """Historial del turno: el 97 % entregado, el resto pendiente. Devuelve bytes por pedido."""
+    rnd = random.Random(semilla)
+    for mesa in range(1, mesas + 1):
+        repo.crear_mesa(mesa, rnd.randint(1, 8))
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    hechos = 0
+    while hechos < pedidos:
+        with repo.transaccion():
+            for _ in range(min(1000, pedidos - hechos)):
+                p = repo.agregar_pedido(rnd.randint(1, mesas), items_aleatorios(rnd), f"Mesero {rnd.randrange(meseros)}")
+                if rnd.random() < 0.97:
+                    repo.actualizar_estado_pedido(p.id, "entregado")
+                    for tipo in p.produccion_estados:
+                        repo.actualizar_estado_produccion(p.id, tipo, "enviado")
+                hechos += 1
+    usados = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return usados / max(pedidos, 1)
+
+
+def simular(servicios: Servicios, pedidos: int, mesas: int, meseros: int, por_minuto: float,
+            intervalo: float, semilla: int) -> Dict[str, Any]:
+    """Corre `pedidos` pedidos nuevos en tiempo virtual y mide cada operación."""
+    rnd = random.Random(semilla + 1)
+    latencias: Dict[str, Histograma] = {}
+
+    def medir(nombre: str, fn: Callable, *args):
+        inicio = time.perf_counter()
+        resultado = fn(*args)
+        latencias.setdefault(nombre, Histograma()).observar(time.perf_counter() - inicio)
+        return resultado
+
+    reloj = 0.0
+    proxima_revision = {tipo: intervalo * i / len(ESTACIONES) for i, tipo in enumerate(ESTACIONES)}
+    inicio = time.perf_counter()
+    for n in range(pedidos):
+        reloj += 60.0 / por_minuto
+        mesa = rnd.randint(1, mesas)
+        medir("crear_pedido", servicios.crear_pedido, mesa, items_aleatorios(rnd), f"Mesero {n % meseros}")
+        medir("cuenta_mesa", cuenta_mesa, servicios, mesa)
+
+        for tipo in ESTACIONES:
+            while proxima_revision[tipo] <= reloj:
+                proxima_revision[tipo] += intervalo
+                for pedido in medir("cola_estacion", servicios.filtrar_pedidos_por_estacion, tipo):
+                    medir("marcar_estacion_enviada", servicios.marcar_estacion_enviada, pedido.id, tipo)
+                    actual = servicios.repo.obtener_pedido(pedido.id)
+                    if actual is not None and "pendiente" not in actual.produccion_estados.values():
+                        medir("marcar_pedido_entregado", servicios.marcar_pedido_entregado, pedido.id)
+    duracion = time.perf_counter() - inicio
+
+    operaciones = sum(h.total for h in latencias.values())
+    return {
+        "throughput_ops_s": operaciones / duracion,
+        "pedidos_s": pedidos / duracion,
+        "operaciones": {
+            nombre: {
+                "llamadas": h.total,
+                "p50_ms": h.percentil(0.50) * 1000,
+                "p95_ms": h.percentil(0.95) * 1000,
+                "p99_ms": h.percentil(0.99) * 1000,
+            }
+            for nombre, h in sorted(latencias.items())
+        },
+    }
+
+
+def mejor_de(resultados: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina repeticiones quedándose con lo mejor de cada métrica (filtra el ruido de la máquina)."""
+    mejor = {
+        "throughput_ops_s": max(r["throughput_ops_s"] for r in resultados),
+        "pedidos_s": max(r["pedidos_s"] for r in resultados),
+        "operaciones": {},
+    }
+    for nombre, op in resultados[0]["operaciones"].items():
+        variantes = [r["operaciones"][nombre] for r in resultados if nombre in r["operaciones"]]
+        mejor["operaciones"][nombre] = {
+            "llamadas": op["llamadas"],
+            **{p: min(v[p] for v in variantes) for p in ("p50_ms", "p95_ms", "p99_ms")},
+        }
+    return mejor
+
+
+# ============================================================
+#  VISTAS CON AppTest (opcional: requiere streamlit)
+# ============================================================
+
+def medir_vistas(directorio: str, reruns: int) -> Dict[str, Dict[str, float]]:
+    """Reruns completos de la vista de mesero y de una estación sobre la base precargada."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+    import streamlit as st
+    from ordify.modelos import Usuario
+
+    os.environ["ORDIFY_DATOS"] = directorio
+    os.environ["ORDIFY_BACKEND"] = "sqlite"
+    st.cache_resource.clear()
+    resultados = {}
+    for vista, usuario in (
+        ("vista_admin_mesero", Usuario(rol="mesero", nombre="Mesero")),
+        ("vista_chef_barista", Usuario(rol="chef_italiano", nombre="Chef Italiano")),
+    ):
+        at = AppTest.from_file(str(RAIZ / "alma_sabor_pin" / "app.py"), default_timeout=120)
+        at.session_state["usuario_actual"] = usuario
+        h = Histograma()
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            at.run()
+            h.observar(time.perf_counter() - inicio)
+        if at.exception:
+            raise RuntimeError(f"{vista}: {at.exception[0].message}")
+        resultados[vista] = {"llamadas": h.total, "p50_ms": h.percentil(0.5) * 1000, "p95_ms": h.percentil(0.95) * 1000}
+    return resultados
+
+
+# ============================================================
+#  BASELINE Y REGRESIONES
+# ============================================================
+
+def comparar(actual: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Mensajes de regresión: latencia p50 o memoria por encima de baseline × tolerancia,
+    throughput por debajo de baseline / tolerancia.
+
+    Se compara la mediana y no la p95: con unos cientos de llamadas de
+    décimas de milisegundo, la cola depende demasiado del ruido de la máquina.
+    """
+    fallas = []
+    for escala, medido in actual.items():
+        base = baseline.get(escala)
+        if base is None:
+            continue
+        if medido["throughput_ops_s"] < base["throughput_ops_s"] / tolerancia:
+            fallas.append(f"{escala}: throughput {medido['throughput_ops_s']:.0f} ops/s "
+                          f"(baseline {base['throughput_ops_s']:.0f})")
+        if medido["bytes_por_pedido"] > base["bytes_por_pedido"] * tolerancia:
+            fallas.append(f"{escala}: memoria {medido['bytes_por_pedido']:.0f} B/pedido "
+                          f"(baseline {base['bytes_por_pedido']:.0f})")
+        ops_base = {**base["operaciones"], **base.get("vistas", {})}
+        for nombre, op in {**medido["operaciones"], **medido.get("vistas", {})}.items():
+            op_base = ops_base.get(nombre)
+            # Por debajo de 50 µs el ruido del reloj domina: no se compara
+            if op_base and op["p50_ms"] > max(op_base["p50_ms"], 0.05) * tolerancia:
+                fallas.append(f"{escala}: {nombre} p50 {op['p50_ms']:.3f} ms (baseline {op_base['p50_ms']:.3f} ms)")
+    return fallas
+
+
+def imprimir(escala: int, resultado: Dict[str, Any]):
+    print(f"\n== {escala:,} pedidos de historial | {resultado['throughput_ops_s']:,.0f} ops/s | "
+          f"{resultado['pedidos_s']:,.0f} pedidos/s | {resultado['bytes_por_pedido']:,.0f} B/pedido en el heap de Python")
+    print(f"{'operación':<26}{'llamadas':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nombre, op in {**resultado["operaciones"], **resultado.get("vistas", {})}.items():
+        print(f"{nombre:<26}{op['llamadas']:>10}{op['p50_ms']:>10.3f}{op['p95_ms']:>10.3f}{op.get('p99_ms', 0):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("memoria", "sqlite"), default="memoria")
+    parser.add_argument("--escalas", default="100,1000,10000", help="pedidos de historial, separados por coma")
+    parser.add_argument("--pedidos", type=int, default=500, help="pedidos nuevos medidos por escala")
+    parser.add_argument("--mesas", type=int, default=30)
+    parser.add_argument("--meseros", type=int, default=4)
+    parser.add_argument("--por-minuto", type=float, default=60.0, help="pedidos por minuto (tiempo virtual)")
+    parser.add_argument("--intervalo", type=float, default=3.0, help="segundos entre revisiones de cada estación")
+    parser.add_argument("--reruns-vistas", type=int, default=5, help="reruns por vista con AppTest (0 = omitir)")
+    parser.add_argument("--repeticiones", type=int, default=3, help="se reporta lo mejor de N corridas")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--tolerancia", type=float, default=2.0, help="factor admitido frente a la baseline")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--guardar-baseline", action="store_true")
+    args = parser.parse_args()
+
+    resultados: Dict[str, Any] = {}
+    for escala in (int(e) for e in args.escalas.split(",")):
+        with tempfile.TemporaryDirectory() as directorio:
+            repo = crear_repositorio(args.backend, directorio)
+            bytes_por_pedido = precargar(repo, escala, args.mesas, args.meseros, args.semilla)
+            resultado = mejor_de([
+                simular(Servicios(repo), args.pedidos, args.mesas, args.meseros,
+                        args.por_minuto, args.intervalo, args.semilla + i)
+                for i in range(args.repeticiones)
+            ])
+            resultado["bytes_por_pedido"] = bytes_por_pedido
+            if args.backend == "sqlite" and args.reruns_vistas and escala <= 100_000:
+                resultado["vistas"] = medir_vistas(directorio, args.reruns_vistas)
+        resultados[str(escala)] = resultado
+        imprimir(escala, resultado)
+
+    ruta = Path(args.baseline)
+    guardadas = json.loads(ruta.read_text(encoding="utf-8")) if ruta.exists() else {}
+    if args.guardar_baseline:
+        guardadas.setdefault(args.backend, {}).update(resultados)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(guardadas, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline guardada en {ruta}")
+        return
+
+    fallas = comparar(resultados, guardadas.get(args.backend, {}), args.tolerancia)
+    if fallas:
+        print("\nREGRESIONES:")
+        for falla in fallas:
+            print(f"  - {falla}")
+        sys.exit(1)
+    print("\nSin regresiones respecto de la baseline." if guardadas.get(args.backend) else "\nSin baseline para comparar.")
+
+
+if __name__ == "__main__":
+    main()
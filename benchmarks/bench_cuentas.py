@@ -0,0 +1,85 @@
+"""Cuentas divididas: costo de recalcular el saldo y las partes de una mesa tras cada pago.
+
+Con muchas mesas abiertas y una mesa grande que paga por partes:
+
+- Sin libro: lo que hacía la pestaña Cuentas, leer los pedidos de la mesa
+  y sumar sus líneas en cada rerun, más recorrer los pagos.
+- Con libro, sin cambios: el libro cacheado se devuelve tal cual.
+- Con libro, tras un pago: el libro reaplica los pagos sobre las líneas ya
+  cargadas (no vuelve a leer pedidos). Incluye registrar el pago, que
+  valida contra el saldo dentro de su transacción.
+
+Uso:
+  python benchmarks/bench_cuentas.py
+  python benchmarks/bench_cuentas.py --mesas 200 --pedidos 40 --backend sqlite
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.configuracion import Configuracion, construir_servicios  # noqa: E402
+
+ITEMS = [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1},
+         {"tipo": "comida_mexicana", "nombre": "Tacos", "cantidad": 2}]
+
+
+def sin_libro(servicios, mesa: int) -> float:
+    pedidos = servicios.repo.pedidos_de_mesa(mesa, excluir_estado="cancelado")
+    total = sum(linea.subtotal for p in pedidos for linea in p.items)
+    pagado = sum(p.importe for p in servicios.repo.pagos_de_mesa(mesa))
+    return round(total - pagado, 2)
+
+
+def cronometrar(fn, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mesas", type=int, default=100)
+    parser.add_argument("--pedidos", type=int, default=30, help="pedidos por mesa")
+    parser.add_argument("--backend", default="memoria", choices=("memoria", "sqlite"))
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as datos:
+        servicios = construir_servicios(Configuracion(directorio_datos=datos, backend=args.backend,
+                                                      intervalo_sincronizacion=0, intervalo_pronostico=0))
+        servicios.reponer_stock([{"tipo": t, "nombre": n, "cantidad": 1_000_000}
+                                 for t, items in servicios.repo.obtener_inventario().items() for n in items])
+        with servicios.repo.transaccion():
+            for mesa in range(1, args.mesas + 1):
+                servicios.crear_mesa(mesa, 6)
+                for _ in range(args.pedidos):
+                    servicios.crear_pedido(mesa, ITEMS, "Mesero")
+
+        libro = servicios.libro_cuenta(1)
+        sin_cambios = (
+            cronometrar(lambda: (sin_libro(servicios, 1), libro.partes_iguales(6)), args.repeticiones),
+            cronometrar(lambda: servicios.libro_cuenta(1).partes_iguales(6), args.repeticiones),
+        )
+        tras_pago = (
+            cronometrar(lambda: (servicios.registrar_pago(1, "Mesero", importe=0.01),
+                                 sin_libro(servicios, 1), libro.partes_iguales(6)), args.repeticiones),
+            cronometrar(lambda: (servicios.registrar_pago(1, "Mesero", importe=0.01),
+                                 servicios.libro_cuenta(1).partes_iguales(6)), args.repeticiones),
+        )
+        lineas = len(servicios.libro_cuenta(1).lineas)
+        print(f"mesa con {lineas} líneas entre {args.mesas} mesas ({args.backend}):")
+        print(f"{'':<22}{'sin libro ms':>14}{'con libro ms':>14}")
+        print(f"{'rerun sin cambios':<22}{sin_cambios[0]:>14.4f}{sin_cambios[1]:>14.4f}")
+        print(f"{'pago + rerun':<22}{tras_pago[0]:>14.4f}{tras_pago[1]:>14.4f}")
+        servicios.bitacora.cerrar()
+        if servicios.pool is not None:
+            servicios.pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Costo de importación y arranque del núcleo `ordify` (y de app.py si hay Streamlit).
+
+Cada medición corre en un intérprete nuevo (sin módulos en caché) y se
+reporta la mediana descontando el arranque del propio intérprete. Además
+se lista qué módulos pesados quedaron cargados: un worker que solo usa
+servicios en memoria no debería pagar sqlite3, http.server ni Streamlit.
+
+Uso:
+  python benchmarks/bench_importacion.py
+  python benchmarks/bench_importacion.py --repeticiones 21
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+DIRECTORIO_APP = RAIZ / "alma_sabor_pin"
+
+PESADOS = ("sqlite3", "http.server", "hashlib", "secrets", "streamlit")
+
+CASOS = {
+    "import ordify.modelos": "import ordify.modelos",
+    "import ordify.servicios": "import ordify.servicios",
+    "import ordify.configuracion": "import ordify.configuracion",
+    "arranque memoria": (
+        "from ordify.configuracion import Configuracion, construir_servicios\n"
+        "construir_servicios(Configuracion(directorio_datos={datos!r}, backend='memoria'))"
+    ),
+    "arranque sqlite": (
+        "from ordify.configuracion import Configuracion, construir_servicios\n"
+        "construir_servicios(Configuracion(directorio_datos={datos!r}, backend='sqlite'))"
+    ),
+    "import app": "import app",
+}
+
+SONDA = """
+import sys, time
+_t = time.perf_counter()
+{codigo}
+_t = time.perf_counter() - _t
+print(_t, ",".join(m for m in {pesados!r} if m in sys.modules), sep="\t")
+"""
+
+
+def correr(codigo: str, datos: str) -> subprocess.CompletedProcess:
+    sonda = SONDA.format(codigo=codigo.format(datos=datos), pesados=PESADOS)
+    entorno = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", ORDIFY_METRICAS="0")
+    return subprocess.run(
+        [sys.executable, "-c", sonda], cwd=DIRECTORIO_APP, env=entorno,
+        capture_output=True, text=True,
+    )
+
+
+def medir(codigo: str, repeticiones: int):
+    """(mediana en ms del bloque medido, pesados cargados) o None si no se pudo importar."""
+    tiempos = []
+    pesados = ""
+    for _ in range(repeticiones):
+        with tempfile.TemporaryDirectory() as datos:
+            proceso = correr(codigo, datos)
+        if proceso.returncode != 0:
+            return None
+        segundos, pesados = proceso.stdout.splitlines()[-1].split("\t")
+        tiempos.append(float(segundos) * 1000)
+    return statistics.median(tiempos), pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'caso':<30}{'mediana ms':>12}   módulos pesados cargados")
+    for nombre, codigo in CASOS.items():
+        resultado = medir(codigo, args.repeticiones)
+        if resultado is None:
+            print(f"{nombre:<30}{'—':>12}   (no disponible en este entorno)")
+            continue
+        mediana, pesados = resultado
+        print(f"{nombre:<30}{mediana:>12.1f}   {pesados or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Latencia de login y ritmo de fuerza bruta: PIN en texto plano vs. hash + caché + limitador.
+
+Uso:  python benchmarks/bench_login.py [PRESUPUESTO_MS]
+"""
+import secrets
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.modelos import Usuario  # noqa: E402
+from ordify.seguridad import AlmacenUsuarios, LimitadorIntentos  # noqa: E402
+
+ESPACIO_PINES = 10 ** 6
+TASA_GLOBAL = 2.0   # intentos/s sostenidos que admite el limitador del proceso
+USUARIOS = {
+    "000000": Usuario(rol="admin", nombre="Administrador"),
+    "111111": Usuario(rol="mesero", nombre="Mesero"),
+    "222222": Usuario(rol="chef_italiano", nombre="Chef Italiano"),
+    "333333": Usuario(rol="chef_mexicano", nombre="Chef Mexicano"),
+    "444444": Usuario(rol="barista", nombre="Barista"),
+}
+
+
+def medir(fn, repeticiones: int) -> float:
+    """Segundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def dias(segundos: float) -> str:
+    return f"{segundos / 86400:,.1f} días" if segundos >= 86400 else f"{segundos:,.1f} s"
+
+
+def main(presupuesto_ms: float):
+    # Antes: dict {pin: Usuario} en texto plano
+    plano = dict(USUARIOS)
+    t_plano = medir(lambda: plano.get("999999"), 200_000)
+
+    pimienta = secrets.token_bytes(32)
+    almacen = AlmacenUsuarios(pimienta)
+    sin_cache = AlmacenUsuarios(pimienta, ttl_cache=0)
+    for pin, usuario in USUARIOS.items():
+        almacen.registrar(pin, usuario)
+        sin_cache.registrar(pin, usuario)
+
+    # Primer login (hash lento) y repetidos (caché de verificación)
+    t_primero = medir(lambda: sin_cache.autenticar("111111"), 10)
+    almacen.autenticar("111111")
+    t_repetido = medir(lambda: almacen.autenticar("111111"), 10_000)
+    t_fallo = medir(lambda: almacen.autenticar("999999"), 10)
+
+    # Fuerza bruta con el limitador por defecto: intentos aceptados en una ráfaga larga
+    limitador = LimitadorIntentos(tasa_global=TASA_GLOBAL)
+    aceptados = sum(limitador.consumir(f"atacante-{i % 1000}")[0] for i in range(100_000))
+    tasa_sostenida = TASA_GLOBAL
+
+    filas = [
+        ("texto plano (antes)", 1 / t_plano),
+        ("hash lento, sin limitador", 1 / t_fallo),
+        ("hash lento + limitador", tasa_sostenida),
+    ]
+    print(f"Login: primero {t_primero * 1e3:.1f} ms | repetido (caché) {t_repetido * 1e6:.1f} µs | "
+          f"PIN inválido {t_fallo * 1e3:.1f} ms")
+    print(f"Ráfaga de 100000 intentos desde 1000 clientes: {aceptados} aceptados\n")
+    print(f"{'fuerza bruta':<28}{'intentos/s':>16}{'recorrer 10^6 PINes':>24}")
+    for nombre, por_segundo in filas:
+        print(f"{nombre:<28}{por_segundo:>16,.1f}{dias(ESPACIO_PINES / por_segundo):>24}")
+
+    if t_primero * 1e3 > presupuesto_ms:
+        print(f"\nFALLA: el primer login ({t_primero * 1e3:.1f} ms) supera el presupuesto de {presupuesto_ms} ms")
+        sys.exit(1)
+    print(f"\nOK: login dentro del presupuesto de {presupuesto_ms} ms; "
+          f"fuerza bruta {filas[0][1] / tasa_sostenida:,.0f}x más lenta que con PIN en texto plano")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 500.0)
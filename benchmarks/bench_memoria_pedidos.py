@@ -0,0 +1,101 @@
+"""Bytes por pedido residente: modelo con dicts (antes) vs. __slots__ (después) vs. columnar.
+
+Uso:  python benchmarks/bench_memoria_pedidos.py [N_PEDIDOS]
+"""
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.historial import HistorialColumnar  # noqa: E402
+from ordify.modelos import LineaPedido, Pedido, codificar_produccion  # noqa: E402
+
+MENU = [
+    ("comida_italiana", "Pizza Margherita", 12.99),
+    ("comida_italiana", "Lasagna", 14.50),
+    ("comida_mexicana", "Tacos", 10.99),
+    ("comida_mexicana", "Burrito", 11.50),
+    ("bebidas", "Café", 3.99),
+    ("bebidas", "Jugo Natural", 4.50),
+]
+MESEROS = ["Mesero", "Administrador"]
+
+
+@dataclass
+class PedidoAntes:
+    """Copia del modelo original: items como dicts y producción como dict por pedido."""
+    id: int
+    mesa_numero: int
+    items: List[Dict[str, Any]]
+    estado: str = "pendiente"
+    creado_por: str = ""
+    produccion_estados: Dict[str, str] = field(default_factory=dict)
+    total: float = 0.0
+
+
+def generar(n: int, semilla: int = 7):
+    rnd = random.Random(semilla)
+    for i in range(1, n + 1):
+        lineas = [rnd.choice(MENU) + (rnd.randint(1, 4),) for _ in range(rnd.randint(1, 5))]
+        # nombres construidos en tiempo de ejecución, como llegarían de la base de datos
+        yield i, rnd.randint(1, 40), "".join(rnd.choice(MESEROS)), lineas
+
+
+def construir_antes(n: int):
+    pedidos = []
+    for pid, mesa, creador, lineas in generar(n):
+        items = [{"nombre": "".join(nom), "cantidad": c, "tipo": "".join(t), "precio": pr} for t, nom, pr, c in lineas]
+        produccion = {"".join(t): "pendiente" for t, _, _, _ in lineas}
+        pedidos.append(PedidoAntes(pid, mesa, items, "pendiente", creador, produccion,
+                                   sum(pr * c for _, _, pr, c in lineas)))
+    return pedidos
+
+
+def pedidos_despues(n: int):
+    for pid, mesa, creador, lineas in generar(n):
+        items = [LineaPedido.crear(t, nom, c, pr) for t, nom, pr, c in lineas]
+        produccion = codificar_produccion({t: "pendiente" for t, _, _, _ in lineas})
+        yield Pedido(pid, mesa, items, "pendiente", sys.intern(creador), produccion,
+                     sum(pr * c for _, _, pr, c in lineas))
+
+
+def construir_despues(n: int):
+    return list(pedidos_despues(n))
+
+
+def construir_columnar(n: int):
+    historial = HistorialColumnar()
+    for p in pedidos_despues(n):
+        historial.agregar(p)
+    return historial
+
+
+def medir(constructor, n: int) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    datos = constructor(n)
+    usados = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del datos
+    return usados / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    antes = medir(construir_antes, n)
+    despues = medir(construir_despues, n)
+    columnar = medir(construir_columnar, n)
+    print(f"Pedidos: {n:,}")
+    print(f"{'Representación':<28}{'bytes/pedido':>14}{'vs. antes':>12}")
+    for nombre, valor in (("dataclass + dicts (antes)", antes),
+                          ("__slots__ + catálogo", despues),
+                          ("historial columnar", columnar)):
+        print(f"{nombre:<28}{valor:>14.0f}{valor / antes:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
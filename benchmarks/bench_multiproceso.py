@@ -0,0 +1,183 @@
+"""Flujo de pedidos con varios procesos sobre la misma base SQLite: consistencia y latencia de avisos.
+
+Arranca M procesos de meseros y un proceso por estación, cada uno con sus
+propios Servicios (construir_servicios, como un servidor real detrás de un
+balanceador) sobre el mismo directorio de datos. Los meseros crean pedidos.
+Cada estación espera en su tema del bus local, que solo se entera de los
+pedidos ajenos por el SincronizadorProcesos, y marca lo que ve como enviado.
+Al final el proceso principal verifica:
+
+- ids de pedido únicos y ningún pedido perdido;
+- todas las estaciones de todos los pedidos enviadas;
+- stock final = stock inicial - unidades pedidas, por producto;
+- entregar y cobrar todas las mesas archiva exactamente el total vendido.
+
+Además informa pedidos/s y la latencia desde que un mesero confirma un
+pedido hasta que la estación (otro proceso) lo ve en su cola.
+
+Uso:
+  python benchmarks/bench_multiproceso.py
+  python benchmarks/bench_multiproceso.py --meseros 1,2,4 --pedidos 300
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.configuracion import Configuracion, construir_servicios  # noqa: E402
+from ordify.eventos import tema_estacion  # noqa: E402
+from ordify.metricas import Histograma  # noqa: E402
+from ordify.repositorio_sqlite import RepositorioSQLite, crear_pool_sqlite  # noqa: E402
+
+MENU = {
+    "comida_italiana": ("Pizza Margherita", "Lasagna"),
+    "comida_mexicana": ("Tacos", "Burrito"),
+    "bebidas": ("Café", "Jugo Natural"),
+}
+MESAS = 20
+
+
+def configuracion(datos: str, nodo: str) -> Configuracion:
+    return Configuracion(directorio_datos=datos, backend="sqlite", nodo=nodo, intervalo_sincronizacion=0.02)
+
+
+def mesero(datos: str, numero: int, pedidos: int, semilla: int, salida):
+    servicios = construir_servicios(configuracion(datos, f"mesero{numero}"))
+    rnd = random.Random(semilla + numero)
+    creados: List[Tuple[int, Dict[Tuple[str, str], int]]] = []
+    for _ in range(pedidos):
+        items = [{"tipo": t, "nombre": rnd.choice(MENU[t]), "cantidad": rnd.randint(1, 2)}
+                 for t in rnd.sample(list(MENU), rnd.randint(1, 3))]
+        pedido = servicios.crear_pedido(rnd.randint(1, MESAS), items, f"Mesero {numero}")
+        creados.append((pedido.id, {(it["tipo"], it["nombre"]): it["cantidad"] for it in items}))
+    salida.put(("mesero", creados))
+
+
+def estacion(datos: str, tipo: str, listos, fin, salida):
+    servicios = construir_servicios(configuracion(datos, f"estacion-{tipo}"))
+    tema = tema_estacion(tipo)
+    latencias: List[float] = []
+    enviados = 0
+    version = servicios.bus.version(tema)
+    listos.release()
+    while True:
+        version = servicios.bus.esperar(tema, version, 0.2)
+        cola = servicios.cola_estacion(tipo)
+        ahora = time.time()
+        for entrada in cola:
+            latencias.append(ahora - entrada.pedido.creado_en)
+            servicios.marcar_estacion_enviada(entrada.pedido.id, tipo)
+            enviados += 1
+        if not cola and fin.is_set():
+            # Última pasada: lo que haya quedado sin aviso (no debería haber nada)
+            restantes = servicios.repo.pedidos_pendientes_estacion(tipo)
+            salida.put(("estacion", tipo, enviados, latencias, len(restantes),
+                        servicios.sincronizador.resincronizaciones))
+            return
+
+
+def correr(meseros: int, pedidos: int, semilla: int):
+    with tempfile.TemporaryDirectory() as datos:
+        stock = meseros * pedidos * 2 + 10
+        inventario = {t: {n: {"stock": stock, "precio": 10.0 + i} for i, n in enumerate(ns)} for t, ns in MENU.items()}
+        pool = crear_pool_sqlite(os.path.join(datos, "ordify.db"), 1)
+        RepositorioSQLite(pool, inventario)   # siembra el stock antes que construir_servicios
+        pool.cerrar()
+        principal = construir_servicios(configuracion(datos, "principal"))
+        for mesa in range(1, MESAS + 1):
+            principal.crear_mesa(mesa, 4)
+
+        ctx = mp.get_context("spawn")
+        salida, fin, listos = ctx.Queue(), ctx.Event(), ctx.Semaphore(0)
+        estaciones = [ctx.Process(target=estacion, args=(datos, t, listos, fin, salida)) for t in MENU]
+        for p in estaciones:
+            p.start()
+        for _ in estaciones:
+            listos.acquire()
+
+        inicio = time.perf_counter()
+        procesos = [ctx.Process(target=mesero, args=(datos, i, pedidos, semilla, salida)) for i in range(meseros)]
+        for p in procesos:
+            p.start()
+        creados: List[Tuple[int, Dict[Tuple[str, str], int]]] = []
+        for _ in procesos:
+            creados.extend(salida.get()[1])
+        for p in procesos:
+            p.join()
+        # Esperar a que las estaciones vacíen sus colas (visto desde la base, no desde un aviso)
+        while any(principal.repo.pedidos_pendientes_estacion(t) for t in MENU):
+            time.sleep(0.01)
+        duracion = time.perf_counter() - inicio
+        fin.set()
+        por_estacion = [salida.get() for _ in estaciones]
+        for p in estaciones:
+            p.join()
+
+        # ----------------------- VERIFICACIONES -----------------------
+        errores = []
+        ids = [pid for pid, _ in creados]
+        if len(set(ids)) != len(ids) or len(ids) != meseros * pedidos:
+            errores.append(f"ids: {len(ids)} pedidos, {len(set(ids))} distintos, esperados {meseros * pedidos}")
+        for pid in ids:
+            p = principal.repo.obtener_pedido(pid)
+            if p is None or any(e != "enviado" for e in p.produccion_estados.values()):
+                errores.append(f"pedido {pid} incompleto: {p and p.produccion_estados}")
+        pedidas: Dict[Tuple[str, str], int] = {}
+        for _, cantidades in creados:
+            for clave, cantidad in cantidades.items():
+                pedidas[clave] = pedidas.get(clave, 0) + cantidad
+        final = principal.repo.obtener_inventario()
+        for (tipo, nombre), cantidad in pedidas.items():
+            if final[tipo][nombre]["stock"] != stock - cantidad:
+                errores.append(f"stock {nombre}: {final[tipo][nombre]['stock']} != {stock - cantidad}")
+        vendido = sum(principal.repo.obtener_pedido(pid).total for pid in ids)
+        cobrado = 0.0
+        for mesa in range(1, MESAS + 1):
+            cuenta = principal.cerrar_cuenta(mesa, "Administrador")
+            cobrado += cuenta.total if cuenta is not None else 0.0
+        if abs(cobrado - vendido) > 0.01:
+            errores.append(f"cobrado {cobrado:.2f} != vendido {vendido:.2f}")
+        enviados = sum(e[2] for e in por_estacion)
+        esperados = sum(len({tipo for tipo, _ in cantidades}) for _, cantidades in creados)
+        if enviados != esperados:
+            errores.append(f"envíos: {enviados} != {esperados}")
+        if any(e[4] for e in por_estacion):
+            errores.append("pedidos que ninguna estación vio por aviso: " + str([e[4] for e in por_estacion]))
+        latencia = Histograma()
+        for e in por_estacion:
+            for segundos in e[3]:
+                latencia.observar(segundos)
+        principal.sincronizador.detener()
+        return duracion, latencia, errores, sum(e[5] for e in por_estacion)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meseros", default="1,2,4", help="procesos de meseros por corrida")
+    parser.add_argument("--pedidos", type=int, default=200, help="pedidos por proceso de mesero")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    fallo = False
+    print(f"{'meseros':>8}{'pedidos':>9}{'pedidos/s':>11}{'aviso p50 ms':>14}{'aviso p95 ms':>14}  resultado")
+    for meseros in (int(x) for x in args.meseros.split(",")):
+        duracion, latencia, errores, resinc = correr(meseros, args.pedidos, args.semilla)
+        total = meseros * args.pedidos
+        resultado = "consistente" if not errores else "; ".join(errores[:3])
+        if resinc:
+            resultado += f" ({resinc} resincronizaciones)"
+        print(f"{meseros:>8}{total:>9}{total / duracion:>11,.0f}{latencia.percentil(0.5) * 1000:>14.1f}"
+              f"{latencia.percentil(0.95) * 1000:>14.1f}  {resultado}")
+        fallo = fallo or bool(errores)
+    sys.exit(1 if fallo else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Pronóstico de agotamiento: costo por rerun, costo en la ruta del pedido y reposición en bloque.
+
+- Rerun: antes habría que recorrer los pedidos de la última hora y calcular
+  el consumo de cada producto en cada rerun de la pestaña Inventario; ahora
+  la vista lee el último PanoramaInventario que dejó el hilo.
+- Ruta del pedido: crear_pedido con y sin VigilanteInventario suscrito al
+  bus (el callback solo encola el evento).
+- Reposición: reponer todos los productos producto por producto (una
+  transacción cada uno) vs. reponer_stock con todos en una transacción.
+
+Uso:
+  python benchmarks/bench_pronostico.py
+  python benchmarks/bench_pronostico.py --pedidos 5000 --backend sqlite
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.configuracion import Configuracion, construir_servicios  # noqa: E402
+from ordify.pronostico import ConsumoVentanas  # noqa: E402
+from ordify.reservas import agrupar_cantidades  # noqa: E402
+
+ITEMS = [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1},
+         {"tipo": "comida_mexicana", "nombre": "Tacos", "cantidad": 2}]
+
+
+def servicios_con(datos: str, backend: str, pronostico: bool):
+    config = Configuracion(directorio_datos=datos, backend=backend, intervalo_sincronizacion=0,
+                           intervalo_pronostico=30.0 if pronostico else 0)
+    servicios = construir_servicios(config)
+    # Stock de sobra para los pedidos del benchmark
+    servicios.reponer_stock([{"tipo": t, "nombre": n, "cantidad": 1_000_000}
+                             for t, items in servicios.repo.obtener_inventario().items() for n in items])
+    servicios.crear_mesa(1, 4)
+    return servicios
+
+
+def consumo_en_rerun(servicios) -> dict:
+    """Lo que haría la vista sin el hilo: recorrer los pedidos de la ventana en cada rerun."""
+    ahora = time.time()
+    consumo = ConsumoVentanas()
+    for p in servicios.repo.listar_pedidos():
+        if p.creado_en >= ahora - consumo.ventanas[-1] and p.estado != "cancelado":
+            for clave, cantidad in agrupar_cantidades(p.items).items():
+                consumo.sumar(clave, cantidad, p.creado_en)
+    return {(t, n): consumo.por_hora((t, n), ahora)
+            for t, items in servicios.repo.obtener_inventario().items() for n in items}
+
+
+def crear_pedidos(servicios, n: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(n):
+        servicios.crear_pedido(1, ITEMS, "Mesero")
+    return (time.perf_counter() - inicio) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--backend", default="memoria", choices=("memoria", "sqlite"))
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as sin_dir, tempfile.TemporaryDirectory() as con_dir:
+        sin = servicios_con(sin_dir, args.backend, pronostico=False)
+        con = servicios_con(con_dir, args.backend, pronostico=True)
+        sin_ms = crear_pedidos(sin, args.pedidos) * 1000
+        con_ms = crear_pedidos(con, args.pedidos) * 1000
+        print(f"crear_pedido ({args.backend}): sin vigilante {sin_ms:.3f} ms, con vigilante {con_ms:.3f} ms")
+
+        time.sleep(con.vigilante.revision * 2)   # el hilo procesa lo encolado
+        inicio = time.perf_counter()
+        for _ in range(args.repeticiones):
+            consumo_en_rerun(con)
+        antes = (time.perf_counter() - inicio) / args.repeticiones
+        inicio = time.perf_counter()
+        for _ in range(args.repeticiones):
+            con.vigilante.panorama.alertas, con.vigilante.panorama.tabla
+        despues = (time.perf_counter() - inicio) / args.repeticiones
+        inicio = time.perf_counter()
+        con.vigilante.revisar(forzar=True)
+        recalculo = time.perf_counter() - inicio
+        print(f"rerun con {args.pedidos:,} pedidos en la ventana: calcular {antes * 1000:.3f} ms, "
+              f"leer panorama {despues * 1000:.4f} ms (recálculo en el hilo: {recalculo * 1000:.3f} ms)")
+
+        productos = [{"tipo": t, "nombre": n, "cantidad": 5}
+                     for t, items in con.repo.obtener_inventario().items() for n in items]
+        inicio = time.perf_counter()
+        for item in productos:
+            con.reponer_stock([item])
+        uno_a_uno = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        con.reponer_stock(productos)
+        en_bloque = time.perf_counter() - inicio
+        print(f"reponer {len(productos)} productos: uno por uno {uno_a_uno * 1000:.2f} ms, "
+              f"en una transacción {en_bloque * 1000:.2f} ms")
+        for servicios in (sin, con):
+            if servicios.vigilante is not None:
+                servicios.vigilante.detener()
+            servicios.bitacora.cerrar()
+            if servicios.pool is not None:
+                servicios.pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Tiempo y memoria pico del reporte de ventas sobre un mes de cuentas archivadas.
+
+Genera un archivo sintético (N días x M cuentas por día, con el mismo
+formato que escribe ArchivoCuentas.archivar) y lo resume de tres formas:
+cargando todas las filas en memoria antes de agregar (referencia), por lotes
+en Python puro y por lotes con pandas (si está instalado). La memoria pico
+se mide con tracemalloc.
+
+Uso:
+  python benchmarks/bench_reportes.py
+  python benchmarks/bench_reportes.py --dias 30 --cuentas 400 --lote 20000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.cuentas import ArchivoCuentas  # noqa: E402
+from ordify.modelos import LineaPedido, Mesa, Pedido  # noqa: E402
+from ordify.reportes import ResumenVentas, _agregar_python, resumir_ventas  # noqa: E402
+
+MENU = [
+    ("comida_italiana", "Pizza Margherita", 12.99),
+    ("comida_italiana", "Lasagna", 14.50),
+    ("comida_mexicana", "Tacos", 10.99),
+    ("comida_mexicana", "Burrito", 11.50),
+    ("bebidas", "Café", 3.99),
+    ("bebidas", "Jugo Natural", 4.50),
+]
+MESEROS = ["Ana", "Luis", "Marta", "Administrador"]
+
+
+def generar(archivo: ArchivoCuentas, dias: int, cuentas: int, semilla: int) -> int:
+    """Archiva `cuentas` cuentas por día durante `dias` días; devuelve el número de líneas."""
+    rnd = random.Random(semilla)
+    inicio = datetime(2026, 1, 1, 12)
+    lineas = 0
+    pedido_id = 0
+    for dia in range(dias):
+        for n in range(cuentas):
+            cierre = (inicio + timedelta(days=dia, minutes=rnd.randint(0, 600))).timestamp()
+            mesa = Mesa(numero=rnd.randint(1, 30), comensales=rnd.randint(1, 8), id=dia * cuentas + n + 1)
+            pedidos = []
+            for _ in range(rnd.randint(1, 4)):
+                pedido_id += 1
+                items = [LineaPedido.crear(t, nombre, rnd.randint(1, 3), precio)
+                         for t, nombre, precio in rnd.sample(MENU, rnd.randint(1, 3))]
+                pedidos.append(Pedido(
+                    id=pedido_id, mesa_numero=mesa.numero, items=items, estado="entregado",
+                    creado_por=rnd.choice(MESEROS), total=sum(it.subtotal for it in items),
+                    creado_en=cierre - rnd.randint(300, 5400),
+                ))
+                lineas += len(items)
+            archivo.archivar(mesa, pedidos, "Administrador", cerrada_en=cierre)
+    return lineas
+
+
+def todo_en_memoria(archivo: ArchivoCuentas) -> ResumenVentas:
+    """Referencia: junta todas las filas del período y recién después agrega."""
+    filas = [fila for lote in archivo.lotes() for fila in lote]
+    resumen = ResumenVentas(None, None, "todo en memoria")
+    _agregar_python(resumen, filas)
+    return resumen
+
+
+def medir(fn, *args, **kwargs):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = fn(*args, **kwargs)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--cuentas", type=int, default=300, help="cuentas cerradas por día")
+    parser.add_argument("--lote", type=int, default=10_000, help="filas por lote")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = ArchivoCuentas(directorio)
+        inicio = time.perf_counter()
+        lineas = generar(archivo, args.dias, args.cuentas, args.semilla)
+        print(f"{args.dias} días x {args.cuentas} cuentas = {lineas:,} líneas archivadas "
+              f"en {time.perf_counter() - inicio:.1f} s")
+
+        casos = [("todo en memoria", todo_en_memoria, {}),
+                 ("por lotes, python", resumir_ventas, {"motor": "python", "tamano_lote": args.lote})]
+        try:
+            import pandas  # noqa: F401
+            casos.append(("por lotes, pandas", resumir_ventas, {"motor": "pandas", "tamano_lote": args.lote}))
+        except ImportError:
+            print("pandas no está instalado: se omite el motor vectorizado.")
+
+        print(f"{'modo':<20}{'segundos':>10}{'líneas/s':>12}{'pico MB':>10}{'total':>14}")
+        for nombre, fn, kwargs in casos:
+            resumen, segundos, pico = medir(fn, archivo, **kwargs)
+            print(f"{nombre:<20}{segundos:>10.2f}{resumen.lineas / segundos:>12,.0f}"
+                  f"{pico / 2**20:>10.1f}{resumen.importe:>14,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Costo por rerun de las tablas de administración: filas completas cada vez vs. tablas cacheadas y paginadas.
+
+Para cada escala se cargan N pedidos pendientes (y sus mesas) y se simula
+un rerun de las pestañas Mesas, Pedidos e Inventario: antes se recorrían
+todos los pedidos, se armaban todas las filas y se enviaban todas al
+navegador; ahora se reutilizan las filas si la versión del repositorio no
+cambió y se envía una página. El tamaño enviado se aproxima con el JSON
+de las filas (Streamlit serializa a Arrow, del mismo orden).
+
+Uso:
+  python benchmarks/bench_tablas.py
+  python benchmarks/bench_tablas.py --escalas 100,1000,10000,50000 --por-pagina 25
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.repositorio_memoria import RepositorioMemoria  # noqa: E402
+from ordify.secuencias import GeneradorIds  # noqa: E402
+from ordify.servicios import Servicios  # noqa: E402
+
+MESAS = 40
+
+
+def preparar(n: int) -> Servicios:
+    inventario = {"bebidas": {"Café": {"stock": n + 10, "precio": 3.99}}}
+    servicios = Servicios(RepositorioMemoria(inventario, ids=GeneradorIds()))
+    for mesa in range(1, MESAS + 1):
+        servicios.crear_mesa(mesa, 4)
+    for i in range(n):
+        servicios.repo.agregar_pedido(i % MESAS + 1, [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1}], "Mesero")
+    return servicios
+
+
+def rerun_antes(servicios: Servicios) -> List[List[Dict[str, Any]]]:
+    """Lo que hacían las pestañas en cada rerun (copiado de app.py antes del cambio)."""
+    repo = servicios.repo
+    mesas = [{"Mesa": m.numero, "Comensales": m.comensales, "Estado": m.estado} for m in repo.listar_mesas()]
+    pedidos = [
+        {
+            "ID": p.id,
+            "Mesa": p.mesa_numero,
+            "Tipos": " / ".join(t.replace("_", " ").title() for t in sorted(p.produccion_estados)),
+            "Estado": p.estado,
+            "Total aprox": round(servicios.calcular_total_pedido(p), 2),
+        }
+        for p in repo.listar_pedidos(excluir_estado="entregado")
+    ]
+    inventario = [
+        [{"Producto": nombre, "Stock": info["stock"], "Precio": info["precio"]} for nombre, info in items.items()]
+        for items in repo.obtener_inventario().values()
+    ]
+    return [mesas, pedidos, *inventario]
+
+
+def rerun_despues(servicios: Servicios, por_pagina: int) -> List[List[Dict[str, Any]]]:
+    tablas = servicios.tablas
+    secciones = [tablas.mesas(), tablas.pedidos_activos()]
+    secciones += [tablas.inventario(tipo) for tipo in servicios.menu.categorias()]
+    return [tabla.pagina(1, por_pagina) for tabla in secciones]
+
+
+def medir(fn, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escalas", default="100,1000,10000")
+    parser.add_argument("--por-pagina", type=int, default=25)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'pedidos':>9}{'antes ms':>11}{'antes KB':>11}{'después ms':>12}{'después KB':>12}{'tras cambio ms':>16}")
+    for n in (int(x) for x in args.escalas.split(",")):
+        servicios = preparar(n)
+        antes_s = medir(lambda: rerun_antes(servicios), args.repeticiones)
+        antes_kb = len(json.dumps(rerun_antes(servicios))) / 1024
+        rerun_despues(servicios, args.por_pagina)   # primera construcción
+        despues_s = medir(lambda: rerun_despues(servicios, args.por_pagina), args.repeticiones)
+        despues_kb = len(json.dumps(rerun_despues(servicios, args.por_pagina))) / 1024
+
+        def con_cambio():
+            # Un pedido nuevo invalida la tabla de pedidos: se reconstruye una vez y se envía una página
+            servicios.repo.agregar_pedido(1, [{"tipo": "bebidas", "nombre": "Café", "cantidad": 1}], "Mesero")
+            rerun_despues(servicios, args.por_pagina)
+
+        cambio_s = medir(con_cambio, 5)
+        print(f"{n:>9,}{antes_s * 1000:>11.3f}{antes_kb:>11.1f}{despues_s * 1000:>12.3f}"
+              f"{despues_kb:>12.1f}{cambio_s * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Datos y utilidades compartidas por las pruebas (las fixtures están en conftest.py)."""
+import threading
+
+BACKENDS = ("memoria", "sqlite")
+
+CAFE = {"tipo": "bebidas", "nombre": "Café", "cantidad": 2}
+TACOS = {"tipo": "comida_mexicana", "nombre": "Tacos", "cantidad": 1}
+
+
+def stock(servicios, item) -> int:
+    return servicios.repo.obtener_inventario()[item["tipo"]][item["nombre"]]["stock"]
+
+
+def cerrar(servicios):
+    """Suelta bitácora y conexiones; espera las instantáneas en curso del backend en memoria."""
+    for hilo in threading.enumerate():
+        if hilo.name == "ordify-instantanea":
+            hilo.join()
+    servicios.bitacora.cerrar()
+    if servicios.pool is not None:
+        servicios.pool.cerrar()
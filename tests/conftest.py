@@ -0,0 +1,47 @@
+"""Servicios completos sobre cada backend, sin hilos de fondo.
+
+Las pruebas que reciben `servicios` o `abrir` corren una vez con el
+repositorio en memoria (bitácora + instantáneas) y otra con SQLite, cada
+una en su propio directorio de datos.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "alma_sabor_pin"))
+
+from ordify.configuracion import Configuracion, construir_servicios  # noqa: E402
+
+from .comun import BACKENDS, cerrar  # noqa: E402
+
+
+@pytest.fixture(params=BACKENDS)
+def configuracion(request, tmp_path) -> Configuracion:
+    return Configuracion(directorio_datos=str(tmp_path), backend=request.param,
+                         intervalo_sincronizacion=0, intervalo_pronostico=0, intervalo_archivo=0)
+
+
+@pytest.fixture
+def abrir(configuracion):
+    """Arma servicios sobre el mismo directorio; reiniciar(s) cierra `s` y vuelve a arrancar desde disco."""
+    abiertos = []
+
+    def reiniciar(anterior=None):
+        if anterior is not None:
+            cerrar(anterior)
+            abiertos.remove(anterior)
+        servicios = construir_servicios(configuracion)
+        abiertos.append(servicios)
+        return servicios
+
+    yield reiniciar
+    for servicios in abiertos:
+        cerrar(servicios)
+
+
+@pytest.fixture
+def servicios(abrir):
+    servicios = abrir()
+    servicios.crear_mesa(1, 2)
+    return servicios
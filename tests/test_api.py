@@ -0,0 +1,57 @@
+"""API JSON: códigos de estado de las rutas de sala y estación (ver api.py)."""
+import asyncio
+
+from ordify.api import ApiOrdify, ClienteAsgi
+from ordify.catalogo import CATALOGO
+
+from .comun import CAFE
+
+
+async def sesion(servicios, pin: str) -> ClienteAsgi:
+    api = ApiOrdify(servicios)
+    respuesta = await ClienteAsgi(api).post("/sesiones", {"pin": pin})
+    return ClienteAsgi(api, respuesta.json()["token"])
+
+
+def test_pago_no_finito(servicios):
+    servicios.crear_pedido(1, [CAFE], "Mesero")
+
+    async def escenario():
+        mesero = await sesion(servicios, "111111")
+        for importe in (float("nan"), float("inf"), float("-inf")):
+            assert (await mesero.post("/mesas/1/pagos", {"importe": importe})).estado == 400
+        assert (await mesero.post("/mesas/1/pagos", {"importe": 1.0})).estado == 201
+
+    asyncio.run(escenario())
+    assert servicios.libro_cuenta(1).pagado == 1.0
+
+
+def test_crear_pedido_mesa_o_producto_inexistente(servicios):
+    async def escenario():
+        mesero = await sesion(servicios, "111111")
+        assert (await mesero.post("/pedidos", {"mesa": 99, "items": [CAFE]})).estado == 404
+        for desconocido in (dict(CAFE, nombre="Inexistente"), dict(CAFE, tipo="postres")):
+            assert (await mesero.post("/pedidos", {"mesa": 1, "items": [desconocido]})).estado == 422
+        assert (await mesero.post("/pedidos", {"mesa": 1, "items": [CAFE]})).estado == 201
+
+    catalogo = (len(CATALOGO._productos), len(CATALOGO._estaciones))
+    asyncio.run(escenario())
+    assert len(servicios.repo.listar_pedidos()) == 1
+    # Lo que manda el cliente no se registra en el catálogo del proceso
+    assert (len(CATALOGO._productos), len(CATALOGO._estaciones)) == catalogo
+
+
+def test_enviado_solo_para_pedidos_pendientes(servicios):
+    cancelado = servicios.crear_pedido(1, [CAFE], "Mesero")
+    servicios.cancelar_pedido(cancelado.id)
+    pendiente = servicios.crear_pedido(1, [CAFE], "Mesero")
+
+    async def escenario():
+        barista = await sesion(servicios, "444444")
+        ruta = "/pedidos/{}/enviado"
+        assert (await barista.post(ruta.format(cancelado.id), {"tipo": "bebidas"})).estado == 409
+        assert (await barista.post(ruta.format(pendiente.id), {"tipo": "bebidas"})).estado == 200
+        assert (await barista.post(ruta.format(pendiente.id), {"tipo": "bebidas"})).estado == 409
+
+    asyncio.run(escenario())
+    assert servicios.repo.obtener_pedido(cancelado.id).estado_produccion("bebidas") == "cancelado"
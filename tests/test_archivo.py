@@ -0,0 +1,110 @@
+"""Archivo frío: los pedidos terminados salen del conjunto activo sin cambiar la cuenta."""
+import time
+
+from ordify.ciclo_vida import GestorCicloVida
+from ordify.historial import HistorialColumnar
+
+from .comun import CAFE, TACOS
+
+
+def cuentas(servicios):
+    return {
+        m: (servicios.repo.total_mesa(m), servicios.libro_cuenta(m).total,
+            [p.id for p in servicios.repo.pedidos_de_mesa(m)])
+        for m in (1, 2)
+    }
+
+
+def turno(servicios):
+    """Mesas 1 y 2 con 8 pedidos: 5 entregados, 1 cancelado y 2 pendientes."""
+    servicios.crear_mesa(2, 2)
+    pedidos = [servicios.crear_pedido(1 + i % 2, [CAFE, TACOS], "Mesero") for i in range(8)]
+    for p in pedidos[:5]:
+        servicios.marcar_pedido_entregado(p.id)
+    servicios.cancelar_pedido(pedidos[5].id)
+    return pedidos
+
+
+def test_archivar_no_cambia_las_cuentas(servicios):
+    pedidos = turno(servicios)
+    antes = cuentas(servicios)
+    version = servicios.repo.version_pedidos()
+
+    assert servicios.repo.archivar_pedidos(time.time() + 1) == 6
+    assert servicios.repo.archivar_pedidos(time.time() + 1) == 0
+    assert servicios.repo.version_pedidos() != version
+    assert cuentas(servicios) == antes
+
+    pendientes = [p.id for p in pedidos[6:]]
+    assert [p.id for p in servicios.repo.listar_pedidos()] == pendientes
+    assert servicios.repo.pedidos_por_estado("entregado") == []
+    assert servicios.repo.obtener_pedido(pedidos[0].id).estado == "entregado"
+    assert servicios.repo.obtener_pedido(pedidos[5].id).estado == "cancelado"
+    assert sorted(p.id for p in servicios.repo.listar_archivados()) == [p.id for p in pedidos[:6]]
+    conjunto = servicios.repo.tamano_conjunto()
+    assert (conjunto["activos"], conjunto["terminados_activos"], conjunto["archivados"]) == (2, 0, 6)
+
+
+def test_archivar_por_tope(servicios):
+    turno(servicios)
+    # Ninguno es más viejo que `antes_de`: solo se archivan los que exceden el tope, los más antiguos primero
+    assert servicios.repo.archivar_pedidos(0, maximo=2) == 4
+    assert servicios.repo.tamano_conjunto()["terminados_activos"] == 2
+
+
+def test_archivado_no_cambia_de_estado(servicios):
+    pedidos = turno(servicios)
+    servicios.repo.archivar_pedidos(time.time() + 1)
+    assert not servicios.cancelar_pedido(pedidos[0].id)
+    assert not servicios.marcar_pedido_entregado(pedidos[5].id)
+    assert servicios.repo.obtener_pedido(pedidos[5].id).estado == "cancelado"
+
+
+def test_archivo_sobrevive_al_reinicio(servicios, abrir):
+    turno(servicios)
+    servicios.repo.archivar_pedidos(time.time() + 1)
+    antes = cuentas(servicios)
+    reiniciado = abrir(servicios)
+    assert cuentas(reiniciado) == antes
+    assert reiniciado.repo.tamano_conjunto()["archivados"] == 6
+
+
+def test_cerrar_cuenta_vacia_el_archivo_de_la_mesa(servicios):
+    pedidos = turno(servicios)
+    servicios.repo.archivar_pedidos(time.time() + 1)
+    total = servicios.calcular_total_mesa(1)
+
+    assert servicios.cerrar_cuenta(1, "Ana").total == total
+    assert servicios.repo.obtener_pedido(pedidos[0].id) is None
+    assert servicios.repo.tamano_conjunto()["archivados"] == 3    # los terminados de la mesa 2
+    servicios.eliminar_pedido_por_id(pedidos[5].id)
+    assert servicios.repo.tamano_conjunto()["archivados"] == 2
+
+
+def test_historial_columnar_quitar_y_compactar(servicios):
+    pedidos = turno(servicios)
+    historial = HistorialColumnar()
+    for p in pedidos[:6]:
+        historial.agregar(servicios.repo.obtener_pedido(p.id))
+    assert [p.id for p in historial.de_mesa(2)] == [p.id for p in pedidos[1:6:2]]
+    assert [p.id for p in historial.desde(0)] == [p.id for p in pedidos[:6]]
+    assert historial.desde(time.time() + 1) == []
+
+    quitado = historial.quitar(pedidos[1].id)
+    assert quitado.id == pedidos[1].id and quitado.total == pedidos[1].total
+    assert historial.quitar(pedidos[1].id) is None
+    for p in pedidos[2:5]:
+        historial.quitar(p.id)
+    # Más filas muertas que vivas: las columnas se reescriben solo con las vivas
+    assert len(historial) == len(historial.ids) == 2
+    assert [p.id for p in historial] == [pedidos[0].id, pedidos[5].id]
+    assert historial.obtener(pedidos[5].id).estado == "cancelado"
+    assert [linea.nombre for linea in historial.obtener(pedidos[0].id).items] == ["Café", "Tacos"]
+
+
+def test_gestor_ciclo_vida(servicios):
+    turno(servicios)
+    gestor = GestorCicloVida(servicios, edad=0, maximo=None, intervalo=60)
+    gestor.revisar()
+    assert gestor.metricas()["archivados"] == 6
+    assert servicios.repo.tamano_conjunto()["terminados_activos"] == 0
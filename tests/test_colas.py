@@ -0,0 +1,62 @@
+"""Colas de producción por estación: orden por prioridad, vista cacheada y estados de producción."""
+import pytest
+
+from ordify.colas import ColaEstacion, ReglasPrioridad
+from ordify.modelos import Pedido, codificar_produccion
+
+from .comun import CAFE, TACOS
+
+
+def pedido(pedido_id: int, creado_en: float, **produccion) -> Pedido:
+    estados = {"bebidas": "pendiente", **produccion}
+    return Pedido(id=pedido_id, mesa_numero=1, items=[], estado="pendiente", creado_por="Mesero",
+                  produccion=codificar_produccion(estados), total=0.0, creado_en=creado_en)
+
+
+def test_orden_por_espera_comensales_y_bono():
+    cola = ColaEstacion("bebidas", ReglasPrioridad(peso_espera=1.0, peso_comensales=1.0, bono_juntar=10.0))
+    cola.poner(pedido(1, creado_en=0.0), comensales=1)
+    cola.poner(pedido(2, creado_en=60.0), comensales=3)              # un minuto después, dos comensales más
+    cola.poner(pedido(3, creado_en=300.0, comida_mexicana="enviado"), comensales=1)
+    assert [p.id for p, _, _ in cola.vista()] == [3, 2, 1]
+    cola.poner(pedido(4, creado_en=60.0), comensales=3)              # empate: primero el de id menor
+    assert [p.id for p, _, _ in cola.vista()] == [3, 2, 4, 1]
+
+
+def test_vista_se_reutiliza_hasta_que_cambia_la_cola():
+    cola = ColaEstacion("bebidas", ReglasPrioridad())
+    cola.poner(pedido(1, creado_en=0.0), comensales=2)
+    cola.poner(pedido(2, creado_en=30.0), comensales=2)
+    vista = cola.vista()
+    assert cola.vista() is vista
+    cola.poner(pedido(2, creado_en=30.0, comida_mexicana="enviado"), comensales=2)   # re-prioriza
+    assert [p.id for p, _, _ in cola.vista()] == [2, 1]
+    assert cola.quitar(2).id == 2 and cola.quitar(2) is None
+    assert [p.id for p, _, _ in cola.vista()] == [1]
+    assert [p.id for p, _, _ in vista] == [1, 2]                     # una vista ya entregada no cambia
+    assert len(cola) == 1 and 1 in cola
+
+
+def test_puntaje_y_estimado(servicios):
+    primero = servicios.crear_pedido(1, [CAFE], "Mesero")
+    segundo = servicios.crear_pedido(1, [CAFE], "Mesero")
+    ahora = segundo.creado_en + 120
+    cola = servicios.colas.cola("bebidas", ahora=ahora)
+    reglas = servicios.colas.reglas
+    assert [e.pedido.id for e in cola] == [primero.id, segundo.id]
+    for entrada in cola:
+        espera = ahora - entrada.pedido.creado_en
+        assert entrada.espera_s == espera
+        assert entrada.puntaje == pytest.approx(reglas.peso_espera * espera / 60.0 + reglas.peso_comensales * 2)
+    por_pedido = servicios.colas.segundos_por_pedido("bebidas")
+    assert [e.estimado_s for e in cola] == [por_pedido, 2 * por_pedido]
+
+
+def test_cola_de_estacion_por_estado_de_produccion(servicios):
+    enviado = servicios.crear_pedido(1, [CAFE, TACOS], "Mesero")
+    cancelado = servicios.crear_pedido(1, [CAFE], "Mesero")
+    pendiente = servicios.crear_pedido(1, [CAFE], "Mesero")
+    servicios.marcar_estacion_enviada(enviado.id, "bebidas")
+    servicios.cancelar_pedido(cancelado.id)
+    assert [p.id for p in servicios.filtrar_pedidos_por_estacion("bebidas")] == [pendiente.id]
+    assert [p.id for p in servicios.filtrar_pedidos_por_estacion("comida_mexicana")] == [enviado.id]
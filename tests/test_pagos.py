@@ -0,0 +1,107 @@
+"""Pagos parciales y cierre de cuenta."""
+import pytest
+
+from .comun import CAFE, TACOS, stock
+
+
+@pytest.fixture
+def cuenta(servicios):
+    """Mesa 1 con dos pedidos: Café x2 y Tacos x1."""
+    servicios.crear_pedido(1, [CAFE], "Mesero")
+    servicios.crear_pedido(1, [TACOS], "Mesero")
+    return servicios
+
+
+def test_pago_a_cuenta_descuenta_saldo(cuenta):
+    libro = cuenta.libro_cuenta(1)
+    pago = cuenta.registrar_pago(1, "Ana", importe=5.0)
+    assert pago.importe == 5.0 and pago.comensal == 0
+    despues = cuenta.libro_cuenta(1)
+    assert despues.pagado == 5.0
+    assert despues.saldo == round(libro.total - 5.0, 2)
+    assert [p.id for p in cuenta.repo.pagos_de_mesa(1)] == [pago.id]
+
+
+def test_pago_por_item(cuenta):
+    linea = cuenta.libro_cuenta(1).lineas[0]
+    pago = cuenta.registrar_pago(1, "Ana", lineas={linea.clave: 1}, comensal=2)
+    assert pago.importe == linea.precio
+    despues = cuenta.libro_cuenta(1)
+    assert despues.lineas[0].pagadas == 1
+    assert despues.comensales_con_pago() == [2]
+
+
+@pytest.mark.parametrize("pago", [
+    {"importe": 0},
+    {"importe": 10_000},
+    {"importe": float("nan")},
+    {"importe": float("inf")},
+    {"importe": 1, "comensal": 9},
+    {"lineas": {(999, 0): 1}},
+])
+def test_pago_invalido(cuenta, pago):
+    with pytest.raises(ValueError):
+        cuenta.registrar_pago(1, "Ana", **pago)
+    assert cuenta.repo.pagos_de_mesa(1) == []
+
+
+def test_pago_nan_no_rompe_el_saldo(cuenta):
+    # Un NaN guardado dejaba el saldo en NaN y cualquier pago posterior pasaba la validación
+    saldo = cuenta.libro_cuenta(1).saldo
+    with pytest.raises(ValueError):
+        cuenta.registrar_pago(1, "Ana", importe=float("nan"))
+    assert cuenta.libro_cuenta(1).saldo == saldo
+    with pytest.raises(ValueError):
+        cuenta.registrar_pago(1, "Ana", importe=1e9)
+
+
+def test_pago_por_item_no_supera_unidades(cuenta):
+    linea = cuenta.libro_cuenta(1).lineas[0]
+    with pytest.raises(ValueError):
+        cuenta.registrar_pago(1, "Ana", lineas={linea.clave: linea.cantidad + 1})
+
+
+def test_pago_mesa_inexistente(cuenta):
+    with pytest.raises(KeyError):
+        cuenta.registrar_pago(7, "Ana", importe=1)
+
+
+def test_cerrar_cuenta_cobra_el_saldo_y_libera_la_mesa(cuenta):
+    cafe = stock(cuenta, CAFE)
+    cancelado = cuenta.crear_pedido(1, [CAFE], "Mesero")
+    cuenta.cancelar_pedido(cancelado.id)
+    libro = cuenta.libro_cuenta(1)
+    cuenta.registrar_pago(1, "Ana", importe=5.0)
+
+    cerrada = cuenta.cerrar_cuenta(1, "Ana")
+    assert cerrada.total == libro.total
+    assert cerrada.pedidos == 2            # el cancelado no se factura
+    assert cuenta.repo.obtener_mesa(1) is None
+    assert cuenta.repo.pagos_de_mesa(1) == []
+    assert cuenta.repo.pedidos_de_mesa(1) == []
+    assert stock(cuenta, CAFE) == cafe     # los pendientes se dan por entregados
+    assert cuenta.cerrar_cuenta(1, "Ana") is None
+
+    # El número de mesa se reutiliza con una cuenta nueva
+    cuenta.crear_mesa(1, 4)
+    assert cuenta.libro_cuenta(1).pagos == ()
+    assert cuenta.libro_cuenta(1).saldo == 0
+
+
+def test_cerrar_cuenta_si_falla_archivar_deja_la_mesa_como_estaba(cuenta, abrir):
+    cuenta.registrar_pago(1, "Ana", importe=1.0)
+    antes = cuenta.libros.libro(1, fresco=True)
+
+    def archivar(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    cuenta.archivo.archivar = archivar
+    with pytest.raises(OSError):
+        cuenta.cerrar_cuenta(1, "Ana")
+
+    despues = cuenta.libros.libro(1, fresco=True)
+    assert despues.pagado == antes.pagado == 1.0
+    assert [p.id for p in despues.pagos] == [p.id for p in antes.pagos]
+    assert [p.estado for p in cuenta.repo.pedidos_de_mesa(1)] == ["pendiente", "pendiente"]
+    # Tampoco tras reiniciar (en memoria el pago del saldo quedó en la bitácora y se anuló)
+    assert abrir(cuenta).libro_cuenta(1).pagado == 1.0
@@ -0,0 +1,117 @@
+"""Transiciones de estado de los pedidos y reserva de stock."""
+import pytest
+
+from ordify.reservas import StockInsuficiente
+
+from .comun import CAFE, TACOS, stock
+
+
+def test_crear_pedido_reserva_stock(servicios):
+    antes = stock(servicios, CAFE)
+    pedido = servicios.crear_pedido(1, [CAFE], "Mesero")
+    assert pedido.estado == "pendiente"
+    assert stock(servicios, CAFE) == antes - CAFE["cantidad"]
+    assert servicios.calcular_total_mesa(1) == pedido.total > 0
+
+
+def test_stock_insuficiente_no_descuenta_nada(servicios):
+    cafe, tacos = stock(servicios, CAFE), stock(servicios, TACOS)
+    with pytest.raises(StockInsuficiente) as error:
+        servicios.crear_pedido(1, [CAFE, dict(TACOS, cantidad=tacos + 1)], "Mesero")
+    assert [f[1] for f in error.value.faltantes] == ["Tacos"]
+    assert (stock(servicios, CAFE), stock(servicios, TACOS)) == (cafe, tacos)
+    assert servicios.obtener_pedidos_por_mesa(1) == []
+
+
+def test_cancelar_devuelve_stock_y_no_factura(servicios):
+    antes = stock(servicios, CAFE)
+    pedido = servicios.crear_pedido(1, [CAFE], "Mesero")
+    assert servicios.cancelar_pedido(pedido.id)
+    assert servicios.repo.obtener_pedido(pedido.id).estado == "cancelado"
+    assert stock(servicios, CAFE) == antes
+    assert servicios.calcular_total_mesa(1) == 0
+    assert servicios.libro_cuenta(1).total == 0
+
+
+def test_cancelado_no_se_puede_entregar(servicios):
+    # Antes un cancelado pasaba a entregado: se facturaba con su stock ya devuelto
+    antes = stock(servicios, CAFE)
+    pedido = servicios.crear_pedido(1, [CAFE], "Mesero")
+    servicios.cancelar_pedido(pedido.id)
+    assert not servicios.marcar_pedido_entregado(pedido.id)
+    assert servicios.repo.obtener_pedido(pedido.id).estado == "cancelado"
+    assert stock(servicios, CAFE) == antes
+    assert servicios.calcular_total_mesa(1) == 0
+    assert servicios.libro_cuenta(1).total == 0
+
+
+def test_entregado_no_se_cancela_ni_se_repite(servicios):
+    antes = stock(servicios, CAFE)
+    pedido = servicios.crear_pedido(1, [CAFE], "Mesero")
+    assert servicios.marcar_pedido_entregado(pedido.id)
+    assert not servicios.marcar_pedido_entregado(pedido.id)
+    assert not servicios.cancelar_pedido(pedido.id)
+    assert servicios.repo.obtener_pedido(pedido.id).estado == "entregado"
+    assert stock(servicios, CAFE) == antes - CAFE["cantidad"]
+    assert servicios.calcular_total_mesa(1) == pedido.total
+
+
+def test_pedido_inexistente(servicios):
+    assert not servicios.marcar_pedido_entregado(999)
+    assert not servicios.cancelar_pedido(999)
+
+
+def test_eliminar_pendiente_devuelve_stock(servicios):
+    antes = stock(servicios, CAFE)
+    pedido = servicios.crear_pedido(1, [CAFE], "Mesero")
+    servicios.eliminar_pedido_por_id(pedido.id)
+    assert servicios.repo.obtener_pedido(pedido.id) is None
+    assert stock(servicios, CAFE) == antes
+
+
+
+def test_pedido_para_mesa_inexistente(servicios):
+    antes = stock(servicios, CAFE)
+    with pytest.raises(KeyError):
+        servicios.crear_pedido(99, [CAFE], "Mesero")
+    assert stock(servicios, CAFE) == antes
+    assert servicios.repo.listar_pedidos() == []
+
+
+def test_mesa_cobrada_durante_la_reserva(servicios, configuracion):
+    if configuracion.backend != "memoria":
+        pytest.skip("SQLite comprueba la mesa y reserva dentro de la misma transacción de escritura")
+    # La reserva corre fuera del candado del repositorio: otra sesión puede cobrar la mesa en medio
+    reservas = servicios.repo.reservas
+    reservar = reservas.reservar
+
+    def reservar_y_cobrar(lineas):
+        reservar(lineas)
+        servicios.cerrar_cuenta(1, "Ana")
+
+    reservas.reservar = reservar_y_cobrar
+    antes = stock(servicios, CAFE)
+    with pytest.raises(KeyError):
+        servicios.crear_pedido(1, [CAFE], "Mesero")
+    assert stock(servicios, CAFE) == antes
+    assert servicios.repo.pedidos_de_mesa(1) == []
+
+
+def test_estacion_solo_envia_pedidos_pendientes(servicios):
+    entregado = servicios.crear_pedido(1, [CAFE], "Mesero")
+    cancelado = servicios.crear_pedido(1, [CAFE], "Mesero")
+    pendiente = servicios.crear_pedido(1, [CAFE, TACOS], "Mesero")
+    servicios.marcar_pedido_entregado(entregado.id)
+    servicios.cancelar_pedido(cancelado.id)
+    eventos = len(servicios.bitacora.ultimos(1000))
+
+    assert not servicios.marcar_estacion_enviada(entregado.id, "bebidas")
+    assert not servicios.marcar_estacion_enviada(cancelado.id, "bebidas")
+    assert not servicios.marcar_estacion_enviada(pendiente.id, "postres")       # sin productos de esa estación
+    assert len(servicios.bitacora.ultimos(1000)) == eventos
+    assert servicios.repo.obtener_pedido(cancelado.id).estado_produccion("bebidas") == "cancelado"
+
+    assert servicios.marcar_estacion_enviada(pendiente.id, "bebidas")
+    assert not servicios.marcar_estacion_enviada(pendiente.id, "bebidas")       # ya envió
+    assert servicios.repo.obtener_pedido(pendiente.id).produccion_estados == {
+        "bebidas": "enviado", "comida_mexicana": "pendiente"}